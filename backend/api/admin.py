@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Skola, Prieksmets, Olimpiade, Pieteikums, Rezultats, SkolasStarp
+from .models import User, Skola, Prieksmets, Olimpiade, Pieteikums, Rezultats, SkolasStarp, ImportJob
 
 
 @admin.register(User)
@@ -61,3 +61,10 @@ class SkolasStarpAdmin(admin.ModelAdmin):
     list_display = ['skolas', 'olimpiades']
     list_filter = ['skolas', 'olimpiades']
     search_fields = ['skolas__nosaukums', 'olimpiades__nosaukums']
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['olimpiade', 'state', 'processed_count', 'created_count', 'created_at', 'finished_at']
+    list_filter = ['state']
+    search_fields = ['olimpiade__nosaukums', 'url']
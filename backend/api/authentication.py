@@ -0,0 +1,85 @@
+"""JWT authentication from permission claims.
+
+Tokens issued by CustomTokenObtainPairSerializer carry the user's
+``user_type``, ``skola_id`` and ``token_version``. ClaimsJWTAuthentication
+builds ``request.user`` from those claims instead of loading the Konti row:
+the user is a real User instance with every other field deferred, and the
+first field a view reads beyond the claims loads the rest in one query.
+
+Changing a user's role, school or active flag bumps ``token_version``
+(User.save), which makes tokens issued before the change stale. The current
+version is cached per user for TOKEN_VERSION_CACHE_SECONDS and dropped when
+the user is saved, so another process notices a change within that window.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Token claim -> User attribute
+PERMISSION_CLAIMS = {
+    'user_type': 'user_type',
+    'skola_id': 'skola_id',
+    'token_version': 'token_version',
+}
+
+TOKEN_STATE_CACHE_KEY = "token-version:{}"
+
+
+def add_permission_claims(token, user):
+    for claim, attr in PERMISSION_CLAIMS.items():
+        token[claim] = getattr(user, attr)
+    return token
+
+
+def get_token_state(user_id):
+    """(token_version, is_active) of a user, or None if the user is gone"""
+    key = TOKEN_STATE_CACHE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        # From the primary: a replica could still show a revoked role
+        state = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values_list('token_version', 'is_active').first()
+        if state is None:
+            return None
+        cache.set(key, tuple(state), getattr(settings, 'TOKEN_VERSION_CACHE_SECONDS', 30))
+    return state
+
+
+def forget_token_state(*user_ids):
+    cache.delete_many([TOKEN_STATE_CACHE_KEY.format(user_id) for user_id in user_ids])
+
+
+def claims_user(user_id, claims):
+    """A User with only the claim fields loaded; the rest is fetched on first use"""
+    values = {'id': user_id, 'is_active': True}
+    values.update((attr, claims[claim]) for claim, attr in PERMISSION_CLAIMS.items())
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+    user = User.from_db(router.db_for_read(User), field_names, [values[name] for name in field_names])
+    user._from_claims = True
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the permission claims instead of loading the user"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+            claims = {claim: validated_token[claim] for claim in PERMISSION_CLAIMS}
+        except (KeyError, TypeError, ValueError):
+            # Tokens from before the claims were added
+            return super().get_user(validated_token)
+
+        state = get_token_state(user_id)
+        if state is None:
+            raise AuthenticationFailed("Lietotājs nav atrasts", code="user_not_found")
+        token_version, is_active = state
+        if not is_active:
+            raise AuthenticationFailed("Lietotājs nav aktīvs", code="user_inactive")
+        if claims['token_version'] != token_version:
+            raise InvalidToken("Lietotāja tiesības ir mainītas, pieprasiet jaunu piekļuves tokenu")
+        return claims_user(user_id, claims)
@@ -0,0 +1,239 @@
+"""Set-based batch changes used by BulkUserUpdateView and
+BulkApplicationStatusView.
+
+A batch is checked with one SELECT that labels every requested row with the
+first rule it breaks, and applied with one UPDATE ... WHERE id IN (...)
+that repeats the rules in its WHERE clause, so a row that changed in
+between is never updated against them. Rows already in the target state
+count as applied without being written.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, CharField, BooleanField, F, Q, Value, When
+
+from .authentication import forget_token_state
+from .models import User, Skola, Pieteikums
+from .seats import take_seat, release_seats, NO_FREE_SEATS
+from .versioning import bump_versions, user_key, USERS, APPLICATIONS
+
+# Ids accepted per request
+MAX_BATCH_SIZE = 1000
+
+USER_NOT_FOUND = "Lietotājs nav atrasts"
+APPLICATION_NOT_FOUND = "Pieteikums nav atrasts"
+
+SET_SCHOOL = 'set_school'
+CLEAR_SCHOOL = 'clear_school'
+SET_USER_TYPE = 'set_user_type'
+SET_ACTIVE = 'set_active'
+USER_OPERATIONS = (SET_SCHOOL, CLEAR_SCHOOL, SET_USER_TYPE, SET_ACTIVE)
+# Operations only admins may run
+ADMIN_OPERATIONS = (SET_USER_TYPE, SET_ACTIVE)
+
+
+class BatchRefused(Exception):
+    """The whole batch is refused, e.g. the caller may not run the operation"""
+
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class BatchResult:
+    def __init__(self):
+        self.applied = []
+        self.rejected = []
+        # Applied ids that were actually written
+        self.changed = []
+        # pk -> values of the extra fields asked for in apply_batch()
+        self.values = {}
+
+    def as_response_data(self, detail, applied_key='applied', rejected_key='rejected'):
+        return {"detail": detail, applied_key: self.applied, rejected_key: self.rejected}
+
+
+def parse_ids(values, required_message):
+    """Distinct integer ids in request order"""
+    if not isinstance(values, list) or not values:
+        raise BatchRefused(required_message)
+    if len(values) > MAX_BATCH_SIZE:
+        raise BatchRefused(f"Vienā pieprasījumā var būt ne vairāk kā {MAX_BATCH_SIZE} ID")
+    ids = []
+    for value in values:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise BatchRefused(f"Nederīgs ID: {value}")
+        if value not in ids:
+            ids.append(value)
+    return ids
+
+
+def apply_batch(queryset, ids, rules, changes, unchanged, not_found, fields=()):
+    """Apply ``changes`` to the rows of ``queryset`` with the given ids.
+
+    ``rules`` is a list of (Q, reason): a row matching Q is rejected with
+    that reason. ``unchanged`` matches rows already in the target state.
+    ``fields`` are read in the same SELECT into ``result.values``.
+    """
+    result = BatchResult()
+    reason = Case(
+        *(When(condition, then=Value(message)) for condition, message in rules),
+        default=Value(None), output_field=CharField(),
+    )
+    noop = Case(When(unchanged, then=Value(True)), default=Value(False), output_field=BooleanField())
+
+    with transaction.atomic():
+        rows = {
+            pk: row for pk, *row in queryset.filter(pk__in=ids)
+            .select_for_update()
+            .annotate(batch_reason=reason, batch_noop=noop)
+            .values_list('pk', 'batch_reason', 'batch_noop', *fields)
+        }
+        for pk in ids:
+            if pk not in rows:
+                result.rejected.append({"id": pk, "reason": not_found})
+                continue
+            message, is_noop, *values = rows[pk]
+            result.values[pk] = values
+            if message is not None:
+                result.rejected.append({"id": pk, "reason": message})
+                continue
+            result.applied.append(pk)
+            if not is_noop:
+                result.changed.append(pk)
+        if result.changed:
+            allowed = queryset.filter(pk__in=result.changed).exclude(unchanged)
+            for condition, _ in rules:
+                allowed = allowed.exclude(condition)
+            allowed.update(**changes)
+    return result
+
+
+def user_batch_rules(operation, actor, data):
+    """(rules, changes, unchanged) for a user batch; the same checks as the single-user views"""
+    is_teacher = actor.user_type == 'teacher'
+    if operation in ADMIN_OPERATIONS and actor.user_type != 'admin':
+        raise BatchRefused("Jums nav tiesību veikt šo darbību", 403)
+
+    if operation == SET_SCHOOL:
+        school_id = data.get('school_id')
+        if not school_id:
+            raise BatchRefused("Skolas ID ir obligāts")
+        try:
+            school_id = int(school_id)
+        except (TypeError, ValueError):
+            raise BatchRefused("Nederīgs skolas ID")
+        if not Skola.objects.filter(pk=school_id).exists():
+            raise BatchRefused("Skola nav atrasta", 404)
+        if is_teacher and actor.skola_id != school_id:
+            raise BatchRefused("Jums nav tiesību pievienot lietotājus šai skolai", 403)
+        rules = [(Q(user_type='admin'), "Administratorus nevar pievienot skolām")]
+        if is_teacher:
+            rules.append((Q(user_type='teacher'), "Jums nav tiesību pievienot skolotājus"))
+        return rules, {'skola_id': school_id}, Q(skola_id=school_id)
+
+    if operation == CLEAR_SCHOOL:
+        rules = [(Q(user_type='admin'), "Administratorus nevar noņemt no skolām")]
+        if is_teacher:
+            if not actor.skola_id:
+                raise BatchRefused("Jums nav tiesību noņemt lietotājus", 403)
+            rules += [
+                (Q(skola_id__isnull=True) | ~Q(skola_id=actor.skola_id),
+                 "Jums nav tiesību noņemt lietotāju no citas skolas"),
+                (Q(user_type='teacher'), "Jums nav tiesību noņemt skolotājus"),
+            ]
+        return rules, {'skola_id': None}, Q(skola_id__isnull=True)
+
+    if operation == SET_USER_TYPE:
+        user_type = data.get('user_type')
+        if user_type not in dict(User.USER_TYPES):
+            raise BatchRefused("Nepareizs lietotāja tips")
+        rules = [(Q(pk=actor.pk), "Jūs nevarat mainīt savu lietotāja tipu")]
+        if user_type == 'teacher':
+            rules.append((Q(skola_id__isnull=True), "Skolotājiem jābūt pievienotiem skolai"))
+        return rules, {'user_type': user_type}, Q(user_type=user_type)
+
+    if operation == SET_ACTIVE:
+        is_active = data.get('is_active')
+        if not isinstance(is_active, bool):
+            raise BatchRefused("Laukam is_active jābūt true vai false")
+        rules = []
+        if not is_active:
+            rules.append((Q(pk=actor.pk), "Jūs nevarat deaktivizēt savu profilu"))
+        return rules, {'is_active': is_active}, Q(is_active=is_active)
+
+    raise BatchRefused(f"Darbībai jābūt vienai no: {', '.join(USER_OPERATIONS)}")
+
+
+def update_users(operation, actor, data):
+    """Run one of USER_OPERATIONS on data['user_ids']; returns a BatchResult"""
+    rules, changes, unchanged = user_batch_rules(operation, actor, data)
+    ids = parse_ids(data.get('user_ids'), "Lietotāju ID saraksts ir obligāts")
+    # Every operation changes a token claim (api.authentication)
+    changes['token_version'] = F('token_version') + 1
+    with transaction.atomic():
+        result = apply_batch(User.objects.all(), ids, rules, changes, unchanged, USER_NOT_FOUND)
+        # update() sends no post_save
+        if result.changed:
+            bump_versions(USERS, *(user_key(pk) for pk in result.changed))
+            forget_token_state(*result.changed)
+            transaction.on_commit(lambda: forget_token_state(*result.changed))
+    return result
+
+
+def take_seats(ids, rules):
+    """Take a seat for each application that passes ``rules`` and has none; the ids left without one"""
+    seatless = Pieteikums.objects.filter(pk__in=ids).exclude(statuss__in=Pieteikums.SEATED_STATUSES)
+    for condition, _ in rules:
+        seatless = seatless.exclude(condition)
+    return [
+        pk for pk, olympiad_id in seatless.select_for_update().order_by('pk').values_list('pk', 'olimpiade_id')
+        if not take_seat(olympiad_id)
+    ]
+
+
+def update_application_status(actor, data):
+    """Set data['status'] on data['application_ids']; returns a BatchResult.
+
+    Teachers may only change applications of users in their own school; the
+    check is part of the UPDATE's WHERE clause. Applications that move into a
+    seated status take a seat first (refused when the olympiad is full), and
+    seats freed by the batch go to the waiting list.
+    """
+    new_status = data.get('status')
+    if not isinstance(new_status, str) or not new_status.strip():
+        raise BatchRefused("Statuss ir obligāts")
+    if len(new_status) > Pieteikums._meta.get_field('statuss').max_length:
+        raise BatchRefused("Statuss ir pārāk garš")
+    ids = parse_ids(data.get('application_ids'), "Pieteikumu ID saraksts ir obligāts")
+
+    rules = []
+    if actor.user_type == 'teacher':
+        if not actor.skola_id:
+            raise BatchRefused("Jums nav tiesību apstiprināt šo pieteikumu", 403)
+        own_school = Q(lietotajs_id__in=User.objects.filter(skola_id=actor.skola_id).values('pk'))
+        rules.append((~own_school, "Jums nav tiesību apstiprināt šo pieteikumu"))
+
+    with transaction.atomic():
+        full = take_seats(ids, rules) if new_status in Pieteikums.SEATED_STATUSES else []
+        if full:
+            rules.append((Q(pk__in=full), NO_FREE_SEATS))
+        result = apply_batch(
+            Pieteikums.objects.all(), ids, rules, {'statuss': new_status}, Q(statuss=new_status),
+            APPLICATION_NOT_FOUND, fields=('lietotajs_id', 'olimpiade_id', 'statuss'),
+        )
+        # update() sends no post_save
+        if result.changed:
+            user_ids = {result.values[pk][0] for pk in result.changed}
+            bump_versions(APPLICATIONS, *(user_key(user_id) for user_id in user_ids))
+        if new_status not in Pieteikums.SEATED_STATUSES:
+            freed = Counter(
+                olympiad_id for olympiad_id, old_status in (result.values[pk][1:] for pk in result.changed)
+                if old_status in Pieteikums.SEATED_STATUSES
+            )
+            for olympiad_id, count in freed.items():
+                release_seats(olympiad_id, count, exclude=result.changed)
+    return result
@@ -0,0 +1,100 @@
+"""Score distribution of one olympiad's results.
+
+The scores are read once, already sorted by the database, and everything
+is derived in a single pass over that column: mean and standard deviation
+(Welford), histogram counts, and each participant's percentile rank from
+the run of equal scores they belong to. Quartiles are read off the sorted
+column by position. The payload is cached per olympiad and histogram size
+and keyed by the olympiad's results version, so it is only recomputed
+after that olympiad's results change.
+"""
+import math
+
+from django.core.cache import cache
+
+from .models import Rezultats
+from .versioning import versioned_cache_key
+
+DISTRIBUTION_CACHE_PREFIX = "score-distribution"
+DISTRIBUTION_CACHE_TIMEOUT = 60 * 60
+DEFAULT_BINS = 10
+MAX_BINS = 50
+
+
+def quantile(scores, q):
+    """Linear interpolation between closest ranks (numpy's default method)"""
+    position = (len(scores) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(scores) - 1)
+    return scores[lower] + (scores[upper] - scores[lower]) * (position - lower)
+
+
+def score_distribution(olympiad_id, bins=DEFAULT_BINS):
+    # Read in rezultati_punkti_idx order, then walk it lowest score first
+    rows = list(
+        Rezultats.objects.filter(olimpiade_id=olympiad_id)
+        .order_by('-punktuSkaits', 'id')
+        .values_list('id', 'lietotajs_id', 'punktuSkaits')
+    )
+    rows.reverse()
+    count = len(rows)
+    if not count:
+        return {
+            'count': 0, 'min': None, 'max': None, 'mean': None, 'stddev': None,
+            'quartiles': None, 'histogram': [], 'participants': [],
+        }
+
+    scores = [points for _, _, points in rows]
+    low, high = scores[0], scores[-1]
+    bins = 1 if low == high else bins
+    width = (high - low) / bins
+    histogram = [0] * bins
+
+    mean = m2 = 0.0
+    percentiles = [0.0] * count
+    run_start = 0
+    for i, points in enumerate(scores):
+        delta = points - mean
+        mean += delta / (i + 1)
+        m2 += delta * (points - mean)
+
+        # The top edge belongs to the last bin
+        histogram[min(int((points - low) / width), bins - 1) if width else 0] += 1
+
+        # Close a run of equal scores: below = run_start, equal = run length
+        if i + 1 == count or scores[i + 1] != points:
+            rank = (run_start + (i + 1 - run_start) / 2) / count * 100
+            percentiles[run_start:i + 1] = [round(rank, 2)] * (i + 1 - run_start)
+            run_start = i + 1
+
+    return {
+        'count': count,
+        'min': low,
+        'max': high,
+        'mean': mean,
+        # Population standard deviation: every participant is counted
+        'stddev': math.sqrt(m2 / count),
+        'quartiles': {
+            'q1': quantile(scores, 0.25),
+            'median': quantile(scores, 0.5),
+            'q3': quantile(scores, 0.75),
+        },
+        'histogram': [
+            {'from': low + width * b, 'to': high if b == bins - 1 else low + width * (b + 1), 'count': n}
+            for b, n in enumerate(histogram)
+        ],
+        # Best first, like the leaderboard
+        'participants': [
+            {'id': pk, 'lietotajs': lietotajs_id, 'punktuSkaits': points, 'percentile': percentiles[i]}
+            for i, (pk, lietotajs_id, points) in reversed(list(enumerate(rows)))
+        ],
+    }
+
+
+def get_score_distribution(olympiad_id, versions, bins=DEFAULT_BINS):
+    key = versioned_cache_key(DISTRIBUTION_CACHE_PREFIX, versions, olympiad_id, bins)
+    distribution = cache.get(key)
+    if distribution is None:
+        distribution = score_distribution(olympiad_id, bins)
+        cache.set(key, distribution, DISTRIBUTION_CACHE_TIMEOUT)
+    return distribution
@@ -0,0 +1,146 @@
+"""Bulk user enrollment used by BulkUserCreateView.
+
+Rows come from a JSON array or a CSV file and are validated with the rules
+of AdminUserSerializer (BulkUserRowSerializer), except that e-mails and
+schools are looked up once for the whole batch. Passwords of the valid rows
+are hashed across worker processes (api.hashing.make_passwords) and the
+users are inserted with chunked bulk_create in a single transaction; the
+manager's bulk_create runs User.sync_fields() as save() would.
+"""
+import csv
+import io
+
+from django.db import transaction
+
+from .hashing import make_passwords
+from .models import User, Skola
+from .serializers import BulkUserRowSerializer
+from .versioning import bump_versions, USERS
+
+# Users inserted per bulk_create call
+ENROLL_BATCH_SIZE = 500
+# Rows accepted per request; also keeps the e-mail IN (...) list one query
+ENROLL_MAX_ROWS = 5000
+
+CSV_DELIMITERS = ',;\t'
+
+INVALID_CSV = "Nederīgs CSV fails"
+MISSING_EMAIL_COLUMN = "CSV failam jāsatur kolonna 'email'"
+USERS_NOT_LIST = "JSON datiem jāsatur 'users' masīvs"
+TOO_MANY_ROWS = f"Vienā pieprasījumā var izveidot ne vairāk kā {ENROLL_MAX_ROWS} lietotājus"
+ROW_NOT_OBJECT = "Rindai jābūt objektam"
+
+
+class EnrollmentFormatError(ValueError):
+    """The payload is not a list of users or a CSV file with a header row"""
+
+
+def parse_csv(data):
+    """Rows of a CSV upload or string as dicts; blank cells are left out"""
+    if hasattr(data, 'read'):
+        data = data.read()
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise EnrollmentFormatError(INVALID_CSV)
+    data = data.lstrip('\ufeff')
+    header = data.split('\n', 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(data), dialect=dialect)
+    try:
+        fieldnames = [name.strip() for name in reader.fieldnames or ()]
+        if 'email' not in fieldnames:
+            raise EnrollmentFormatError(MISSING_EMAIL_COLUMN)
+        reader.fieldnames = fieldnames
+        return [
+            {key: value.strip() for key, value in record.items()
+             if key and isinstance(value, str) and value.strip()}
+            for record in reader
+        ]
+    except csv.Error:
+        raise EnrollmentFormatError(INVALID_CSV)
+
+
+class EnrollmentReport:
+    def __init__(self, total_count):
+        self.total_count = total_count
+        self.rows = []
+
+    @property
+    def created_count(self):
+        return sum(row['status'] == 'created' for row in self.rows)
+
+    def error(self, idx, email, errors):
+        self.rows.append({"row": idx, "email": email, "status": "error", "errors": errors})
+
+    def created(self, idx, user):
+        self.rows.append({"row": idx, "email": user.email, "status": "created", "id": user.id})
+
+    def as_response_data(self):
+        created_count = self.created_count
+        return {
+            "detail": f"Veiksmīgi izveidoti {created_count} lietotāji",
+            "created_count": created_count,
+            "error_count": len(self.rows) - created_count,
+            "total_count": self.total_count,
+            "rows": sorted(self.rows, key=lambda row: row['row']),
+        }
+
+
+def enroll_users(rows, request, default_school=None):
+    """Validate and create users from ``rows`` (dicts); returns an EnrollmentReport.
+
+    ``default_school`` is used for rows without a ``skola``. Invalid rows are
+    reported and skipped; the valid ones are created together or not at all.
+    """
+    if len(rows) > ENROLL_MAX_ROWS:
+        raise EnrollmentFormatError(TOO_MANY_ROWS)
+    report = EnrollmentReport(len(rows))
+
+    emails = {
+        User.objects.normalize_email(row['email'])
+        for row in rows if isinstance(row, dict) and isinstance(row.get('email'), str)
+    }
+    school_ids = {row.get('skola') for row in rows if isinstance(row, dict)} | {default_school}
+    school_ids = {str(school_id) for school_id in school_ids if school_id not in (None, '')}
+    context = {
+        'request': request,
+        'taken_emails': set(User.objects.filter(email__in=emails).values_list('email', flat=True)),
+        'school_ids': set(Skola.objects.filter(
+            id__in=[school_id for school_id in school_ids if school_id.isdigit()]
+        ).values_list('id', flat=True)),
+    }
+
+    valid = []
+    for idx, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            report.error(idx, None, {"detail": ROW_NOT_OBJECT})
+            continue
+        if default_school not in (None, '') and row.get('skola') in (None, ''):
+            row = {**row, 'skola': default_school}
+        serializer = BulkUserRowSerializer(data=row, context=context)
+        if not serializer.is_valid():
+            report.error(idx, row.get('email'), serializer.errors)
+            continue
+        data = dict(serializer.validated_data)
+        # Later rows with the same e-mail are rejected
+        context['taken_emails'].add(data['email'])
+        valid.append((idx, data))
+
+    passwords = make_passwords(data.pop('password') for _, data in valid)
+    users = [
+        User(skola_id=data.pop('skola', None), password=password, **data)
+        for (_, data), password in zip(valid, passwords)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=ENROLL_BATCH_SIZE)
+        # bulk_create sends no post_save
+        if users:
+            bump_versions(USERS)
+    for (idx, _), user in zip(valid, users):
+        report.created(idx, user)
+    return report
@@ -0,0 +1,54 @@
+"""OLYMP_004: Facet counts for the olympiad catalog filters.
+
+Each facet is one grouped COUNT over the olympiads matching the current
+search and filters, except the facet's own filter, so every option of a
+multi-select stays visible (with its count) while it is selected.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from .filters import filter_olympiads
+from .models import Olimpiade
+from .search import search_olympiads
+from .versioning import versioned_cache_key
+
+FACETS_CACHE_PREFIX = "olympiad-facets"
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+# Facet (= filter parameter) -> (value field, label field)
+FACET_FIELDS = {
+    'prieksmets': ('prieksmets_id', 'prieksmets__nosaukums'),
+    'kategorija': ('prieksmets__kategorija', 'prieksmets__kategorija'),
+    'norisesVieta': ('norisesVieta', 'norisesVieta'),
+    'organizetajs': ('organizetajs', 'organizetajs'),
+}
+
+
+def facet_counts(params):
+    search = params.get('search')
+    facets = {}
+    for facet, (value_field, label_field) in FACET_FIELDS.items():
+        queryset = filter_olympiads(Olimpiade.objects.all(), params, skip=(facet,))
+        if search:
+            queryset = search_olympiads(queryset, search)
+        rows = (
+            queryset.order_by()
+            .values_list(value_field, label_field)
+            .annotate(count=Count('id'))
+        )
+        facets[facet] = sorted(
+            ({'value': value, 'label': label, 'count': count} for value, label, count in rows),
+            key=lambda row: (-row['count'], row['label']),
+        )
+    return facets
+
+
+def get_facet_counts(params, versions, today):
+    """Cached facet_counts() for one query string and data version snapshot"""
+    query = sorted((name, value) for name in params for value in params.getlist(name))
+    key = versioned_cache_key(FACETS_CACHE_PREFIX, versions, query, today)
+    facets = cache.get(key)
+    if facets is None:
+        facets = facet_counts(params)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
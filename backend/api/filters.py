@@ -0,0 +1,118 @@
+"""Query-string filters and ordering for list endpoints.
+
+Olympiad list (OLYMP_003, OLYMP_004):
+
+    ?status=completed|upcoming      before today / today or later
+    ?date_from=YYYY-MM-DD           inclusive bounds on datums
+    ?date_to=YYYY-MM-DD
+    ?prieksmets=<id or name>        repeatable, any of
+    ?norisesVieta=<location>        repeatable, any of
+    ?kategorija=<category>          repeatable, any of (Prieksmets.kategorija)
+    ?organizetajs=<organizer>       repeatable, any of
+    ?ordering=datums|-datums|nosaukums|-nosaukums
+
+User list (USER_003):
+
+    ?ordering=create_date|name|email|user_type, or with '-' for descending
+"""
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+STATUS_COMPLETED = 'completed'
+STATUS_UPCOMING = 'upcoming'
+
+# Public sort key -> order_by(); the id tie-breaker keeps keyset pages stable
+OLYMPIAD_ORDERINGS = {
+    'datums': ('datums', 'id'),
+    '-datums': ('-datums', '-id'),
+    'nosaukums': ('nosaukums', 'id'),
+    '-nosaukums': ('-nosaukums', '-id'),
+}
+DEFAULT_OLYMPIAD_ORDERING = '-datums'
+
+# Names and e-mails sort on their folded copies (api.search), so 'Ērika'
+# sorts with 'Erika' rather than after 'Zane'
+USER_ORDERINGS = {
+    'create_date': ('create_date', 'id'),
+    '-create_date': ('-create_date', '-id'),
+    'name': ('search_name', 'search_last_name', 'id'),
+    '-name': ('-search_name', '-search_last_name', '-id'),
+    'email': ('search_email', 'id'),
+    '-email': ('-search_email', '-id'),
+    'user_type': ('user_type', '-create_date', '-id'),
+    '-user_type': ('-user_type', '-create_date', '-id'),
+}
+DEFAULT_USER_ORDERING = '-create_date'
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ParseError(f"Nederīgs datums '{name}', jāizmanto formāts GGGG-MM-DD")
+
+
+def getlist(params, name):
+    return [value for value in params.getlist(name) if value]
+
+
+def filter_olympiads(queryset, params, skip=()):
+    """Apply status, date range, subject, category, location and organizer filters.
+
+    Filters named in ``skip`` are left out, which facet counts use to keep
+    every option of a multi-select visible while it is being filtered on.
+    """
+    state = params.get('status')
+    if state == STATUS_COMPLETED:
+        queryset = queryset.filter(datums__lt=timezone.localdate())
+    elif state == STATUS_UPCOMING:
+        queryset = queryset.filter(datums__gte=timezone.localdate())
+    elif state:
+        raise ParseError(f"Nederīgs statuss, atļautās vērtības: {STATUS_COMPLETED}, {STATUS_UPCOMING}")
+
+    date_from = parse_date_param(params, 'date_from')
+    if date_from:
+        queryset = queryset.filter(datums__gte=date_from)
+    date_to = parse_date_param(params, 'date_to')
+    if date_to:
+        queryset = queryset.filter(datums__lte=date_to)
+
+    subjects = getlist(params, 'prieksmets') if 'prieksmets' not in skip else []
+    if subjects:
+        ids = [int(value) for value in subjects if value.isdigit()]
+        names = [value for value in subjects if not value.isdigit()]
+        queryset = queryset.filter(Q(prieksmets_id__in=ids) | Q(prieksmets__nosaukums__in=names))
+
+    for name, lookup in (
+        ('kategorija', 'prieksmets__kategorija__in'),
+        ('norisesVieta', 'norisesVieta__in'),
+        ('organizetajs', 'organizetajs__in'),
+    ):
+        values = getlist(params, name) if name not in skip else []
+        if values:
+            queryset = queryset.filter(**{lookup: values})
+    return queryset
+
+
+def apply_ordering(queryset, params, orderings):
+    """Explicit ?ordering wins; otherwise keep the queryset's own (e.g. relevance)"""
+    ordering = params.get('ordering')
+    if not ordering:
+        return queryset
+    if ordering not in orderings:
+        raise ParseError(f"Nederīga kārtošana, atļautās vērtības: {', '.join(orderings)}")
+    return queryset.order_by(*orderings[ordering])
+
+
+def order_olympiads(queryset, params):
+    return apply_ordering(queryset, params, OLYMPIAD_ORDERINGS)
+
+
+def order_users(queryset, params):
+    return apply_ordering(queryset, params, USER_ORDERINGS)
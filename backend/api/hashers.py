@@ -0,0 +1,12 @@
+from django.contrib.auth.hashers import ScryptPasswordHasher as DjangoScryptPasswordHasher
+
+
+class ScryptPasswordHasher(DjangoScryptPasswordHasher):
+    """Scrypt with one lane instead of Django's five.
+
+    Still memory-hard (16 MiB per hash at the default work factor) but about
+    five times cheaper in CPU per login. Hashes keep the ``scrypt``
+    algorithm name and carry their own parameters, so Django's hasher still
+    verifies them and either one upgrades the other's hashes on login.
+    """
+    parallelism = 1
@@ -0,0 +1,101 @@
+"""Password hashing on a bounded worker pool.
+
+Hashing is CPU-bound, and PBKDF2 and scrypt release the GIL while they run,
+so a burst of logins can keep every core busy at once. User.set_password()
+and check_password() hand the work to a pool of PASSWORD_HASHING_WORKERS
+threads instead: a process never hashes more passwords at a time than that,
+further requests wait their turn, and async callers await the result rather
+than blocking the event loop.
+
+make_passwords() is for bulk work (api.enrollment): it spreads a list of
+passwords over one shared pool of PASSWORD_HASHING_PROCESSES worker
+processes, started on first use and kept for the life of the process.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# Fewer passwords than this are hashed on the thread pool; starting
+# worker processes would cost more than it saves
+MIN_PROCESS_BATCH = 16
+
+_executor = None
+_executor_lock = Lock()
+_process_pool = None
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 1),
+                thread_name_prefix='password-hash',
+            )
+        return _executor
+
+
+def get_process_pool():
+    global _process_pool
+    with _executor_lock:
+        if _process_pool is None:
+            # Spawned, not forked: the children never inherit open connections or held locks
+            _process_pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASHING_PROCESSES', 1),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _process_pool
+
+
+def drop_process_pool(pool):
+    """Forget a broken pool, so the next call starts a new one"""
+    global _process_pool
+    with _executor_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+def make_password(raw_password):
+    return get_executor().submit(hashers.make_password, raw_password).result()
+
+
+def verify_password(raw_password, encoded):
+    """(is_correct, must_update), as django.contrib.auth.hashers.verify_password"""
+    return get_executor().submit(hashers.verify_password, raw_password, encoded).result()
+
+
+async def amake_password(raw_password):
+    return await asyncio.wrap_future(get_executor().submit(hashers.make_password, raw_password))
+
+
+async def averify_password(raw_password, encoded):
+    return await asyncio.wrap_future(get_executor().submit(hashers.verify_password, raw_password, encoded))
+
+
+def _encode(hasher, raw_password):
+    # Runs in a worker process; the hasher instance carries its parameters
+    return hasher.encode(raw_password, hasher.salt())
+
+
+def make_passwords(raw_passwords):
+    """Hash many passwords with the preferred hasher across worker processes"""
+    raw_passwords = list(raw_passwords)
+    processes = min(getattr(settings, 'PASSWORD_HASHING_PROCESSES', 1), len(raw_passwords))
+    if processes <= 1 or len(raw_passwords) < MIN_PROCESS_BATCH:
+        return list(get_executor().map(hashers.make_password, raw_passwords))
+    hasher = hashers.get_hasher()
+    pool = get_process_pool()
+    chunksize = max(1, len(raw_passwords) // (processes * 4))
+    try:
+        return list(pool.map(_encode, repeat(hasher), raw_passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); finish this batch on the threads
+        drop_process_pool(pool)
+        return list(get_executor().map(hashers.make_password, raw_passwords))
@@ -0,0 +1,304 @@
+"""RES_004: Batched results import used by ImportResultsView."""
+import codecs
+import json
+import logging
+import math
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import User, Rezultats
+from .ranking import rank_results
+from .versioning import bump_versions, results_key, RESULTS
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and written per bulk_create call
+IMPORT_BATCH_SIZE = 500
+# Keep IN (...) lists well below SQLite's host parameter limit
+EMAIL_LOOKUP_CHUNK = 500
+# Bytes read per step from uploads, request bodies and URL responses
+STREAM_CHUNK_SIZE = 64 * 1024
+# Largest single JSON value (one result row, or a key next to 'results')
+MAX_VALUE_SIZE = 1024 * 1024
+
+MISSING_RESULTS = "JSON datiem jāsatur 'results' masīvs"
+RESULTS_NOT_LIST = "'results' jābūt masīvam"
+INVALID_JSON = "Nederīgs JSON formāts"
+INVALID_SCORE = "'punktuSkaits' jābūt skaitlim"
+
+# Accepted keys per field, in lookup order. A supplied place (vieta, rank,
+# place) is ignored: places are derived from the scores (api.ranking).
+FIELD_ALIASES = {
+    'punktuSkaits': ('punktuSkaits', 'points', 'score'),
+    'lietotajs_email': ('lietotajs_email', 'user_email', 'email'),
+    'rezultataDatums': ('rezultataDatums', 'result_date', 'date'),
+}
+
+
+class AliasMap:
+    """Alias keys that actually occur in one batch of rows.
+
+    Resolving which aliases are present once per batch means each row only
+    probes the keys it can have, while keeping the old
+    ``row.get(a) or row.get(b) or row.get(c)`` semantics.
+    """
+
+    def __init__(self, rows):
+        present = set()
+        for row in rows:
+            if isinstance(row, dict):
+                present.update(row.keys())
+        self.keys = {}
+        for field, aliases in FIELD_ALIASES.items():
+            # The last alias decides the value when every alias is falsy
+            self.keys[field] = (
+                tuple(key for key in aliases if key in present),
+                aliases[-1] in present,
+            )
+
+    def get(self, row, field):
+        keys, tail_present = self.keys[field]
+        for key in keys:
+            value = row.get(key)
+            if value:
+                return value
+        return row.get(keys[-1]) if tail_present else None
+
+
+class ImportFormatError(ValueError):
+    """The payload is not a JSON object with a 'results' array"""
+
+
+class JSONStream:
+    """Cursor over JSON text arriving in chunks.
+
+    Only the unconsumed tail of the input is kept in memory, so a document
+    of any size is read with a buffer of about one chunk plus one value.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Append the next chunk to the buffer; False once the input is exhausted"""
+        if self.eof:
+            return False
+        try:
+            for chunk in self._chunks:
+                text = self._text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+                if text:
+                    break
+            else:
+                text = self._text_decoder.decode(b'', final=True)
+                self.eof = True
+        except UnicodeDecodeError:
+            raise ImportFormatError(INVALID_JSON)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at the end of the input"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def next_char(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode one complete JSON value at the cursor"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                end = None
+            # A value ending exactly at the buffer end may be cut short ("12" of "123")
+            if end is not None and (end < len(self.buffer) or self.eof):
+                self.pos = end
+                return value
+            if len(self.buffer) - self.pos > MAX_VALUE_SIZE or not self._fill():
+                raise ImportFormatError(INVALID_JSON)
+
+
+def iter_results(chunks):
+    """Yield the items of the top-level 'results' array one at a time.
+
+    ``chunks`` is any iterable of bytes or str, e.g. ``UploadedFile.chunks()``,
+    ``Response.iter_content()`` or a request body read in pieces. Keys other
+    than 'results' are skipped; anything after the array is not read.
+    """
+    stream = JSONStream(chunks)
+    if stream.next_char() != '{':
+        raise ImportFormatError(MISSING_RESULTS)
+    if stream.peek() == '}':
+        raise ImportFormatError(MISSING_RESULTS)
+    while True:
+        key = stream.value()
+        if not isinstance(key, str) or stream.next_char() != ':':
+            raise ImportFormatError(INVALID_JSON)
+        if key == 'results':
+            break
+        stream.value()
+        separator = stream.next_char()
+        if separator == '}':
+            raise ImportFormatError(MISSING_RESULTS)
+        if separator != ',':
+            raise ImportFormatError(INVALID_JSON)
+
+    if stream.peek() != '[':
+        stream.value()  # surface invalid JSON before the type error
+        raise ImportFormatError(RESULTS_NOT_LIST)
+    stream.next_char()
+    if stream.peek() == ']':
+        return
+    while True:
+        yield stream.value()
+        separator = stream.next_char()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ImportFormatError(INVALID_JSON)
+
+
+def parse_score(value):
+    """float() also accepts 'nan' and 'inf', which the NOT NULL column cannot store"""
+    score = float(value)
+    if not math.isfinite(score):
+        raise ValueError(INVALID_SCORE)
+    return score
+
+
+def parse_result_date(value, default):
+    if value and isinstance(value, str):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return default
+
+
+def resolve_user_ids(emails):
+    """Map e-mail -> user id with one chunked IN query instead of a get() per row"""
+    emails = list(emails)
+    user_ids = {}
+    for start in range(0, len(emails), EMAIL_LOOKUP_CHUNK):
+        chunk = emails[start:start + EMAIL_LOOKUP_CHUNK]
+        user_ids.update(User.objects.filter(email__in=chunk).values_list('email', 'id'))
+    return user_ids
+
+
+class ImportReport:
+    def __init__(self):
+        self.created_count = 0
+        self.total_count = 0
+        self.errors = []
+
+    def __str__(self):
+        return f"{self.total_count} rows processed, {self.created_count} created, {len(self.errors)} errors"
+
+    def as_response_data(self):
+        data = {
+            "detail": f"Veiksmīgi importēti {self.created_count} rezultāti",
+            "created_count": self.created_count,
+            "total_count": self.total_count,
+        }
+        if self.errors:
+            data["errors"] = self.errors
+        return data
+
+
+def log_progress(report):
+    logger.info("Results import: %s", report)
+
+
+class ResultsImporter:
+    """Validates result rows per batch and writes them with bulk_create.
+
+    The whole import runs in a single transaction, so readers never see a
+    partially imported olympiad and the write lock is taken only once.
+    ``rows`` may be a lazy iterator (see iter_results); only one batch is
+    held in memory at a time. ``progress`` is called with the report after
+    every batch.
+    """
+
+    def __init__(self, olympiad, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.olympiad = olympiad
+        self.batch_size = batch_size
+        self.progress = progress or log_progress
+        self.report = ImportReport()
+
+    def run(self, rows):
+        with transaction.atomic():
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+            if batch:
+                self._import_batch(batch)
+            # bulk_create sends no post_save, so rank and invalidate once here
+            if self.report.created_count:
+                rank_results(self.olympiad.pk)
+                bump_versions(RESULTS, results_key(self.olympiad.pk))
+        return self.report
+
+    def _import_batch(self, rows):
+        offset = self.report.total_count
+        self.report.total_count += len(rows)
+        aliases = AliasMap(rows)
+        today = timezone.now().date()
+
+        parsed = []
+        emails = set()
+        for idx, row in enumerate(rows, start=offset + 1):
+            try:
+                punktuSkaits = aliases.get(row, 'punktuSkaits')
+                if punktuSkaits is None:
+                    self.report.errors.append(f"Rezultāts {idx}: trūkst 'punktuSkaits'")
+                    continue
+                email = aliases.get(row, 'lietotajs_email')
+                entry = (
+                    idx,
+                    parse_score(punktuSkaits),
+                    parse_result_date(aliases.get(row, 'rezultataDatums'), today),
+                    email,
+                )
+                if email:
+                    emails.add(email)
+                parsed.append(entry)
+            except Exception as e:
+                self.report.errors.append(f"Rezultāts {idx}: {str(e)}")
+
+        user_ids = resolve_user_ids(emails)
+        objects = [
+            Rezultats(
+                olimpiade=self.olympiad,
+                # Placeholder; rank_results derives the place from the score
+                vieta=0,
+                punktuSkaits=punktuSkaits,
+                rezultataDatums=rezultataDatums,
+                # Results for unknown e-mails are stored without a user
+                lietotajs_id=user_ids.get(email) if email else None,
+            )
+            for idx, punktuSkaits, rezultataDatums, email in parsed
+        ]
+        Rezultats.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.report.created_count += len(objects)
+        self.progress(self.report)
@@ -0,0 +1,153 @@
+"""RES_004: Local worker pool for URL results imports.
+
+Jobs live in the ImportJob table, so any process can report on them and
+``manage.py run_import_jobs`` can pick up jobs left queued after a restart
+(and fails jobs whose process died while running them). No external broker
+is involved: each process runs a small thread pool and a job is claimed with
+a conditional UPDATE, so it runs exactly once even when several processes
+share the database.
+
+The import itself is one transaction, so live counts are written to the job
+row through a second, autocommit connection after every batch. SQLite has a
+single writer, which the import holds until it commits; there the counts
+appear when the job finishes.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import requests
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, connections, transaction
+from datetime import timedelta
+from django.utils import timezone
+
+from .importing import ResultsImporter, ImportFormatError, iter_results, STREAM_CHUNK_SIZE
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+INTERRUPTED = "Importa darbs tika pārtraukts; iesniedziet to vēlreiz"
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RESULTS_IMPORT_WORKERS', 2),
+                thread_name_prefix='results-import',
+            )
+        return _executor
+
+
+def submit_import_job(olympiad, url, user=None):
+    """Create a queued job and hand it to the worker pool once the row is committed"""
+    job = ImportJob.objects.create(olimpiade=olympiad, url=url, lietotajs=user)
+    if getattr(settings, 'RESULTS_IMPORT_EAGER', False):
+        transaction.on_commit(lambda: run_import_job(job.id))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job.id))
+    return job
+
+
+class ProgressWriter:
+    """Per-batch progress callback: a short autocommit UPDATE of the job row"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.connection = None
+        if connection.vendor != 'sqlite':
+            # Outside the import transaction, so other processes see the counts
+            self.connection = connections.create_connection(DEFAULT_DB_ALIAS)
+
+    def __call__(self, report):
+        if self.connection is None:
+            return
+        table = self.connection.ops.quote_name(ImportJob._meta.db_table)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET processed_count = %s, created_count = %s WHERE id = %s",
+                [report.total_count, report.created_count, self.job_id],
+            )
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        # Worker threads own their connections; don't leak one per thread
+        connection.close()
+
+
+def run_import_job(job_id):
+    """Claim a queued job and run it; returns False if it was already taken"""
+    claimed = ImportJob.objects.filter(id=job_id, state=ImportJob.QUEUED).update(
+        state=ImportJob.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = ImportJob.objects.select_related('olimpiade').get(id=job_id)
+    progress = ProgressWriter(job_id)
+
+    job.state = ImportJob.FAILED
+    try:
+        with requests.get(job.url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            rows = iter_results(response.iter_content(STREAM_CHUNK_SIZE))
+            report = ResultsImporter(job.olimpiade, progress=progress).run(rows)
+    except requests.RequestException as e:
+        job.detail = f"Neizdevās ielādēt datus no URL: {str(e)}"
+    except ImportFormatError as e:
+        job.detail = str(e)
+    except Exception as e:
+        logger.exception("Results import job %s failed", job_id)
+        job.detail = str(e)
+    else:
+        job.state = ImportJob.DONE
+        job.detail = report.as_response_data()["detail"]
+        job.processed_count = report.total_count
+        job.created_count = report.created_count
+        job.errors = report.errors
+    finally:
+        progress.close()
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'state', 'detail', 'processed_count', 'created_count', 'errors', 'finished_at'
+    ])
+    return True
+
+
+def fail_stale_jobs():
+    """Fail running jobs started over RESULTS_IMPORT_STALE_SECONDS ago; their process is gone.
+
+    They are not requeued: if the worker is only slow, a second run would
+    import the same results twice.
+    """
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'RESULTS_IMPORT_STALE_SECONDS', 3600))
+    return ImportJob.objects.filter(state=ImportJob.RUNNING, started_at__lt=stale_before).update(
+        state=ImportJob.FAILED, detail=INTERRUPTED, finished_at=timezone.now()
+    )
+
+
+def run_queued_jobs(limit=None):
+    """Run queued jobs oldest first in the calling thread; returns how many ran"""
+    failed = fail_stale_jobs()
+    if failed:
+        logger.warning("Failed %s interrupted results import job(s)", failed)
+    ran = 0
+    queued = ImportJob.objects.filter(state=ImportJob.QUEUED).order_by('created_at')
+    for job_id in queued.values_list('id', flat=True)[:limit]:
+        if run_import_job(job_id):
+            ran += 1
+    return ran
@@ -0,0 +1,73 @@
+"""RES_001: Olympiad leaderboard payload.
+
+The whole table is read with one joined query and kept in the cache already
+serialized. Cache keys carry the olympiad's data versions, so any result
+write for that olympiad (post_save, delete or a bulk import) makes the next
+request rebuild it in every worker process.
+"""
+import math
+
+from django.core.cache import cache
+
+from .models import Rezultats
+from .versioning import versioned_cache_key
+
+LEADERBOARD_CACHE_PREFIX = "leaderboard"
+LEADERBOARD_CACHE_TIMEOUT = 60 * 60
+LEADERBOARD_ORDERING = ('vieta', '-punktuSkaits', '-id')
+
+NO_PARTICIPANT = "Nav norādīts"
+
+
+def participant_name(name, last_name, email):
+    full_name = f"{name or ''} {last_name or ''}".strip()
+    return full_name if full_name else email
+
+
+def percentage(points, max_points):
+    """Share of the best score, rounded like Math.round on the client"""
+    if not max_points or max_points <= 0:
+        return None
+    return math.floor(points / max_points * 100 + 0.5)
+
+
+def build_leaderboard(olympiad_id):
+    rows = list(
+        Rezultats.objects.filter(olimpiade_id=olympiad_id)
+        .order_by(*LEADERBOARD_ORDERING)
+        .values_list(
+            'id', 'olimpiade_id', 'punktuSkaits', 'vieta', 'rezultataDatums', 'lietotajs_id',
+            'lietotajs__name', 'lietotajs__last_name', 'lietotajs__email', 'olimpiade__nosaukums',
+        )
+    )
+    max_points = max((row[2] for row in rows), default=None)
+    payload = []
+    for (pk, olimpiade_id, points, vieta, rezultataDatums, lietotajs_id,
+         name, last_name, email, nosaukums) in rows:
+        row = {
+            'id': pk,
+            'olimpiade': olimpiade_id,
+            'punktuSkaits': points,
+            'vieta': vieta,
+            'rezultataDatums': rezultataDatums.isoformat() if rezultataDatums else None,
+            'lietotajs': lietotajs_id,
+            'lietotajs_name': NO_PARTICIPANT,
+        }
+        if lietotajs_id is not None:
+            # RezultatsSerializer leaves the e-mail out for rows without a user
+            row['lietotajs_name'] = participant_name(name, last_name, email)
+            row['lietotajs_email'] = email
+        row['olimpiade_nosaukums'] = nosaukums
+        row['percentage'] = percentage(points, max_points)
+        payload.append(row)
+    return payload
+
+
+def get_leaderboard(olympiad_id, versions):
+    """Cached leaderboard for the given {version key: version} snapshot"""
+    key = versioned_cache_key(LEADERBOARD_CACHE_PREFIX, versions, olympiad_id)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_leaderboard(olympiad_id)
+        cache.set(key, payload, LEADERBOARD_CACHE_TIMEOUT)
+    return payload
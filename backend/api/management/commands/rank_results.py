@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Rezultats
+from api.ranking import rank_results, get_tie_policy, RANK_WINDOWS
+from api.versioning import bump_versions, results_key, RESULTS
+
+
+class Command(BaseCommand):
+    help = "Recompute result places from scores (e.g. for results entered before automatic ranking)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--olympiad', type=int, action='append', dest='olympiads',
+                            help="Olympiad id; repeat for several (default: all with results)")
+        parser.add_argument('--policy', choices=sorted(RANK_WINDOWS), help="Tie policy (default: RESULTS_TIE_POLICY)")
+
+    def handle(self, *args, **options):
+        try:
+            policy = get_tie_policy(options['policy'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        olympiad_ids = options['olympiads'] or (
+            Rezultats.objects.values_list('olimpiade_id', flat=True).distinct().order_by('olimpiade_id')
+        )
+        for olympiad_id in olympiad_ids:
+            changed = rank_results(olympiad_id, policy)
+            if changed:
+                bump_versions(RESULTS, results_key(olympiad_id))
+            self.stdout.write(f"Olympiad {olympiad_id}: {changed} place(s) changed")
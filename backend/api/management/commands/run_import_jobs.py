@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued results import jobs (e.g. ones left behind by a restarted server)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the current queue and exit")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between queue polls")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            ran = run_queued_jobs()
+            if ran:
+                self.stdout.write(f"Ran {ran} import job(s)")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,50 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = "Refresh SQLite planner statistics (ANALYZE), checkpoint the WAL and optionally VACUUM"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias (default: default)")
+        parser.add_argument('--analyze', action='store_true', help="Run ANALYZE")
+        parser.add_argument('--checkpoint', action='store_true', help="Copy the WAL into the database file and truncate it")
+        parser.add_argument('--vacuum', action='store_true',
+                            help="Rebuild the database file; writers wait until it finishes")
+
+    def handle(self, *args, **options):
+        self.connection = connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Database '{options['database']}' is not SQLite")
+        tasks = [task for task in ('analyze', 'vacuum', 'checkpoint') if options[task]]
+        # Without flags: the cheap tasks, safe to run while the site is up
+        for task in tasks or ('analyze', 'checkpoint'):
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                message = getattr(self, task)(cursor)
+            self.stdout.write(f"{task.upper()}: {message} ({time.perf_counter() - started:.2f} s)")
+
+    def analyze(self, cursor):
+        cursor.execute("ANALYZE")
+        return "statistics refreshed"
+
+    def vacuum(self, cursor):
+        name = self.connection.settings_dict['NAME']
+        size = os.path.getsize(name) if os.path.exists(name) else None
+        cursor.execute("VACUUM")
+        if size is None:
+            return "database rebuilt"
+        return f"{size} -> {os.path.getsize(name)} bytes"
+
+    def checkpoint(self, cursor):
+        cursor.execute("PRAGMA journal_mode")
+        if cursor.fetchone()[0].lower() != 'wal':
+            return "database is not in WAL mode"
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        busy, wal_pages, copied = cursor.fetchone()
+        if busy:
+            return f"{copied} of {wal_pages} WAL pages copied; readers kept the rest"
+        return f"{copied} WAL pages copied, WAL truncated"
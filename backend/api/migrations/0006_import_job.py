@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_remove_skola_skolas_nosaukums_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000)),
+                ('state', models.CharField(choices=[('queued', 'Gaida'), ('running', 'Notiek'), ('done', 'Pabeigts'), ('failed', 'Neizdevās')], default='queued', max_length=20)),
+                ('processed_count', models.IntegerField(default=0)),
+                ('created_count', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('detail', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('lietotajs', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importa_darbi', to=settings.AUTH_USER_MODEL)),
+                ('olimpiade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importa_darbi', to='api.olimpiade')),
+            ],
+            options={
+                'verbose_name': 'Importa darbs',
+                'verbose_name_plural': 'Importa darbi',
+                'db_table': 'ImportaDarbi',
+                'indexes': [models.Index(fields=['state', 'created_at'], name='importa_darbi_state_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_data_version'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='olimpiade',
+            index=models.Index(fields=['-datums', '-id'], name='olimpiades_datums_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pieteikums',
+            index=models.Index(fields=['lietotajs', '-pieteikumaDatums', '-id'], name='pieteikumi_lietotajs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pieteikums',
+            index=models.Index(fields=['-pieteikumaDatums', '-id'], name='pieteikumi_datums_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rezultats',
+            index=models.Index(fields=['olimpiade', 'vieta', '-punktuSkaits', '-id'], name='rezultati_vieta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-create_date', '-id'], name='konti_create_date_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:44
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQLite only: other backends fall back to icontains search (api.search)
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE "OlimpiadesMeklesana" USING fts5(
+        nosaukums, norisesVieta, organizetajs, apraksts, prieksmets,
+        tokenize = "unicode61 remove_diacritics 2"
+    )
+    """,
+    """
+    INSERT INTO "OlimpiadesMeklesana"(rowid, nosaukums, norisesVieta, organizetajs, apraksts, prieksmets)
+    SELECT o.id, o.nosaukums, o."norisesVieta", o.organizetajs, COALESCE(o.apraksts, ''), p.nosaukums
+    FROM "Olimpiades" o LEFT JOIN "Prieksmeti" p ON p.id = o.prieksmets_id
+    """,
+    """
+    CREATE TRIGGER "olimpiades_meklesana_ai" AFTER INSERT ON "Olimpiades" BEGIN
+        INSERT INTO "OlimpiadesMeklesana"(rowid, nosaukums, norisesVieta, organizetajs, apraksts, prieksmets)
+        VALUES (NEW.id, NEW.nosaukums, NEW."norisesVieta", NEW.organizetajs, COALESCE(NEW.apraksts, ''),
+                (SELECT nosaukums FROM "Prieksmeti" WHERE id = NEW.prieksmets_id));
+    END
+    """,
+    """
+    CREATE TRIGGER "olimpiades_meklesana_au" AFTER UPDATE ON "Olimpiades" BEGIN
+        DELETE FROM "OlimpiadesMeklesana" WHERE rowid = OLD.id;
+        INSERT INTO "OlimpiadesMeklesana"(rowid, nosaukums, norisesVieta, organizetajs, apraksts, prieksmets)
+        VALUES (NEW.id, NEW.nosaukums, NEW."norisesVieta", NEW.organizetajs, COALESCE(NEW.apraksts, ''),
+                (SELECT nosaukums FROM "Prieksmeti" WHERE id = NEW.prieksmets_id));
+    END
+    """,
+    """
+    CREATE TRIGGER "olimpiades_meklesana_ad" AFTER DELETE ON "Olimpiades" BEGIN
+        DELETE FROM "OlimpiadesMeklesana" WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER "prieksmeti_meklesana_au" AFTER UPDATE OF nosaukums ON "Prieksmeti" BEGIN
+        UPDATE "OlimpiadesMeklesana" SET prieksmets = NEW.nosaukums
+        WHERE rowid IN (SELECT id FROM "Olimpiades" WHERE prieksmets_id = NEW.id);
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS "prieksmeti_meklesana_au"',
+    'DROP TRIGGER IF EXISTS "olimpiades_meklesana_ad"',
+    'DROP TRIGGER IF EXISTS "olimpiades_meklesana_au"',
+    'DROP TRIGGER IF EXISTS "olimpiades_meklesana_ai"',
+    'DROP TABLE IF EXISTS "OlimpiadesMeklesana"',
+]
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OlimpiadeMeklesana',
+            fields=[
+                ('olimpiade', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='meklesana', serialize=False, to='api.olimpiade')),
+                ('dokuments', api.models.SearchDocumentField(db_column='OlimpiadesMeklesana')),
+                ('rank', models.FloatField(db_column='rank')),
+                ('nosaukums', models.TextField()),
+                ('norisesVieta', models.TextField()),
+                ('organizetajs', models.TextField()),
+                ('apraksts', models.TextField()),
+                ('prieksmets', models.TextField()),
+            ],
+            options={
+                'db_table': 'OlimpiadesMeklesana',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:46
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copies of api.search as of this migration, so later edits there cannot
+# change what it writes
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def user_search_values(user):
+    return {
+        'search_email': fold(user.email),
+        'search_name': fold(user.name),
+        'search_last_name': fold(user.last_name),
+        'search_number': re.sub(r'\D', '', user.number or ''),
+    }
+
+
+def fill_search_columns(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    batch = []
+    for user in User.objects.only('id', 'email', 'name', 'last_name', 'number').iterator(chunk_size=1000):
+        for field, value in user_search_values(user).items():
+            setattr(user, field, value)
+        batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.bulk_update(batch, ['search_email', 'search_name', 'search_last_name', 'search_number'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['search_email', 'search_name', 'search_last_name', 'search_number'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_olympiad_search'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_email',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_last_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_number',
+            field=models.CharField(blank=True, default='', editable=False, max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_email'], name='konti_search_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_name'], name='konti_search_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_last_name'], name='konti_search_last_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_number'], name='konti_search_number_idx'),
+        ),
+        migrations.RunPython(fill_search_columns, migrations.RunPython.noop),
+    ]
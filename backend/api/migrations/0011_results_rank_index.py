@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_user_search_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rezultats',
+            index=models.Index(fields=['olimpiade', '-punktuSkaits', 'id'], name='rezultati_punkti_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_results_rank_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='olimpiade',
+            index=models.Index(fields=['prieksmets', '-datums', '-id'], name='olimpiades_prieksmets_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='olimpiade',
+            index=models.Index(fields=['norisesVieta', '-datums', '-id'], name='olimpiades_vieta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='olimpiade',
+            index=models.Index(fields=['nosaukums', 'id'], name='olimpiades_nosaukums_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_olympiad_filter_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='konti_search_email_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='konti_search_name_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', '-create_date', '-id'], name='konti_user_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_email', 'id'], name='konti_search_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_name', 'search_last_name', 'id'], name='konti_search_name_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:28
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+# Pieteikums.SEATED_STATUSES at the time of this migration
+SEATED_STATUSES = ("Reģistrēts", "Apstrādē", "Beidzies")
+
+
+def drop_duplicate_applications(apps, schema_editor):
+    # Keep the first application of each user for each olympiad
+    Pieteikums = apps.get_model('api', 'Pieteikums')
+    duplicates = (
+        Pieteikums.objects.values('lietotajs_id', 'olimpiade_id')
+        .annotate(first_id=Min('id'), n=Count('id')).filter(n__gt=1)
+    )
+    for row in duplicates:
+        Pieteikums.objects.filter(
+            lietotajs_id=row['lietotajs_id'], olimpiade_id=row['olimpiade_id']
+        ).exclude(id=row['first_id']).delete()
+
+
+def seat_count_field(model):
+    field = models.PositiveIntegerField(default=0, editable=False)
+    field.set_attributes_from_name('dalibniekuSkaits')
+    field.model = model
+    return field
+
+
+def add_seat_count(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        # add_field would rebuild the table for a NOT NULL column on SQLite,
+        # dropping the search triggers of migration 0009
+        schema_editor.execute(
+            'ALTER TABLE "Olimpiades" ADD COLUMN "dalibniekuSkaits" integer unsigned NOT NULL DEFAULT 0 '
+            'CHECK ("dalibniekuSkaits" >= 0)'
+        )
+    else:
+        Olimpiade = apps.get_model('api', 'Olimpiade')
+        schema_editor.add_field(Olimpiade, seat_count_field(Olimpiade))
+
+
+def remove_seat_count(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('ALTER TABLE "Olimpiades" DROP COLUMN "dalibniekuSkaits"')
+    else:
+        Olimpiade = apps.get_model('api', 'Olimpiade')
+        schema_editor.remove_field(Olimpiade, seat_count_field(Olimpiade))
+
+
+def count_seats(apps, schema_editor):
+    Olimpiade = apps.get_model('api', 'Olimpiade')
+    Pieteikums = apps.get_model('api', 'Pieteikums')
+    seated = (
+        Pieteikums.objects.filter(statuss__in=SEATED_STATUSES)
+        .values('olimpiade_id').annotate(n=Count('id')).values_list('olimpiade_id', 'n')
+    )
+    for olympiad_id, n in seated:
+        Olimpiade.objects.filter(id=olympiad_id).update(dalibniekuSkaits=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pieteikums',
+            constraint=models.UniqueConstraint(fields=('lietotajs', 'olimpiade'), name='pieteikumi_lietotajs_olimpiade_uniq'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(add_seat_count, remove_seat_count)],
+            state_operations=[
+                migrations.AddField(
+                    model_name='olimpiade',
+                    name='dalibniekuSkaits',
+                    field=models.PositiveIntegerField(default=0, editable=False),
+                ),
+            ],
+        ),
+        migrations.RunPython(count_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# PostgreSQL only: SQLite searches olympiads through FTS5 (migration 0009)
+# and users through B-tree range scans (api.search). pg_trgm and unaccent
+# are trusted extensions, so the database owner can create them.
+CREATE_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    # api.search.fold() in SQL; IMMUTABLE (unaccent() alone is not) so it can be indexed
+    """
+    CREATE OR REPLACE FUNCTION lsos_fold(text) RETURNS text AS $$
+        SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1))
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    'CREATE INDEX "olimpiades_nosaukums_trgm" ON "Olimpiades" USING gin (lsos_fold("nosaukums") gin_trgm_ops)',
+    'CREATE INDEX "olimpiades_vieta_trgm" ON "Olimpiades" USING gin (lsos_fold("norisesVieta") gin_trgm_ops)',
+    'CREATE INDEX "olimpiades_organizetajs_trgm" ON "Olimpiades" USING gin (lsos_fold("organizetajs") gin_trgm_ops)',
+    'CREATE INDEX "olimpiades_apraksts_trgm" ON "Olimpiades" USING gin (lsos_fold("apraksts") gin_trgm_ops)',
+    'CREATE INDEX "prieksmeti_nosaukums_trgm" ON "Prieksmeti" USING gin (lsos_fold("nosaukums") gin_trgm_ops)',
+    # Prefix LIKE on the folded user columns, whatever the database collation
+    'CREATE INDEX "konti_search_email_trgm" ON "Konti" USING gin ("search_email" gin_trgm_ops)',
+    'CREATE INDEX "konti_search_name_trgm" ON "Konti" USING gin ("search_name" gin_trgm_ops)',
+    'CREATE INDEX "konti_search_last_name_trgm" ON "Konti" USING gin ("search_last_name" gin_trgm_ops)',
+    'CREATE INDEX "konti_search_number_trgm" ON "Konti" USING gin ("search_number" gin_trgm_ops)',
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS "konti_search_number_trgm"',
+    'DROP INDEX IF EXISTS "konti_search_last_name_trgm"',
+    'DROP INDEX IF EXISTS "konti_search_name_trgm"',
+    'DROP INDEX IF EXISTS "konti_search_email_trgm"',
+    'DROP INDEX IF EXISTS "prieksmeti_nosaukums_trgm"',
+    'DROP INDEX IF EXISTS "olimpiades_apraksts_trgm"',
+    'DROP INDEX IF EXISTS "olimpiades_organizetajs_trgm"',
+    'DROP INDEX IF EXISTS "olimpiades_vieta_trgm"',
+    'DROP INDEX IF EXISTS "olimpiades_nosaukums_trgm"',
+    'DROP FUNCTION IF EXISTS lsos_fold(text)',
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_application_seats'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_postgresql(CREATE_SQL), run_postgresql(DROP_SQL)),
+    ]
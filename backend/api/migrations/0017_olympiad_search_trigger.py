@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# SQLite only (see 0009). The update trigger listed no columns, so every
+# seat counter UPDATE (api.seats) rewrote the olympiad's FTS5 row inside
+# the registration's write lock; now only the indexed columns fire it.
+TRIGGER_BODY = """
+    BEGIN
+        DELETE FROM "OlimpiadesMeklesana" WHERE rowid = OLD.id;
+        INSERT INTO "OlimpiadesMeklesana"(rowid, nosaukums, norisesVieta, organizetajs, apraksts, prieksmets)
+        VALUES (NEW.id, NEW.nosaukums, NEW."norisesVieta", NEW.organizetajs, COALESCE(NEW.apraksts, ''),
+                (SELECT nosaukums FROM "Prieksmeti" WHERE id = NEW.prieksmets_id));
+    END
+"""
+
+CREATE_SQL = [
+    'DROP TRIGGER IF EXISTS "olimpiades_meklesana_au"',
+    'CREATE TRIGGER "olimpiades_meklesana_au" AFTER UPDATE OF nosaukums, "norisesVieta", organizetajs, '
+    'apraksts, prieksmets_id ON "Olimpiades"' + TRIGGER_BODY,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS "olimpiades_meklesana_au"',
+    'CREATE TRIGGER "olimpiades_meklesana_au" AFTER UPDATE ON "Olimpiades"' + TRIGGER_BODY,
+]
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_postgres_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
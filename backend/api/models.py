@@ -1,6 +1,13 @@
 from django.db import models
+from django.db.models import Lookup
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from . import hashing
+from .search import USER_SEARCH_FIELDS, user_search_values
+
+# Fields carried as JWT claims (api.authentication); changing one bumps token_version
+TOKEN_CLAIM_FIELDS = ('user_type', 'skola_id', 'is_active')
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -25,6 +32,20 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email=email, password=password, **extra_fields)
 
+    def bulk_create(self, objs, *args, **kwargs):
+        # save() is bypassed, so sync the paired fields and search columns here
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        search_fields = [USER_SEARCH_FIELDS[f] for f in fields if f in USER_SEARCH_FIELDS]
+        for obj in objs:
+            obj.refresh_search_fields()
+        return super().bulk_update(objs, list(fields) + search_fields, *args, **kwargs)
+
 
 class Skola(models.Model):
     """Table 3.2 — Skolas"""
@@ -69,9 +90,18 @@ class User(AbstractUser):
 
     create_date = models.DateTimeField(auto_now_add=True)
 
+    # ASCII-folded, lower-cased copies for indexed prefix search (api.search)
+    search_email = models.CharField(max_length=254, blank=True, default='', editable=False)
+    search_name = models.CharField(max_length=100, blank=True, default='', editable=False)
+    search_last_name = models.CharField(max_length=100, blank=True, default='', editable=False)
+    search_number = models.CharField(max_length=30, blank=True, default='', editable=False)
+
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
 
+    # Tokens issued before the last role, school or activation change are stale
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
@@ -81,8 +111,79 @@ class User(AbstractUser):
         db_table = 'Konti'
         verbose_name = 'Konts'
         verbose_name_plural = 'Konti'
-
-    def save(self, *args, **kwargs):
+        indexes = [
+            # Keyset pagination of the admin user list, per ?ordering= key (api.filters)
+            models.Index(fields=['-create_date', '-id'], name='konti_create_date_idx'),
+            models.Index(fields=['user_type', '-create_date', '-id'], name='konti_user_type_idx'),
+            # Prefix search, and name / e-mail ordering
+            models.Index(fields=['search_email', 'id'], name='konti_search_email_idx'),
+            models.Index(fields=['search_name', 'search_last_name', 'id'], name='konti_search_name_idx'),
+            models.Index(fields=['search_last_name'], name='konti_search_last_name_idx'),
+            models.Index(fields=['search_number'], name='konti_search_number_idx'),
+        ]
+
+    # Claim values as loaded (see from_db) and whether the rest of the row is deferred
+    _claims_as = {}
+    _from_claims = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Claim values as loaded, so save() can tell when issued tokens go stale
+        instance._claims_as = {
+            field: instance.__dict__[field] for field in TOKEN_CLAIM_FIELDS if field in instance.__dict__
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # A user built from token claims loads every deferred field in the
+        # query for the first one a view reads, not one query per field
+        if fields is not None and self._from_claims:
+            self._from_claims = False
+            fields = set(fields) | self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def stale_claims(self, update_fields=None):
+        """Claim fields changed since load that this save would write"""
+        changed = [field for field, value in self._claims_as.items() if getattr(self, field) != value]
+        if update_fields is not None:
+            changed = [
+                field for field in changed
+                if field in update_fields or field.removesuffix('_id') in update_fields
+            ]
+        return changed
+
+    def set_password(self, raw_password):
+        # Hashed on the bounded pool in api.hashing
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        is_correct, must_update = hashing.verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.upgrade_password(raw_password)
+        return is_correct
+
+    async def acheck_password(self, raw_password):
+        is_correct, must_update = await hashing.averify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.password = await hashing.amake_password(raw_password)
+            await self.asave(update_fields=['password'])
+        return is_correct
+
+    def upgrade_password(self, raw_password):
+        """Re-hash with the active hasher profile after a successful login"""
+        self.set_password(raw_password)
+        # Not a password change, as in AbstractBaseUser.check_password()
+        self._password = None
+        self.save(update_fields=['password'])
+
+    def refresh_search_fields(self):
+        for field, value in user_search_values(self).items():
+            setattr(self, field, value)
+
+    def sync_fields(self):
+        """Fill the Latvian / English field pairs and search columns from each other"""
         # Sync fields for backward compatibility
         if not self.vards and self.name:
             self.vards = self.name
@@ -110,8 +211,22 @@ class User(AbstractUser):
             self.izveidosanasDatums = timezone.now().date()
         elif not self.izveidosanasDatums and self.create_date:
             self.izveidosanasDatums = self.create_date.date()
+
+        self.refresh_search_fields()
+
+    def save(self, *args, **kwargs):
+        self.sync_fields()
+        update_fields = kwargs.get('update_fields')
+        stale = not self._state.adding and self.stale_claims(update_fields)
+        if stale:
+            self.token_version += 1
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                USER_SEARCH_FIELDS[f] for f in update_fields if f in USER_SEARCH_FIELDS
+            } | ({'token_version'} if stale else set())
             
         super().save(*args, **kwargs)
+        self._claims_as = {field: getattr(self, field) for field in TOKEN_CLAIM_FIELDS}
 
     def __str__(self):
         return self.email
@@ -136,6 +251,8 @@ class Olimpiade(models.Model):
     nosaukums = models.CharField(max_length=100)
     datums = models.DateField()
     maxDalibnieki = models.IntegerField(null=True, blank=True)
+    # Applications holding a seat; maintained by api.seats, never by save()
+    dalibniekuSkaits = models.PositiveIntegerField(default=0, editable=False)
     apraksts = models.CharField(max_length=250, blank=True, null=True)
     norisesVieta = models.CharField(max_length=100)
     organizetajs = models.CharField(max_length=50)
@@ -146,13 +263,73 @@ class Olimpiade(models.Model):
         db_table = 'Olimpiades'
         verbose_name = 'Olimpiāde'
         verbose_name_plural = 'Olimpiādes'
+        indexes = [
+            models.Index(fields=['-datums', '-id'], name='olimpiades_datums_idx'),
+            # ?prieksmets= / ?norisesVieta= filters, read in date order
+            models.Index(fields=['prieksmets', '-datums', '-id'], name='olimpiades_prieksmets_idx'),
+            models.Index(fields=['norisesVieta', '-datums', '-id'], name='olimpiades_vieta_idx'),
+            models.Index(fields=['nosaukums', 'id'], name='olimpiades_nosaukums_idx'),
+        ]
 
     def __str__(self):
         return self.nosaukums
 
+    def save(self, *args, **kwargs):
+        # A full save of a loaded olympiad must not write back a stale seat count
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields() | {'dalibniekuSkaits'}
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class SearchDocumentField(models.TextField):
+    """Hidden FTS5 column named after its table; supports ``__match``"""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class OlimpiadeMeklesana(models.Model):
+    """OLYMP_004: SQLite FTS5 index over olympiads and their subject name.
+
+    The virtual table and the triggers that keep it in sync with Olimpiades
+    and Prieksmeti are created by migration 0009; Django never writes to it.
+    """
+    olimpiade = models.OneToOneField(
+        Olimpiade, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='meklesana'
+    )
+    dokuments = SearchDocumentField(db_column='OlimpiadesMeklesana')
+    rank = models.FloatField(db_column='rank')
+    nosaukums = models.TextField()
+    norisesVieta = models.TextField()
+    organizetajs = models.TextField()
+    apraksts = models.TextField()
+    prieksmets = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'OlimpiadesMeklesana'
+
 
 class Pieteikums(models.Model):
     """Table 3.3 — Pieteikumi"""
+    REGISTERED = "Reģistrēts"
+    APPROVED = "Apstrādē"
+    REJECTED = "Atteikts"
+    ENDED = "Beidzies"
+    WAITLISTED = "Gaidīšanas sarakstā"
+    # Statuses that take one of the olympiad's maxDalibnieki seats
+    SEATED_STATUSES = (REGISTERED, APPROVED, ENDED)
+
     statuss = models.CharField(max_length=50)
     pieteikumaDatums = models.DateField(auto_now_add=True)
     lietotajs = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pieteikumi')
@@ -162,10 +339,32 @@ class Pieteikums(models.Model):
         db_table = 'Pieteikumi'
         verbose_name = 'Pieteikums'
         verbose_name_plural = 'Pieteikumi'
+        indexes = [
+            models.Index(fields=['lietotajs', '-pieteikumaDatums', '-id'], name='pieteikumi_lietotajs_idx'),
+            models.Index(fields=['-pieteikumaDatums', '-id'], name='pieteikumi_datums_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['lietotajs', 'olimpiade'], name='pieteikumi_lietotajs_olimpiade_uniq'),
+        ]
+
+    # Seat as last saved or loaded, and whether the caller already counted it (api.seats)
+    _seated_as = None
+    _seat_counted = False
 
     def __str__(self):
         return f"{self.lietotajs.email} - {self.olimpiade.nosaukums}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if instance.__dict__.get('statuss') in cls.SEATED_STATUSES:
+            instance._seated_as = instance.__dict__.get('olimpiade_id')
+        return instance
+
+    def seated_in(self):
+        """Id of the olympiad whose seat this application holds, or None"""
+        return self.olimpiade_id if self.statuss in self.SEATED_STATUSES else None
+
 
 class Rezultats(models.Model):
     """Table 3.7 — Rezultati"""
@@ -179,10 +378,22 @@ class Rezultats(models.Model):
         db_table = 'Rezultati'
         verbose_name = 'Rezultāts'
         verbose_name_plural = 'Rezultāti'
+        indexes = [
+            models.Index(fields=['olimpiade', 'vieta', '-punktuSkaits', '-id'], name='rezultati_vieta_idx'),
+            # Range re-ranking scans one olympiad's scores from the top
+            models.Index(fields=['olimpiade', '-punktuSkaits', 'id'], name='rezultati_punkti_idx'),
+        ]
 
     def __str__(self):
         return f"{self.olimpiade.nosaukums} - {self.vieta}. vieta"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded score, so a later save only re-ranks the range it affects (api.ranking)
+        instance._ranked_as = (instance.__dict__.get('olimpiade_id'), instance.__dict__.get('punktuSkaits'))
+        return instance
+
 
 class SkolasStarp(models.Model):
     """Table 3.4 — SkolasStarp (Many-to-Many relationship)"""
@@ -197,3 +408,53 @@ class SkolasStarp(models.Model):
 
     def __str__(self):
         return f"{self.skolas.nosaukums} - {self.olimpiades.nosaukums}"
+
+
+class ImportJob(models.Model):
+    """RES_004: Background results import from a URL"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = (
+        (QUEUED, "Gaida"),
+        (RUNNING, "Notiek"),
+        (DONE, "Pabeigts"),
+        (FAILED, "Neizdevās"),
+    )
+
+    olimpiade = models.ForeignKey(Olimpiade, on_delete=models.CASCADE, related_name='importa_darbi')
+    lietotajs = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='importa_darbi')
+    url = models.URLField(max_length=2000)
+    state = models.CharField(max_length=20, choices=STATES, default=QUEUED)
+    processed_count = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    detail = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ImportaDarbi'
+        verbose_name = 'Importa darbs'
+        verbose_name_plural = 'Importa darbi'
+        indexes = [models.Index(fields=['state', 'created_at'], name='importa_darbi_state_idx')]
+
+    def __str__(self):
+        return f"{self.olimpiade.nosaukums} - {self.state}"
+
+
+class DataVersion(models.Model):
+    """Change counter per table or per row group, used for ETags and cache keys"""
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'DatuVersijas'
+        verbose_name = 'Datu versija'
+        verbose_name_plural = 'Datu versijas'
+
+    def __str__(self):
+        return f"{self.key}={self.version}"
@@ -0,0 +1,150 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pagination is opt-in: a list is paginated when the request carries
+``page_size`` or ``cursor``, so existing clients that expect a plain array
+keep working. The cursor stores the sort key of the last row seen and the
+next page is fetched with ``WHERE (sort key) > (cursor)``, so page N costs
+the same as page 1 as long as the ordering is backed by an index.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    # ?count=approx adds a count that stops at approx_count_limit
+    count_query_param = 'count'
+    approx_count_limit = 1000
+    invalid_cursor_message = 'Nederīgs kursors'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        # Keyed on the view's own ordering, with the primary key as tie-breaker
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*(('-' if desc else '') + field for field, desc in self.ordering))
+
+        self.count = None
+        if params.get(self.count_query_param) == 'approx':
+            self.count = self.get_approximate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+        if cursor:
+            try:
+                queryset = queryset.filter(self.keyset_filter(cursor['values'], reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        if reverse:
+            queryset = queryset.reverse()
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = []
+        for field in queryset.query.order_by or ('-pk',):
+            if not isinstance(field, str):
+                raise TypeError("KeysetPagination supports plain field orderings only")
+            desc = field.startswith('-')
+            field = field.lstrip('-')
+            if field in ('id', 'pk'):
+                field = 'pk'
+            ordering.append((field, desc))
+        if not any(field == 'pk' for field, _ in ordering):
+            ordering.append(('pk', ordering[-1][1]))
+        return ordering
+
+    def keyset_filter(self, values, reverse):
+        """Rows strictly after ``values`` in the ordering (before, when paging back)"""
+        condition = Q()
+        for i, (field, desc) in enumerate(self.ordering):
+            lookup = 'lt' if desc != reverse else 'gt'
+            equal = {name: value for (name, _), value in zip(self.ordering[:i], values[:i])}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[i]})
+        return condition
+
+    def get_approximate_count(self, queryset):
+        # COUNT over a LIMITed subquery: never scans more than the limit
+        count = queryset.order_by()[:self.approx_count_limit + 1].count()
+        return min(count, self.approx_count_limit), count <= self.approx_count_limit
+
+    def position(self, obj):
+        values = []
+        for field, _ in self.ordering:
+            value = obj
+            for name in field.split('__'):
+                value = getattr(value, name)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            values.append(value)
+        return values
+
+    def encode_cursor(self, obj, reverse):
+        payload = json.dumps({'v': self.position(obj), 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(values, list) or len(values) != len(self.ordering)
+                or any(isinstance(value, (list, dict)) for value in values)):
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'reverse': reverse}
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload['count'], payload['count_exact'] = self.count
+        payload['results'] = data
+        return Response(payload)
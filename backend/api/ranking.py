@@ -0,0 +1,110 @@
+"""RES_002: Places (Rezultats.vieta) derived from punktuSkaits per olympiad.
+
+Ranks are written by a single ``UPDATE ... FROM`` over a window function,
+and only rows whose place actually changes are written. A single insert,
+edit or delete re-ranks just the score range it can affect:
+
+* rows scoring above the highest touched score never move;
+* after an edit from ``old`` to ``new``, rows below both scores keep their
+  place too, except under the dense policy, where a score value appearing
+  or disappearing shifts everything below it.
+
+Tie policies, for scores 90, 80, 80, 70:
+
+* ``competition`` -- 1, 2, 2, 4 (default)
+* ``dense``       -- 1, 2, 2, 3
+* ``ordinal``     -- 1, 2, 3, 4 (ties in entry order)
+"""
+from django.conf import settings
+from django.db import connection
+
+from .models import Rezultats
+
+COMPETITION = 'competition'
+DENSE = 'dense'
+ORDINAL = 'ordinal'
+
+RANK_WINDOWS = {
+    COMPETITION: "RANK() OVER (ORDER BY {points} DESC)",
+    DENSE: "DENSE_RANK() OVER (ORDER BY {points} DESC)",
+    ORDINAL: "ROW_NUMBER() OVER (ORDER BY {points} DESC, {pk})",
+}
+
+
+def get_tie_policy(policy=None):
+    policy = policy or getattr(settings, 'RESULTS_TIE_POLICY', COMPETITION)
+    if policy not in RANK_WINDOWS:
+        raise ValueError(f"Unknown tie policy: {policy!r}")
+    return policy
+
+
+def rank_results(olympiad_id, policy=None, low=None, high=None):
+    """Recompute places for one olympiad; returns how many rows changed.
+
+    Only rows scoring at least ``low`` take part in the ranking (a row's
+    place depends only on rows scoring at least as much) and only rows
+    scoring at most ``high`` are written. Both default to the whole table.
+    """
+    qn = connection.ops.quote_name
+    opts = Rezultats._meta
+    table = qn(opts.db_table)
+    pk = qn(opts.pk.column)
+    points = qn(opts.get_field('punktuSkaits').column)
+    vieta = qn(opts.get_field('vieta').column)
+    olimpiade = qn(opts.get_field('olimpiade').column)
+    window = RANK_WINDOWS[get_tie_policy(policy)].format(points=points, pk=pk)
+
+    ranked_where = [f"{olimpiade} = %s"]
+    params = [olympiad_id]
+    if low is not None:
+        ranked_where.append(f"{points} >= %s")
+        params.append(low)
+    where = [f"{table}.{pk} = ranked.id", f"{table}.{vieta} <> ranked.place"]
+    if high is not None:
+        where.append(f"{table}.{points} <= %s")
+        params.append(high)
+
+    sql = (
+        f"UPDATE {table} SET {vieta} = ranked.place "
+        f"FROM (SELECT {pk} AS id, {window} AS place FROM {table} "
+        f"WHERE {' AND '.join(ranked_where)}) AS ranked "
+        f"WHERE {' AND '.join(where)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def rerank_saved(result, created, policy=None):
+    """Re-rank after ``result`` was saved; returns the ids of olympiads touched.
+
+    Uses the score the instance was loaded with (see Rezultats.from_db) to
+    bound the update, and falls back to a full re-rank when it is unknown.
+    """
+    policy = get_tie_policy(policy)
+    olympiad_id, points = result.olimpiade_id, result.punktuSkaits
+    previous_olympiad, previous_points = getattr(result, '_ranked_as', (None, None))
+    touched = {olympiad_id}
+
+    if created:
+        changed = rank_results(olympiad_id, policy, high=points)
+    elif previous_olympiad is None or previous_points is None:
+        changed = rank_results(olympiad_id, policy)
+    elif previous_olympiad != olympiad_id:
+        # Moved between olympiads: a delete from one, an insert into the other
+        rank_results(previous_olympiad, policy, high=previous_points)
+        touched.add(previous_olympiad)
+        changed = rank_results(olympiad_id, policy, high=points)
+    else:
+        low, high = sorted((previous_points, points))
+        changed = rank_results(olympiad_id, policy, low=None if policy == DENSE else low, high=high)
+
+    result._ranked_as = (olympiad_id, points)
+    if changed:
+        result.vieta = Rezultats.objects.filter(pk=result.pk).values_list('vieta', flat=True).first()
+    return touched
+
+
+def rerank_deleted(result, policy=None):
+    """Close the gap left by a deleted result"""
+    return rank_results(result.olimpiade_id, policy, high=result.punktuSkaits)
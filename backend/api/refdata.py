@@ -0,0 +1,85 @@
+"""In-process cache of rendered reference lists (subjects, schools).
+
+Prieksmets and Skola change a few times a year but are listed by almost
+every page. Each process keeps the rendered JSON body of those lists, so a
+hit runs neither a query nor a serializer:
+
+* saves and deletes in this process drop the copy at once (api.signals);
+* other processes' writes are noticed through the shared DatuVersijas
+  stamp, which is re-read at most every REFERENCE_DATA_RECHECK_SECONDS.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from .versioning import ConditionalGetMixin, get_versions
+
+RenderedList = namedtuple('RenderedList', 'versions last_modified body checked_at')
+
+_entries = {}
+_render_lock = threading.Lock()
+
+
+def recheck_interval():
+    return getattr(settings, 'REFERENCE_DATA_RECHECK_SECONDS', 5)
+
+
+def invalidate(version_key):
+    """Drop every cached list that depends on ``version_key``"""
+    for keys in list(_entries):
+        if version_key in keys:
+            _entries.pop(keys, None)
+
+
+def clear():
+    _entries.clear()
+
+
+def get_rendered(keys, render):
+    """Cached ``render()`` body for the given version keys"""
+    keys = tuple(keys)
+    entry = _entries.get(keys)
+    if entry and time.monotonic() - entry.checked_at < recheck_interval():
+        return entry
+
+    with _render_lock:
+        # Versions first: a write racing with render() only costs a re-render
+        versions, last_modified = get_versions(keys)
+        entry = _entries.get(keys)
+        if entry and entry.versions == versions:
+            entry = entry._replace(checked_at=time.monotonic())
+        else:
+            entry = RenderedList(versions, last_modified, render(), time.monotonic())
+        _entries[keys] = entry
+        return entry
+
+
+class ReferenceDataMixin(ConditionalGetMixin):
+    """Serve the plain JSON list from the reference cache.
+
+    Requests with query parameters (search, pagination) or asking for
+    another format take the normal ConditionalGetMixin path.
+    """
+
+    def use_reference_cache(self, request):
+        return not request.query_params and request.accepted_renderer.format == 'json'
+
+    def render_reference(self):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return JSONRenderer().render(serializer.data)
+
+    def get_data_versions(self, request):
+        self.reference_entry = None
+        if not self.use_reference_cache(request):
+            return super().get_data_versions(request)
+        self.reference_entry = get_rendered(self.get_version_keys(), self.render_reference)
+        return self.reference_entry.versions, self.reference_entry.last_modified
+
+    def get_fresh_response(self, request, *args, **kwargs):
+        if self.reference_entry is None:
+            return super().get_fresh_response(request, *args, **kwargs)
+        return HttpResponse(self.reference_entry.body, content_type='application/json')
@@ -0,0 +1,120 @@
+"""Read replica routing (READ_REPLICAS).
+
+ReplicaRoutingMiddleware picks the database a request reads from: GET,
+HEAD and OPTIONS requests to API views read from a randomly chosen replica,
+except for a user who wrote within the last READ_YOUR_WRITES_SECONDS, whose
+reads stay on the primary so they see their own changes. The client carries
+that pin: a successful write answers with a signed X-Read-Primary header,
+which the frontend sends back on its next requests, so the pin holds whichever
+worker process serves them. Other requests,
+views with ``read_from_primary = True`` and anything outside a request
+(management commands, the admin, background import jobs) read from the
+primary. ReplicaRouter sends every write to the primary.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_HEADER = 'X-Read-Primary'
+PIN_SALT = 'api.replicas.read-primary'
+
+# Database the current request reads from; None means the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'READ_REPLICAS', ())
+
+
+def pin_to_primary(user_id):
+    """Signed X-Read-Primary value serving the user's reads from the primary"""
+    return signing.TimestampSigner(salt=PIN_SALT).sign(str(user_id))
+
+
+def is_pinned(request, user_id):
+    """The request carries the user's X-Read-Primary from the last READ_YOUR_WRITES_SECONDS"""
+    value = request.headers.get(PIN_HEADER)
+    if not value:
+        return False
+    try:
+        pinned_id = signing.TimestampSigner(salt=PIN_SALT).unsign(
+            value, max_age=getattr(settings, 'READ_YOUR_WRITES_SECONDS', 10))
+    except signing.BadSignature:  # also expired
+        return False
+    return pinned_id == str(user_id)
+
+
+def request_user_id(request):
+    """User id from the request's access token, or None; the view still authenticates"""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return auth.get_validated_token(raw_token)[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF sets the authenticated user on the Django request too
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                response[PIN_HEADER] = pin_to_primary(user.pk)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        replicas = get_replicas()
+        view_class = getattr(view_func, 'cls', None)  # DRF views only
+        if not replicas or view_class is None or getattr(view_class, 'read_from_primary', False):
+            return None
+        if request.method not in SAFE_METHODS:
+            return None
+        user_id = request_user_id(request)
+        if user_id is not None and is_pinned(request, user_id):
+            return None
+        _read_alias.set(random.choice(replicas))
+        return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Related rows come from where the instance was loaded
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,134 @@
+"""Olympiad (OLYMP_004) and user search.
+
+On SQLite the olympiad ``?search=`` term is answered from the FTS5 table
+OlimpiadesMeklesana: every word is matched as a prefix, diacritics are
+ignored and results are ordered by relevance. On PostgreSQL every word must
+occur in one of the folded text fields (lsos_fold(), migration 0016), which
+the trigram GIN indexes answer; olympiads matching in more fields come
+first. Other backends use the original icontains filters.
+
+Users are searched through ASCII-folded, lower-cased copies of their
+e-mail, name, last name and phone number kept on the Konti table. Every
+word must be a prefix of one of them: an indexed range scan on SQLite, a
+LIKE 'prefix%' answered by the trigram indexes on PostgreSQL.
+"""
+import re
+import unicodedata
+from functools import reduce
+from operator import add, or_
+
+from django.db import connection
+from django.db.models import Case, F, Func, IntegerField, Q, TextField, Value, When
+
+WORD_RE = re.compile(r'\w+')
+
+# Olympiad columns searched on PostgreSQL; the subject name is matched separately
+OLYMPIAD_SEARCH_FIELDS = ('nosaukums', 'norisesVieta', 'organizetajs', 'apraksts')
+
+
+class Fold(Func):
+    """fold() in SQL (PostgreSQL, migration 0016)"""
+    function = 'lsos_fold'
+    output_field = TextField()
+
+
+def build_match_query(term):
+    """'matem rīg' -> '"matem"* "rīg"*' (all words, each as a prefix)"""
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(term))
+
+
+def search_olympiads(queryset, term):
+    if connection.vendor == 'postgresql' and WORD_RE.search(term):
+        return search_olympiads_trigram(queryset, term)
+    match_query = build_match_query(term)
+    if connection.vendor != 'sqlite' or not match_query:
+        return queryset.filter(
+            Q(nosaukums__icontains=term) |
+            Q(norisesVieta__icontains=term) |
+            Q(organizetajs__icontains=term) |
+            Q(prieksmets__nosaukums__icontains=term)
+        )
+    # bm25 rank: lower is more relevant
+    return queryset.filter(meklesana__dokuments__match=match_query).annotate(
+        relevance=F('meklesana__rank')
+    ).order_by('relevance', '-datums')
+
+
+def search_olympiads_trigram(queryset, term):
+    from .models import Prieksmets
+
+    words = WORD_RE.findall(fold(term))
+    columns = {f'search_{i}': Fold(field) for i, field in enumerate(OLYMPIAD_SEARCH_FIELDS)}
+    queryset = queryset.alias(**columns)
+
+    # The few subjects are matched here, so the condition on "Olimpiades" is
+    # prieksmets_id IN (...): an OR over a joined column would rule out the
+    # BitmapOr of the trigram indexes and scan the whole table
+    subjects = [(pk, fold(name)) for pk, name in Prieksmets.objects.values_list('pk', 'nosaukums')]
+
+    def matches(word):
+        condition = reduce(or_, (Q(**{f'{column}__contains': word}) for column in columns))
+        subject_ids = [pk for pk, name in subjects if word in name]
+        return condition | Q(prieksmets_id__in=subject_ids) if subject_ids else condition
+
+    for word in words:
+        queryset = queryset.filter(matches(word))
+    # Negated, so that lower is more relevant as with bm25 on SQLite
+    conditions = [reduce(or_, (Q(**{f'{column}__contains': word}) for word in words)) for column in columns]
+    subject_ids = [pk for pk, name in subjects if any(word in name for word in words)]
+    if subject_ids:
+        conditions.append(Q(prieksmets_id__in=subject_ids))
+    matched_fields = [
+        Case(When(condition, then=Value(-1)), default=Value(0), output_field=IntegerField())
+        for condition in conditions
+    ]
+    return queryset.annotate(relevance=reduce(add, matched_fields)).order_by('relevance', '-datums')
+
+
+# Source field -> folded search column on User
+USER_SEARCH_FIELDS = {
+    'email': 'search_email',
+    'name': 'search_name',
+    'last_name': 'search_last_name',
+    'number': 'search_number',
+}
+
+
+def fold(text):
+    """'Bērziņš' -> 'berzins': strip diacritics and lower-case"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def fold_number(number):
+    return re.sub(r'\D', '', number or '')
+
+
+def user_search_values(user):
+    return {
+        'search_email': fold(user.email),
+        'search_name': fold(user.name),
+        'search_last_name': fold(user.last_name),
+        'search_number': fold_number(user.number),
+    }
+
+
+def prefix_q(column, prefix):
+    """column LIKE 'prefix%' written as a range, so a plain B-tree index is used"""
+    if connection.vendor == 'postgresql':
+        # Ranges follow the database collation there; LIKE uses the trigram index
+        return Q(**{f'{column}__startswith': prefix})
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{column}__gte': prefix, f'{column}__lt': upper})
+
+
+def search_users(queryset, term, fields=('email', 'name', 'last_name', 'number')):
+    for word in fold(term).split():
+        condition = Q()
+        for field in fields:
+            value = fold_number(word) if field == 'number' else word
+            if value:
+                condition |= prefix_q(USER_SEARCH_FIELDS[field], value)
+        if condition:
+            queryset = queryset.filter(condition)
+    return queryset
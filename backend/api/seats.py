@@ -0,0 +1,134 @@
+"""Olympiad capacity (maxDalibnieki) and the waiting list.
+
+Olimpiade.dalibniekuSkaits counts the applications that hold a seat
+(Pieteikums.SEATED_STATUSES). A seat is taken with one conditional UPDATE of
+that counter, so concurrent registrations can never push it past
+maxDalibnieki and no COUNT(*) over Pieteikumi is needed. Registrations past
+the limit go on the waiting list; a freed seat goes to the oldest waiting
+application.
+
+Registration and the status views take seats with take_seat(). Any other
+save or delete of an application (admin, cascades, fixtures) is counted
+afterwards by the post_save/post_delete handlers in api.signals.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .models import Olimpiade, Pieteikums
+from .versioning import bump_versions, user_key, APPLICATIONS
+
+NO_FREE_SEATS = "Olimpiādē nav brīvu vietu"
+
+HAS_ROOM = Q(maxDalibnieki__isnull=True) | Q(dalibniekuSkaits__lt=F('maxDalibnieki'))
+
+
+def take_seat(olympiad_id):
+    """Count one more seat if the olympiad has room; False when it is full"""
+    return bool(
+        Olimpiade.objects.filter(HAS_ROOM, pk=olympiad_id)
+        .update(dalibniekuSkaits=F('dalibniekuSkaits') + 1)
+    )
+
+
+def add_seats(olympiad_id, count):
+    """Count seats taken (or, negative, freed) without checking the limit"""
+    Olimpiade.objects.filter(pk=olympiad_id).update(
+        dalibniekuSkaits=Greatest(F('dalibniekuSkaits') + count, 0)
+    )
+
+
+def promote_waiting(olympiad_id, exclude=()):
+    """Register the oldest waiting application; its id, or None if nobody waits"""
+    waiting = (
+        Pieteikums.objects.filter(olimpiade_id=olympiad_id, statuss=Pieteikums.WAITLISTED)
+        .exclude(pk__in=exclude).order_by('pk').values_list('pk', 'lietotajs_id')
+    )
+    while True:
+        candidate = waiting.first()
+        if candidate is None:
+            return None
+        pk, user_id = candidate
+        # Conditional, so two transactions freeing seats never promote the same row
+        if Pieteikums.objects.filter(pk=pk, statuss=Pieteikums.WAITLISTED).update(statuss=Pieteikums.REGISTERED):
+            # update() sends no post_save
+            bump_versions(APPLICATIONS, user_key(user_id))
+            return pk
+
+
+def fill_seats(olympiad_id, exclude=()):
+    """Give free seats to waiting applications; returns the promoted ids"""
+    promoted = []
+    waiting = Pieteikums.objects.filter(olimpiade_id=olympiad_id, statuss=Pieteikums.WAITLISTED).exclude(pk__in=exclude)
+    with transaction.atomic():
+        while waiting.exists() and take_seat(olympiad_id):
+            pk = promote_waiting(olympiad_id, exclude)
+            if pk is None:
+                add_seats(olympiad_id, -1)
+                break
+            promoted.append(pk)
+    return promoted
+
+
+def release_seats(olympiad_id, count=1, exclude=()):
+    """Free ``count`` seats and hand them to the waiting list"""
+    with transaction.atomic():
+        add_seats(olympiad_id, -count)
+        return fill_seats(olympiad_id, exclude)
+
+
+def register(user, olympiad):
+    """Create ``user``'s application for ``olympiad``.
+
+    The application is registered if a seat is free and waits otherwise.
+    Returns None when the user already has an application for the olympiad.
+    """
+    try:
+        with transaction.atomic():
+            # The seat UPDATE comes first, so on SQLite the transaction takes
+            # the write lock before reading anything and waits instead of failing
+            seated = take_seat(olympiad.pk)
+            application = Pieteikums(
+                lietotajs=user,
+                olimpiade=olympiad,
+                statuss=Pieteikums.REGISTERED if seated else Pieteikums.WAITLISTED,
+            )
+            application._seat_counted = True
+            application.save(force_insert=True)
+    except IntegrityError:
+        # (lietotajs, olimpiade) is unique; the seat is rolled back with the insert.
+        # Any other failure, e.g. the olympiad deleted meanwhile, is not a duplicate
+        if Pieteikums.objects.filter(lietotajs=user, olimpiade=olympiad).exists():
+            return None
+        raise
+    return application
+
+
+def set_status(application, status):
+    """Save a new status; False, with nothing saved, if it needs a seat and none is free"""
+    with transaction.atomic():
+        if application._seated_as is None and status in Pieteikums.SEATED_STATUSES:
+            if not take_seat(application.olimpiade_id):
+                return False
+            application._seat_counted = True
+        application.statuss = status
+        application.save()
+    return True
+
+
+def application_saved(application, created):
+    """Count the seat change of a save that did not go through take_seat()"""
+    before = None if created else application._seated_as
+    after = application.seated_in()
+    if before != after and not application._seat_counted:
+        if after is not None:
+            add_seats(after, 1)
+        if before is not None:
+            release_seats(before, exclude=[application.pk])
+    application._seated_as = after
+    application._seat_counted = False
+
+
+def application_deleted(application):
+    if application._seated_as is not None:
+        release_seats(application._seated_as)
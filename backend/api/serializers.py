@@ -1,6 +1,10 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import User, Skola, Olimpiade, Prieksmets, Pieteikums, Rezultats
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import add_permission_claims
+from .models import User, Skola, Olimpiade, Prieksmets, Pieteikums, Rezultats, ImportJob
+from .leaderboard import participant_name, percentage, NO_PARTICIPANT
 import re
 
 
@@ -161,6 +165,45 @@ class AdminUserSerializer(serializers.ModelSerializer):
         return instance
 
 
+class BulkUserRowSerializer(AdminUserSerializer):
+    """One row of a bulk enrollment (api.enrollment).
+
+    E-mails and schools are checked against the sets in context
+    ('taken_emails', 'school_ids'), each loaded once for the whole batch,
+    instead of with a query per row.
+    """
+    password = serializers.CharField(write_only=True)
+    skola = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(AdminUserSerializer.Meta):
+        fields = ['email', 'password', 'name', 'last_name', 'number', 'user_type', 'skola']
+        extra_kwargs = {
+            **AdminUserSerializer.Meta.extra_kwargs,
+            # No UniqueValidator: it would query per row
+            'email': {'required': True, 'validators': []},
+        }
+
+    def validate_email(self, value):
+        value = User.objects.normalize_email(value)
+        if value in self.context['taken_emails']:
+            raise serializers.ValidationError("E-pasts jau tiek izmantots citam profilam")
+        return value
+
+    def validate_skola(self, value):
+        if value is not None and value not in self.context['school_ids']:
+            raise serializers.ValidationError("Skola nav atrasta")
+        return value
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if user.user_type == 'teacher':
+            # Teachers enroll users into their own school
+            if attrs.get('skola') not in (None, user.skola_id):
+                raise serializers.ValidationError({"skola": "Jums nav tiesību pievienot lietotājus šai skolai"})
+            attrs['skola'] = user.skola_id
+        return super().validate(attrs)
+
+
 class PasswordChangeSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True, write_only=True)
     new_password = serializers.CharField(required=True, write_only=True, min_length=8)
@@ -184,6 +227,22 @@ class PasswordChangeSerializer(serializers.Serializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'
 
+    @classmethod
+    def get_token(cls, user):
+        # Copied into the access token, so permission checks need no user query
+        return add_permission_claims(super().get_token(user), user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        # The refresh token may predate a role or school change
+        access = add_permission_claims(refresh.access_token, user)
+        return {'access': str(access)}
+
 
 class SkolaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -231,18 +290,30 @@ class RezultatsSerializer(serializers.ModelSerializer):
     lietotajs_name = serializers.SerializerMethodField()
     lietotajs_email = serializers.CharField(source='lietotajs.email', read_only=True)
     olimpiade_nosaukums = serializers.CharField(source='olimpiade.nosaukums', read_only=True)
+    percentage = serializers.SerializerMethodField()
     
     class Meta:
         model = Rezultats
         fields = ['id', 'olimpiade', 'punktuSkaits', 'vieta', 'rezultataDatums', 'lietotajs',
-                  'lietotajs_name', 'lietotajs_email', 'olimpiade_nosaukums']
-        read_only_fields = ['id', 'olimpiade_nosaukums', 'lietotajs_name', 'lietotajs_email']
+                  'lietotajs_name', 'lietotajs_email', 'olimpiade_nosaukums', 'percentage']
+        # vieta is derived from the scores (api.ranking)
+        read_only_fields = ['id', 'vieta', 'olimpiade_nosaukums', 'lietotajs_name', 'lietotajs_email', 'percentage']
     
     def get_lietotajs_name(self, obj):
         if obj.lietotajs:
-            name = obj.lietotajs.name or ""
-            last_name = obj.lietotajs.last_name or ""
-            full_name = f"{name} {last_name}".strip()
-            return full_name if full_name else obj.lietotajs.email
-        return "Nav norādīts"
-        
\ No newline at end of file
+            return participant_name(obj.lietotajs.name, obj.lietotajs.last_name, obj.lietotajs.email)
+        return NO_PARTICIPANT
+
+    def get_percentage(self, obj):
+        # Relative to the olympiad's best score, passed in by the view
+        return percentage(obj.punktuSkaits, self.context.get('max_points'))
+        
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.IntegerField(source='id', read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = ['job_id', 'olimpiade', 'url', 'state', 'processed_count', 'created_count',
+                  'errors', 'detail', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
@@ -0,0 +1,96 @@
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from . import refdata, seats
+from .authentication import forget_token_state
+from .models import User, Skola, Prieksmets, Olimpiade, Pieteikums, Rezultats
+from .ranking import rerank_saved, rerank_deleted
+from .versioning import (
+    bump_versions, olympiad_key, results_key, user_key,
+    OLYMPIADS, SUBJECTS, SCHOOLS, USERS, APPLICATIONS, RESULTS,
+)
+
+
+@receiver([post_save, post_delete], sender=Olimpiade)
+def olympiad_changed(sender, instance, **kwargs):
+    bump_versions(OLYMPIADS, olympiad_key(instance.pk))
+
+
+@receiver(post_save, sender=Olimpiade)
+def olympiad_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # A raised maxDalibnieki frees seats for the waiting list
+    if not created and not raw and (update_fields is None or 'maxDalibnieki' in update_fields):
+        seats.fill_seats(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Prieksmets)
+def subject_changed(sender, instance, **kwargs):
+    bump_versions(SUBJECTS)
+    drop_reference_data(SUBJECTS)
+
+
+@receiver([post_save, post_delete], sender=Skola)
+def school_changed(sender, instance, **kwargs):
+    bump_versions(SCHOOLS)
+    drop_reference_data(SCHOOLS)
+
+
+def drop_reference_data(version_key):
+    # Now for this process, and again after commit in case a request
+    # re-rendered the old rows in between
+    refdata.invalidate(version_key)
+    transaction.on_commit(lambda: refdata.invalidate(version_key))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_versions(USERS, user_key(instance.pk))
+    # The cached token version may be stale; drop it again once committed
+    user_id = instance.pk
+    forget_token_state(user_id)
+    transaction.on_commit(lambda: forget_token_state(user_id))
+
+
+# Shown on results rows (RezultatsSerializer, api.leaderboard)
+RESULT_USER_FIELDS = {'name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Deleted users' results are deleted with them and bump their olympiads
+    if created or raw or (update_fields is not None and not RESULT_USER_FIELDS & set(update_fields)):
+        return
+    olympiad_ids = set(Rezultats.objects.filter(lietotajs_id=instance.pk).values_list('olimpiade_id', flat=True))
+    if olympiad_ids:
+        bump_versions(*(results_key(olympiad_id) for olympiad_id in olympiad_ids))
+
+
+@receiver([post_save, post_delete], sender=Pieteikums)
+def application_changed(sender, instance, **kwargs):
+    bump_versions(APPLICATIONS, user_key(instance.lietotajs_id))
+
+
+@receiver(post_save, sender=Pieteikums)
+def application_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        seats.application_saved(instance, created)
+
+
+@receiver(post_delete, sender=Pieteikums)
+def application_deleted(sender, instance, **kwargs):
+    seats.application_deleted(instance)
+
+
+@receiver(post_save, sender=Rezultats)
+def result_saved(sender, instance, created, raw=False, **kwargs):
+    olympiad_ids = {instance.olimpiade_id}
+    if not raw:
+        olympiad_ids = rerank_saved(instance, created)
+    bump_versions(RESULTS, *(results_key(olympiad_id) for olympiad_id in olympiad_ids))
+
+
+@receiver(post_delete, sender=Rezultats)
+def result_deleted(sender, instance, **kwargs):
+    rerank_deleted(instance)
+    bump_versions(RESULTS, results_key(instance.olimpiade_id))
@@ -0,0 +1,100 @@
+"""Per-school statistics: applications and results of the school's users.
+
+Everything is computed with grouped aggregate queries (one per table) and
+kept in the cache per school. Cache keys carry the versions of every table
+the numbers depend on, so any write to applications, results, users,
+olympiads or schools makes the next request recompute them.
+"""
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+
+from .models import Skola, User, Pieteikums, Rezultats
+from .versioning import versioned_cache_key
+
+SCHOOL_STATS_CACHE_PREFIX = "school-stats"
+SCHOOL_STATS_CACHE_TIMEOUT = 60 * 60
+
+# Places that count as medals
+MEDALS = {'gold': 1, 'silver': 2, 'bronze': 3}
+
+
+def _medal_counts():
+    return {medal: Count('id', filter=Q(vieta=place)) for medal, place in MEDALS.items()}
+
+
+def _ratio(part, whole, digits=4):
+    return round(part / whole, digits) if whole else None
+
+
+def school_stats(school):
+    students = User.objects.filter(skola=school, user_type='normal').aggregate(
+        students=Count('id', distinct=True),
+        participating=Count('id', filter=Q(pieteikumi__isnull=False), distinct=True),
+    )
+
+    olympiads = {}
+
+    def olympiad_row(olympiad_id, nosaukums, datums):
+        return olympiads.setdefault(olympiad_id, {
+            'olimpiade': olympiad_id,
+            'nosaukums': nosaukums,
+            'datums': datums.isoformat() if datums else None,
+            'applications': 0,
+            'results': 0,
+            'average_points': None,
+            'best_points': None,
+            'medals': dict.fromkeys(MEDALS, 0),
+        })
+
+    applications = (
+        Pieteikums.objects.filter(lietotajs__skola=school)
+        .values('olimpiade_id', 'olimpiade__nosaukums', 'olimpiade__datums')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in applications:
+        olympiad_row(row['olimpiade_id'], row['olimpiade__nosaukums'], row['olimpiade__datums'])[
+            'applications'] = row['count']
+
+    results = (
+        Rezultats.objects.filter(lietotajs__skola=school)
+        .values('olimpiade_id', 'olimpiade__nosaukums', 'olimpiade__datums')
+        .annotate(count=Count('id'), average=Avg('punktuSkaits'), best=Max('punktuSkaits'), **_medal_counts())
+        .order_by()
+    )
+    for row in results:
+        entry = olympiad_row(row['olimpiade_id'], row['olimpiade__nosaukums'], row['olimpiade__datums'])
+        entry['results'] = row['count']
+        entry['average_points'] = row['average']
+        entry['best_points'] = row['best']
+        entry['medals'] = {medal: row[medal] for medal in MEDALS}
+
+    # School-wide totals follow from the per-olympiad groups
+    rows = sorted(olympiads.values(), key=lambda row: (row['datums'] or '', row['olimpiade']), reverse=True)
+    result_count = sum(row['results'] for row in rows)
+    scored = [row for row in rows if row['results']]
+    return {
+        'school': {'id': school.id, 'nosaukums': school.nosaukums},
+        'students': students['students'],
+        'participating_students': students['participating'],
+        'participation_rate': _ratio(students['participating'], students['students']),
+        'applications': sum(row['applications'] for row in rows),
+        'results': result_count,
+        'average_points': (
+            sum(row['average_points'] * row['results'] for row in scored) / result_count
+            if result_count else None
+        ),
+        'best_points': max((row['best_points'] for row in scored), default=None),
+        'medals': {medal: sum(row['medals'][medal] for row in rows) for medal in MEDALS},
+        'olympiads': rows,
+    }
+
+
+def get_school_stats(school_id, versions):
+    """Cached school_stats(); raises Skola.DoesNotExist for unknown schools"""
+    key = versioned_cache_key(SCHOOL_STATS_CACHE_PREFIX, versions, school_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = school_stats(Skola.objects.only('id', 'nosaukums').get(id=school_id))
+        cache.set(key, stats, SCHOOL_STATS_CACHE_TIMEOUT)
+    return stats
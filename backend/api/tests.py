@@ -1,8 +1,30 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import hashers
 from django.utils import timezone
+from django.core.cache import cache
+from django.db import connection, connections, transaction, IntegrityError, OperationalError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from datetime import timedelta, date
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
-from .models import User, Skola, Prieksmets, Olimpiade, Pieteikums, Rezultats
+from rest_framework.test import APITestCase, APITransactionTestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User, Skola, Prieksmets, Olimpiade, Pieteikums, Rezultats, ImportJob
+from .serializers import RezultatsSerializer
+from . import hashing, refdata, replicas, seats
+from .search import search_olympiads, search_users
+from backend.settings import sqlite_replica
 
 
 class LoggingAPIClient(APIClient):
@@ -85,6 +107,10 @@ class BaseAPITestCase(APITestCase):
         print(f"STARTING TEST: {self._testMethodName}")
         print(f"{'='*80}\n")
 
+        # Row ids and data versions restart with every test; cached payloads must too
+        cache.clear()
+        refdata.clear()
+
         self.normal_user = User.objects.create_user(
             email="normal@example.com",
             password="Password123",
@@ -130,6 +156,17 @@ class BaseAPITestCase(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
         print(f"[{self._testMethodName}] Authentication successful")
 
+    def assertQueryBudget(self, budget, path, data=None):
+        """GET path and fail if it runs more than `budget` queries (auth included)"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(
+            len(ctx.captured_queries), budget,
+            "\n".join(query["sql"] for query in ctx.captured_queries),
+        )
+        return response
+
     def tearDown(self):
         # Log test completion
         print(f"\n{'='*80}")
@@ -342,6 +379,72 @@ class UserManagementTests(BaseAPITestCase):
         response = self.client.get("/api/admin/users/?search=Jānis")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_search_users_diacritic_insensitive(self):
+        """USER_003: Folded prefix search over e-mail, name, last name and number"""
+        user = User.objects.create_user(
+            email="Janis.Berzins@Example.com", password="Password123",
+            name="Jānis", last_name="Bērziņš", number="+37120290000",
+        )
+        self.assertEqual(user.search_last_name, "berzins")
+        self.authenticate_as(self.admin_user)
+        for term in ["berzins", "BĒRZ", "jan berz", "janis.berz", "3712029"]:
+            response = self.client.get("/api/admin/users/", {"search": term})
+            self.assertEqual([row["id"] for row in response.data], [user.id], term)
+        response = self.client.get("/api/admin/users/", {"search": "janis ozols"})
+        self.assertEqual(response.data, [])
+
+        # Search columns follow later edits and bulk writes
+        user.last_name = "Ozoliņš"
+        user.save(update_fields=["last_name"])
+        response = self.client.get("/api/admin/users/", {"search": "janis ozol"})
+        self.assertEqual([row["id"] for row in response.data], [user.id])
+        User.objects.bulk_create([User(email="bulk@example.com", name="Līga")])
+        response = self.client.get("/api/schools/users/without-school/", {"search": "liga"})
+        self.assertEqual([row["email"] for row in response.data], ["bulk@example.com"])
+
+
+    @skipUnless(connection.vendor == "postgresql", "trigram indexes")
+    def test_search_users_uses_trigram_indexes(self):
+        """USER_003: The prefix LIKE on each search column uses its trigram index"""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = search_users(User.objects.all(), "berzins 2029").explain()
+        for column in ["email", "name", "last_name", "number"]:
+            self.assertIn(f"konti_search_{column}_trgm", plan)
+    def test_user_list_ordering(self):
+        """USER_003: Server-side ordering keys, with keyset pagination"""
+        User.objects.create_user(email="Zane@example.com", password="Password123", name="Zane", last_name="Ābele")
+        User.objects.create_user(email="erika@example.com", password="Password123", name="Ērika", last_name="Kalna")
+        self.authenticate_as(self.admin_user)
+
+        def emails(params):
+            response = self.client.get("/api/admin/users/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [row["email"] for row in response.data]
+
+        self.assertEqual(emails({"ordering": "name"}), [
+            "admin@example.com", "erika@example.com", "normal@example.com",
+            "teacher@example.com", "Zane@example.com",
+        ])
+        self.assertEqual(emails({"ordering": "-email"})[0], "Zane@example.com")
+        self.assertEqual(emails({"ordering": "create_date"})[0], "normal@example.com")
+        self.assertEqual(emails({})[0], "erika@example.com")
+        self.assertEqual(emails({"ordering": "-user_type"}), [
+            "teacher@example.com", "erika@example.com", "Zane@example.com",
+            "normal@example.com", "admin@example.com",
+        ])
+        self.assertEqual(emails({"ordering": "user_type", "search": "a"}), ["admin@example.com", "Zane@example.com"])
+
+        page = self.client.get("/api/admin/users/", {"ordering": "-name", "page_size": 3}).data
+        self.assertEqual([row["email"] for row in page["results"]],
+                         ["Zane@example.com", "teacher@example.com", "normal@example.com"])
+        page = self.client.get(page["next"]).data
+        self.assertEqual([row["email"] for row in page["results"]], ["erika@example.com", "admin@example.com"])
+        self.assertIsNone(page["next"])
+
+        response = self.client.get("/api/admin/users/", {"ordering": "password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_T15_view_profile(self):
         """USER_007: View own profile"""
         self.authenticate_as(self.normal_user)
@@ -420,6 +523,323 @@ class UserManagementTests(BaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TokenClaimsTests(BaseAPITestCase):
+    def obtain_tokens(self, user):
+        response = self.client.post(
+            "/api/token/",
+            {"email": user.email, "password": "Password123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_token_carries_permission_claims(self):
+        tokens = self.obtain_tokens(self.teacher_user)
+        access = AccessToken(tokens["access"])
+        self.assertEqual(access["user_type"], "teacher")
+        self.assertEqual(access["skola_id"], self.school.id)
+        self.assertEqual(access["token_version"], self.teacher_user.token_version)
+
+    def test_permission_checks_skip_user_query(self):
+        self.authenticate_as(self.teacher_user)
+        self.assertEqual(self.client.get("/api/schools/").status_code, status.HTTP_200_OK)
+        # Role from the token, version from the cache, list from process memory
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/schools/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lazy_user_loads_row_once(self):
+        self.authenticate_as(self.normal_user)
+        self.client.get("/api/profile/")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/profile/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], self.normal_user.email)
+        self.assertEqual(response.data["name"], "Normal")
+        self.assertEqual(sum('FROM "Konti"' in q["sql"] for q in queries.captured_queries), 1)
+
+    def test_role_change_makes_token_stale(self):
+        tokens = self.obtain_tokens(self.normal_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_200_OK)
+
+        self.normal_user.user_type = "teacher"
+        self.normal_user.save()
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Refreshing issues an access token with the new role
+        self.client.credentials()
+        response = self.client.post("/api/token/refresh/", {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data["access"])["user_type"], "teacher")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get("/api/admin/users/").status_code, status.HTTP_200_OK)
+
+    def test_school_change_bumps_token_version(self):
+        version = self.teacher_user.token_version
+        self.teacher_user.name = "Renamed"
+        self.teacher_user.save()
+        self.assertEqual(self.teacher_user.token_version, version)
+
+        self.teacher_user.skola = None
+        self.teacher_user.save(update_fields=["skola"])
+        self.teacher_user.refresh_from_db()
+        self.assertEqual(self.teacher_user.token_version, version + 1)
+
+    def test_deactivated_user_token_rejected(self):
+        self.authenticate_as(self.normal_user)
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_200_OK)
+        self.normal_user.is_active = False
+        self.normal_user.save()
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PasswordHashingTests(BaseAPITestCase):
+    def test_login_rehashes_with_active_profile(self):
+        self.assertTrue(self.normal_user.password.startswith("pbkdf2_sha256$"))
+        with override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES["scrypt"]):
+            self.authenticate_as(self.normal_user)
+            self.normal_user.refresh_from_db()
+            self.assertTrue(self.normal_user.password.startswith("scrypt$16384$"))
+            self.assertEqual(self.normal_user.password.split("$")[4], "1")
+            # The upgraded hash still logs in and is not re-hashed again
+            password = self.normal_user.password
+            self.authenticate_as(self.normal_user)
+            self.normal_user.refresh_from_db()
+            self.assertEqual(self.normal_user.password, password)
+
+    def test_hashing_runs_on_worker_pool(self):
+        threads = []
+        original = hashers.make_password
+
+        def make_password(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        with mock.patch.object(hashers, "make_password", make_password):
+            self.normal_user.set_password("NewPass123!")
+        self.assertTrue(threads[0].startswith("password-hash"))
+        self.assertTrue(self.normal_user.check_password("NewPass123!"))
+
+    def test_async_check_password(self):
+        self.assertTrue(async_to_sync(self.normal_user.acheck_password)("Password123"))
+        self.assertFalse(async_to_sync(self.normal_user.acheck_password)("WrongPassword"))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BulkEnrollmentTests(BaseAPITestCase):
+    def enroll_rows(self, count, start=0):
+        return [
+            {"email": f"student{i}@example.com", "password": "Password123!", "name": f"Students{i}"}
+            for i in range(start, start + count)
+        ]
+
+    def test_bulk_create_from_json_reports_rows(self):
+        self.authenticate_as(self.admin_user)
+        rows = [
+            {"email": "anna@example.com", "password": "Password123!", "name": "Anna",
+             "last_name": "Bērziņa", "number": "+37120000000", "skola": self.school.id},
+            {"email": "not-an-email", "password": "Password123!"},
+            {"email": self.normal_user.email, "password": "Password123!"},
+            {"email": "anna@example.com", "password": "Password123!"},
+            {"email": "weak@example.com", "password": "weak"},
+        ]
+        response = self.client.post("/api/admin/users/bulk-create/", {"users": rows}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertEqual(response.data["error_count"], 4)
+        self.assertEqual([row["status"] for row in response.data["rows"]],
+                         ["created", "error", "error", "error", "error"])
+        self.assertIn("email", response.data["rows"][2]["errors"])
+
+        anna = User.objects.get(email="anna@example.com")
+        self.assertEqual(response.data["rows"][0]["id"], anna.id)
+        # Same field sync as User.save()
+        self.assertEqual(anna.vards, "Anna")
+        self.assertEqual(anna.uzvards, "Bērziņa")
+        self.assertEqual(anna.talrNumurs, "+37120000000")
+        self.assertEqual(anna.search_last_name, "berzina")
+        self.assertIsNotNone(anna.izveidosanasDatums)
+        self.assertEqual(anna.skola_id, self.school.id)
+        self.assertTrue(anna.check_password("Password123!"))
+
+    def test_teacher_without_school_cannot_bulk_create(self):
+        self.teacher_user.skola = None
+        self.teacher_user.save()
+        self.authenticate_as(self.teacher_user)
+        response = self.client.post("/api/admin/users/bulk-create/", {"users": self.enroll_rows(2)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(email__startswith="student").exists())
+
+    def test_bulk_create_query_count_is_constant(self):
+        self.authenticate_as(self.admin_user)
+        self.client.get("/api/profile/")  # caches the token version
+        with CaptureQueriesContext(connection) as small:
+            self.client.post("/api/admin/users/bulk-create/", {"users": self.enroll_rows(2)}, format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                "/api/admin/users/bulk-create/", {"users": self.enroll_rows(20, start=2)}, format="json"
+            )
+        self.assertEqual(response.data["created_count"], 20)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_teacher_csv_enrolls_into_own_school(self):
+        self.authenticate_as(self.teacher_user)
+        csv_data = (
+            "email;password;name;last_name;user_type\n"
+            "janis@example.com;Password123!;Jānis;Ozols;\n"
+            "skolotajs@example.com;Password123!;Ilze;Kalna;teacher\n"
+        )
+        response = self.client.post("/api/admin/users/bulk-create/", {"csv": csv_data}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertIn("user_type", response.data["rows"][1]["errors"])
+        janis = User.objects.get(email="janis@example.com")
+        self.assertEqual(janis.skola_id, self.school.id)
+        self.assertEqual(janis.user_type, "normal")
+
+    def test_csv_upload_without_email_column(self):
+        self.authenticate_as(self.admin_user)
+        upload = SimpleUploadedFile("users.csv", b"name,password\nAnna,Password123!\n", content_type="text/csv")
+        response = self.client.post("/api/admin/users/bulk-create/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_normal_user_cannot_bulk_create(self):
+        self.authenticate_as(self.normal_user)
+        response = self.client.post("/api/admin/users/bulk-create/", {"users": self.enroll_rows(1)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PASSWORD_HASHING_PROCESSES=2)
+    def test_passwords_hashed_in_worker_processes(self):
+        self.authenticate_as(self.admin_user)
+        response = self.client.post("/api/admin/users/bulk-create/", {"users": self.enroll_rows(16)}, format="json")
+        self.assertEqual(response.data["created_count"], 16)
+        user = User.objects.get(email="student7@example.com")
+        self.assertTrue(user.password.startswith("md5$"))
+        self.assertTrue(user.check_password("Password123!"))
+
+        # Later batches reuse the same worker processes
+        pool = hashing.get_process_pool()
+        self.assertEqual(len(hashing.make_passwords(["Password123!"] * 16)), 16)
+        self.assertIs(hashing.get_process_pool(), pool)
+
+
+class BulkUserUpdateTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_school = Skola.objects.create(nosaukums="Valmieras Valsts ģimnāzija", adrese="Līvu laukums 1")
+        self.other_student = User.objects.create_user(
+            email="other@example.com", password="Password123", name="Other", skola=self.other_school,
+        )
+
+    def bulk_update(self, operation, user_ids, **data):
+        return self.client.post(
+            "/api/admin/users/bulk-update/",
+            {"operation": operation, "user_ids": user_ids, **data},
+            format="json",
+        )
+
+    def rejected(self, response):
+        return {row["id"]: row["reason"] for row in response.data["rejected"]}
+
+    def test_teacher_sets_school_with_rules(self):
+        self.authenticate_as(self.teacher_user)
+        version = self.normal_user.token_version
+        response = self.bulk_update(
+            "set_school",
+            [self.normal_user.id, self.admin_user.id, self.teacher_user.id, 9999],
+            school_id=self.school.id,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["applied"], [self.normal_user.id])
+        rejected = self.rejected(response)
+        self.assertEqual(rejected[self.admin_user.id], "Administratorus nevar pievienot skolām")
+        self.assertEqual(rejected[self.teacher_user.id], "Jums nav tiesību pievienot skolotājus")
+        self.assertEqual(rejected[9999], "Lietotājs nav atrasts")
+
+        self.normal_user.refresh_from_db()
+        self.assertEqual(self.normal_user.skola_id, self.school.id)
+        self.assertEqual(self.normal_user.token_version, version + 1)
+
+    def test_unchanged_users_applied_without_write(self):
+        self.authenticate_as(self.admin_user)
+        version = self.teacher_user.token_version
+        response = self.bulk_update("set_school", [self.teacher_user.id], school_id=self.school.id)
+        self.assertEqual(response.data["applied"], [self.teacher_user.id])
+        self.teacher_user.refresh_from_db()
+        self.assertEqual(self.teacher_user.token_version, version)
+
+    def test_invalid_school_id_refused(self):
+        self.authenticate_as(self.admin_user)
+        for school_id in ("abc", [self.school.id]):
+            response = self.bulk_update("set_school", [self.normal_user.id], school_id=school_id)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data["detail"], "Nederīgs skolas ID")
+
+    def test_teacher_cannot_add_teachers_or_use_other_school(self):
+        other_teacher = User.objects.create_user(email="t2@example.com", password="Password123", user_type="teacher")
+        self.authenticate_as(self.teacher_user)
+        response = self.bulk_update("set_school", [other_teacher.id], school_id=self.school.id)
+        self.assertEqual(self.rejected(response)[other_teacher.id], "Jums nav tiesību pievienot skolotājus")
+        response = self.bulk_update("set_school", [self.normal_user.id], school_id=self.other_school.id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_teacher_clears_only_own_school(self):
+        self.normal_user.skola = self.school
+        self.normal_user.save()
+        self.authenticate_as(self.teacher_user)
+        response = self.bulk_update("clear_school", [self.normal_user.id, self.other_student.id])
+        self.assertEqual(response.data["applied"], [self.normal_user.id])
+        self.assertEqual(
+            self.rejected(response)[self.other_student.id], "Jums nav tiesību noņemt lietotāju no citas skolas"
+        )
+        self.normal_user.refresh_from_db()
+        self.other_student.refresh_from_db()
+        self.assertIsNone(self.normal_user.skola_id)
+        self.assertEqual(self.other_student.skola_id, self.other_school.id)
+
+    def test_admin_changes_user_type_in_one_update(self):
+        self.authenticate_as(self.admin_user)
+        self.client.get("/api/profile/")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk_update(
+                "set_user_type", [self.other_student.id, self.normal_user.id, self.admin_user.id], user_type="teacher"
+            )
+        self.assertEqual(response.data["applied"], [self.other_student.id])
+        rejected = self.rejected(response)
+        self.assertEqual(rejected[self.normal_user.id], "Skolotājiem jābūt pievienotiem skolai")
+        self.assertEqual(rejected[self.admin_user.id], "Jūs nevarat mainīt savu lietotāja tipu")
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "Konti"')]
+        self.assertEqual(len(updates), 1)
+        self.other_student.refresh_from_db()
+        self.assertEqual(self.other_student.user_type, "teacher")
+
+    def test_deactivation_invalidates_tokens(self):
+        self.authenticate_as(self.normal_user)
+        normal_auth = self.client._credentials
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_200_OK)
+
+        self.authenticate_as(self.admin_user)
+        response = self.bulk_update("set_active", [self.normal_user.id, self.admin_user.id], is_active=False)
+        self.assertEqual(response.data["applied"], [self.normal_user.id])
+        self.assertIn(self.admin_user.id, self.rejected(response))
+
+        self.client.credentials(**normal_auth)
+        self.assertEqual(self.client.get("/api/profile/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_teacher_cannot_change_roles(self):
+        self.authenticate_as(self.teacher_user)
+        response = self.bulk_update("set_user_type", [self.normal_user.id], user_type="admin")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.bulk_update("set_active", [self.normal_user.id], is_active=False)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_batch(self):
+        self.authenticate_as(self.admin_user)
+        self.assertEqual(self.bulk_update("rename", [self.normal_user.id]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.bulk_update("clear_school", []).status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class ApplicationTests(BaseAPITestCase):
     def setUp(self):
         super().setUp()
@@ -603,6 +1023,239 @@ class ApplicationTests(BaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
+    def test_bulk_status_update_by_teacher(self):
+        """FORM_005: Teachers change many applications, only from their school"""
+        outsider = User.objects.create_user(email="outsider@example.com", password="Password123")
+        own = [
+            Pieteikums.objects.create(lietotajs=self.normal_user, olimpiade=olympiad, statuss="Reģistrēts")
+            for olympiad in (self.future_olympiad, self.past_olympiad)
+        ]
+        foreign = Pieteikums.objects.create(lietotajs=outsider, olimpiade=self.future_olympiad, statuss="Reģistrēts")
+        self.authenticate_as(self.teacher_user)
+        self.client.get("/api/profile/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                "/api/applications/bulk-update-status/",
+                {"application_ids": [own[0].id, own[1].id, foreign.id, 9999], "status": "Apstrādē"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], [own[0].id, own[1].id])
+        refused = {row["id"]: row["reason"] for row in response.data["refused"]}
+        self.assertEqual(refused[foreign.id], "Jums nav tiesību apstiprināt šo pieteikumu")
+        self.assertEqual(refused[9999], "Pieteikums nav atrasts")
+
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "Pieteikumi"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"Konti"', updates[0])  # school check inside the UPDATE
+        self.assertEqual(
+            list(Pieteikums.objects.order_by("id").values_list("statuss", flat=True)),
+            ["Apstrādē", "Apstrādē", "Reģistrēts"],
+        )
+
+    def test_bulk_status_update_invalidates_user_applications(self):
+        application = Pieteikums.objects.create(
+            lietotajs=self.normal_user, olimpiade=self.future_olympiad, statuss="Reģistrēts"
+        )
+        self.authenticate_as(self.normal_user)
+        etag = self.client.get("/api/applications/")["ETag"]
+
+        self.authenticate_as(self.admin_user)
+        response = self.client.patch(
+            "/api/applications/bulk-update-status/",
+            {"application_ids": [application.id], "status": "Atteikts"},
+            format="json",
+        )
+        self.assertEqual(response.data["updated"], [application.id])
+
+        self.authenticate_as(self.normal_user)
+        response = self.client.get("/api/applications/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["statuss"], "Atteikts")
+
+
+    def register_via_api(self, user):
+        self.authenticate_as(user)
+        return self.client.post("/api/applications/create/", {"olympiad_id": self.small_olympiad.id}, format="json")
+
+    def make_small_olympiad(self, seats=2):
+        self.small_olympiad = Olimpiade.objects.create(
+            nosaukums="Small Olympiad",
+            datums=timezone.now().date() + timedelta(days=30),
+            maxDalibnieki=seats,
+            norisesVieta="Rīga",
+            organizetajs="VISC",
+            prieksmets=self.prieksmets,
+        )
+        return [
+            User.objects.create_user(email=f"applicant{i}@example.com", password="Password123", skola=self.school)
+            for i in range(3)
+        ]
+
+    def test_full_olympiad_waitlists_and_promotes(self):
+        """FORM_001: Past maxDalibnieki applications wait; a freed seat goes to the oldest"""
+        first, second, third = self.make_small_olympiad(seats=2)
+        for user in (first, second):
+            self.assertEqual(self.register_via_api(user).data["application"]["statuss"], "Reģistrēts")
+        response = self.register_via_api(third)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["application"]["statuss"], "Gaidīšanas sarakstā")
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 2)
+
+        self.authenticate_as(self.teacher_user)
+        response = self.client.patch(
+            "/api/applications/update-status/",
+            {"application_id": Pieteikums.objects.get(lietotajs=first).id, "status": "Atteikts"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Pieteikums.objects.get(lietotajs=third).statuss, "Reģistrēts")
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 2)
+
+        Pieteikums.objects.get(lietotajs=second).delete()
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 1)
+
+    def test_only_duplicates_count_as_registered(self):
+        """FORM_001: A failed insert that is not a duplicate application is raised"""
+        first, _, _ = self.make_small_olympiad()
+        self.assertEqual(self.register_via_api(first).status_code, status.HTTP_201_CREATED)
+        response = self.register_via_api(first)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "Jūs jau esat reģistrējušies šai olimpiādei")
+
+        second = User.objects.get(email="applicant1@example.com")
+        failure = IntegrityError("FOREIGN KEY constraint failed")
+        with mock.patch.object(Pieteikums, "save", side_effect=failure):
+            with self.assertRaises(IntegrityError):
+                seats.register(second, self.small_olympiad)
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 1)
+
+    def test_approving_without_free_seat_is_refused(self):
+        first, second, third = self.make_small_olympiad(seats=1)
+        self.register_via_api(first)
+        waiting = Pieteikums.objects.get(pk=self.register_via_api(second).data["application"]["id"])
+        rejected = Pieteikums.objects.create(lietotajs=third, olimpiade=self.small_olympiad, statuss="Atteikts")
+
+        self.authenticate_as(self.teacher_user)
+        response = self.client.patch(
+            "/api/applications/update-status/",
+            {"application_id": waiting.id, "status": "Apstrādē"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "Olimpiādē nav brīvu vietu")
+
+        response = self.client.patch(
+            "/api/applications/bulk-update-status/",
+            {"application_ids": [waiting.id, rejected.id], "status": "Apstrādē"},
+            format="json",
+        )
+        self.assertEqual(response.data["updated"], [])
+        self.assertEqual({row["reason"] for row in response.data["refused"]}, {"Olimpiādē nav brīvu vietu"})
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 1)
+
+    def test_bulk_reject_promotes_waiting_list(self):
+        first, second, third = self.make_small_olympiad(seats=2)
+        ids = [self.register_via_api(user).data["application"]["id"] for user in (first, second, third)]
+
+        self.authenticate_as(self.admin_user)
+        response = self.client.patch(
+            "/api/applications/bulk-update-status/",
+            {"application_ids": ids[:2], "status": "Atteikts"},
+            format="json",
+        )
+        self.assertEqual(response.data["updated"], ids[:2])
+        self.assertEqual(Pieteikums.objects.get(pk=ids[2]).statuss, "Reģistrēts")
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 1)
+
+    def test_raising_capacity_promotes_waiting_list(self):
+        users = self.make_small_olympiad(seats=1)
+        for user in users:
+            self.register_via_api(user)
+        stale = Olimpiade.objects.get(pk=self.small_olympiad.pk)
+
+        self.authenticate_as(self.admin_user)
+        response = self.client.patch(
+            f"/api/olympiads/{self.small_olympiad.id}/update/", {"maxDalibnieki": 2}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(Pieteikums.objects.order_by("id").values_list("statuss", flat=True)),
+            ["Reģistrēts", "Reģistrēts", "Gaidīšanas sarakstā"],
+        )
+        # Saving an olympiad loaded before never writes its seat count back
+        stale.apraksts = "Edited"
+        stale.save()
+        self.small_olympiad.refresh_from_db()
+        self.assertEqual(self.small_olympiad.dalibniekuSkaits, 2)
+
+class ApplicationConcurrencyTests(TransactionTestCase):
+    """FORM_001: Registration rush from many threads, each with its own connection"""
+
+    def setUp(self):
+        cache.clear()
+        self.olympiad = Olimpiade.objects.create(
+            nosaukums="Rush Olympiad",
+            datums=timezone.now().date() + timedelta(days=30),
+            maxDalibnieki=4,
+            norisesVieta="Rīga",
+            organizetajs="VISC",
+            prieksmets=Prieksmets.objects.create(nosaukums="Fizika", kategorija="STEM"),
+        )
+        self.users = [
+            User.objects.create_user(email=f"rush{i}@example.com", password="Password123") for i in range(10)
+        ]
+
+    def run_threads(self, target, args_list):
+        barrier = threading.Barrier(len(args_list))
+        errors = []
+
+        def worker(*args):
+            try:
+                barrier.wait()
+                for _ in range(500):
+                    try:
+                        return target(*args)
+                    except OperationalError:
+                        # The in-memory test database locks tables instead of waiting
+                        time.sleep(0.002)
+                errors.append(args)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=args) for args in args_list]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_rush_has_no_duplicates_and_no_overbooking(self):
+        # Every user double-submits
+        self.run_threads(seats.register, [(user, self.olympiad) for user in self.users for _ in range(3)])
+
+        applications = Pieteikums.objects.filter(olimpiade=self.olympiad)
+        self.assertEqual(applications.count(), 10)
+        self.assertEqual(applications.values("lietotajs").distinct().count(), 10)
+        self.assertEqual(applications.filter(statuss="Reģistrēts").count(), 4)
+        self.assertEqual(applications.filter(statuss="Gaidīšanas sarakstā").count(), 6)
+        self.olympiad.refresh_from_db()
+        self.assertEqual(self.olympiad.dalibniekuSkaits, 4)
+
+        # Seats freed at the same time go to four different waiting applications
+        registered = list(applications.filter(statuss="Reģistrēts"))
+        self.run_threads(lambda application: seats.set_status(application, "Atteikts"), [(a,) for a in registered])
+        self.assertEqual(applications.filter(statuss="Reģistrēts").count(), 4)
+        self.assertEqual(applications.filter(statuss="Gaidīšanas sarakstā").count(), 2)
+        self.olympiad.refresh_from_db()
+        self.assertEqual(self.olympiad.dalibniekuSkaits, 4)
 
 class ResultsTests(BaseAPITestCase):
     def setUp(self):
@@ -636,6 +1289,80 @@ class ResultsTests(BaseAPITestCase):
             else:
                 self.assertGreaterEqual(len(response.data), 1)
 
+    def test_results_percentage_matches_serializer(self):
+        """RES_001: Cached leaderboard rows equal serializer output plus percentage"""
+        Rezultats.objects.create(
+            olimpiade=self.olympiad, lietotajs=None, punktuSkaits=30, vieta=2,
+            rezultataDatums=timezone.now().date(),
+        )
+        response = self.client.get(f"/api/olympiads/{self.olympiad.id}/results/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["percentage"] for row in response.data], [100, 38])
+        self.assertEqual(response.data[1]["lietotajs_name"], "Nav norādīts")
+
+        queryset = Rezultats.objects.filter(olimpiade=self.olympiad).order_by("vieta", "-punktuSkaits", "-id")
+        expected = RezultatsSerializer(queryset, many=True, context={"max_points": 80}).data
+        self.assertEqual(response.data, [dict(row) for row in expected])
+
+        response = self.client.get(f"/api/olympiads/{self.olympiad.id}/results/", {"page_size": 1})
+        self.assertEqual(response.data["results"][0]["percentage"], 100)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"][0]["percentage"], 38)
+
+    def test_results_cache_invalidated_by_writes(self):
+        """RES_001: Leaderboard is served from cache until a result of the olympiad changes"""
+        url = f"/api/olympiads/{self.olympiad.id}/results/"
+        self.client.get(url)
+        # Versions only; the rows come from the cache
+        response = self.assertQueryBudget(1, url)
+        self.assertEqual(response.data[0]["punktuSkaits"], 80)
+
+        other = Olimpiade.objects.create(
+            nosaukums="Other", datums=timezone.now().date(), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets,
+        )
+        Rezultats.objects.create(
+            olimpiade=other, punktuSkaits=5, vieta=1, rezultataDatums=timezone.now().date(),
+        )
+        self.assertQueryBudget(1, url)
+
+        self.result.punktuSkaits = 90
+        self.result.save()
+        self.assertEqual(self.client.get(url).data[0]["punktuSkaits"], 90)
+
+        self.result.delete()
+        self.assertEqual(self.client.get(url).data, [])
+
+    def test_score_distribution(self):
+        """Histogram, quartiles, mean, stddev and percentiles, cached until results change"""
+        import statistics
+
+        for points in (60, 70, 70, 100):
+            Rezultats.objects.create(
+                olimpiade=self.olympiad, punktuSkaits=points, vieta=1, rezultataDatums=timezone.now().date(),
+            )
+        scores = [60, 70, 70, 80, 100]
+        url = f"/api/olympiads/{self.olympiad.id}/distribution/"
+        data = self.client.get(url, {"bins": 4}).data
+        self.assertEqual((data["count"], data["min"], data["max"]), (5, 60, 100))
+        self.assertAlmostEqual(data["mean"], statistics.mean(scores))
+        self.assertAlmostEqual(data["stddev"], statistics.pstdev(scores))
+        q1, median, q3 = statistics.quantiles(scores, n=4, method="inclusive")
+        self.assertEqual(data["quartiles"], {"q1": q1, "median": median, "q3": q3})
+        self.assertEqual([row["count"] for row in data["histogram"]], [1, 2, 1, 1])
+        self.assertEqual((data["histogram"][0]["from"], data["histogram"][-1]["to"]), (60, 100))
+        self.assertEqual([(row["punktuSkaits"], row["percentile"]) for row in data["participants"]],
+                         [(100, 90), (80, 70), (70, 40), (70, 40), (60, 10)])
+        self.assertEqual(data["participants"][1]["lietotajs"], self.normal_user.id)
+
+        # Cached until one of this olympiad's results changes
+        self.assertQueryBudget(1, url, {"bins": 4})
+        self.result.delete()
+        self.assertEqual(self.client.get(url, {"bins": 4}).data["count"], 4)
+
+        self.assertEqual(self.client.get(url, {"bins": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get("/api/olympiads/99999/distribution/").data["count"], 0)
+
     def test_T26_admin_edit_result(self):
         self.authenticate_as(self.admin_user)
         self.result.punktuSkaits = 90
@@ -706,6 +1433,266 @@ class ResultsTests(BaseAPITestCase):
         )
         self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST])
 
+    def test_import_results_aliases_and_row_errors(self):
+        """RES_004: Alias keys are accepted and bad rows are reported per row"""
+        self.authenticate_as(self.admin_user)
+        results_data = {
+            "results": [
+                {"rank": 2, "points": 70, "email": self.normal_user.email, "date": "2025-05-01"},
+                {"place": 3, "score": 60, "user_email": "unknown@example.com"},
+                {"vieta": 4},
+                {"vieta": 5, "punktuSkaits": "x"},
+            ]
+        }
+        response = self.client.post(
+            "/api/results/import/",
+            {"olympiad_id": self.olympiad.id, "import_type": "file", "results_data": results_data},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 2)
+        self.assertEqual(response.data["total_count"], 4)
+        self.assertEqual(len(response.data["errors"]), 2)
+        self.assertTrue(response.data["errors"][0].startswith("Rezultāts 3:"))
+        self.assertTrue(response.data["errors"][1].startswith("Rezultāts 4:"))
+        imported = Rezultats.objects.get(olimpiade=self.olympiad, vieta=2)
+        self.assertEqual(imported.lietotajs, self.normal_user)
+        self.assertEqual(imported.rezultataDatums, date(2025, 5, 1))
+        self.assertIsNone(Rezultats.objects.get(olimpiade=self.olympiad, vieta=3).lietotajs)
+
+    def test_import_results_non_finite_scores(self):
+        """RES_004: NaN and infinite scores are row errors, not a failed import"""
+        self.authenticate_as(self.admin_user)
+        before = Rezultats.objects.filter(olimpiade=self.olympiad).count()
+        results_data = {
+            "results": [
+                {"punktuSkaits": 80},
+                {"punktuSkaits": "nan"},
+                {"punktuSkaits": 70},
+                {"punktuSkaits": "inf"},
+                {"punktuSkaits": "-Infinity"},
+            ]
+        }
+        response = self.client.post(
+            "/api/results/import/",
+            {"olympiad_id": self.olympiad.id, "import_type": "file", "results_data": results_data},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 2)
+        self.assertEqual(response.data["errors"], [
+            "Rezultāts 2: 'punktuSkaits' jābūt skaitlim",
+            "Rezultāts 4: 'punktuSkaits' jābūt skaitlim",
+            "Rezultāts 5: 'punktuSkaits' jābūt skaitlim",
+        ])
+        self.assertEqual(Rezultats.objects.filter(olimpiade=self.olympiad).count(), before + 2)
+
+        # Bare NaN in an uploaded file, which Python's JSON parser accepts
+        upload = SimpleUploadedFile(
+            "results.json", b'{"results": [{"punktuSkaits": NaN}, {"punktuSkaits": 90}]}',
+            content_type="application/json",
+        )
+        response = self.client.post(
+            "/api/results/import/",
+            {"olympiad_id": self.olympiad.id, "import_type": "upload", "file": upload},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertEqual(len(response.data["errors"]), 1)
+
+    def test_import_results_constant_queries(self):
+        """RES_004: Import cost does not grow with one query per row"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .importing import ResultsImporter
+
+        rows = [
+            {"vieta": i, "punktuSkaits": 201 - i, "lietotajs_email": self.normal_user.email}
+            for i in range(1, 201)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            report = ResultsImporter(self.olympiad, batch_size=100).run(rows)
+        self.assertEqual(report.created_count, 200)
+        # Per batch: one e-mail lookup and one INSERT, plus the transaction
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+
+    def test_iter_results_chunk_boundaries(self):
+        """RES_004: Streaming parser yields the same rows whatever the chunk size"""
+        import json
+        from .importing import iter_results
+
+        document = json.dumps({
+            "olympiad": "Test Olympiad",
+            "meta": {"rows": [1, 2]},
+            "results": [{"vieta": i, "punktuSkaits": i * 1.5, "email": f"ē{i}@example.com"} for i in range(1, 30)],
+            "trailing": True,
+        }).encode("utf-8")
+        expected = json.loads(document)["results"]
+        for size in (1, 7, 64, len(document)):
+            chunks = [document[i:i + size] for i in range(0, len(document), size)]
+            self.assertEqual(list(iter_results(chunks)), expected)
+
+    def test_iter_results_invalid_documents(self):
+        """RES_004: Streaming parser rejects documents without a 'results' array"""
+        from .importing import iter_results, ImportFormatError, MISSING_RESULTS, RESULTS_NOT_LIST, INVALID_JSON
+
+        cases = [
+            ('[]', MISSING_RESULTS),
+            ('{"other": 1}', MISSING_RESULTS),
+            ('{"results": {"a": 1}}', RESULTS_NOT_LIST),
+            ('{"results": [{"vieta": 1} {"vieta": 2}]}', INVALID_JSON),
+            ('{"results": [{"vieta": 1}', INVALID_JSON),
+        ]
+        for document, message in cases:
+            with self.assertRaisesMessage(ImportFormatError, message):
+                list(iter_results([document]))
+
+    def test_import_results_upload_stream(self):
+        """RES_004: Uploaded JSON file is imported in batches"""
+        import json
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.authenticate_as(self.admin_user)
+        rows = [{"vieta": i, "punktuSkaits": 50 + i} for i in range(1, 11)]
+        upload = SimpleUploadedFile(
+            "results.json", json.dumps({"results": rows}).encode("utf-8"), content_type="application/json"
+        )
+        response = self.client.post(
+            "/api/results/import/",
+            {"olympiad_id": self.olympiad.id, "import_type": "upload", "file": upload},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 10)
+
+    def test_import_results_request_body_stream(self):
+        """RES_004: Raw JSON request body is imported without parsing it up front"""
+        import json
+
+        self.authenticate_as(self.admin_user)
+        body = json.dumps({"results": [{"place": 2, "score": 40}, {"place": 3}]})
+        response = self.client.post(
+            f"/api/results/import/stream/?olympiad_id={self.olympiad.id}",
+            body,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertEqual(len(response.data["errors"]), 1)
+
+        count = Rezultats.objects.count()
+        response = self.client.post(
+            f"/api/results/import/stream/?olympiad_id={self.olympiad.id}",
+            '{"results": [{"place": 4, "score": 30}, oops]}',
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Rezultats.objects.count(), count)
+
+    def _mock_url_response(self, body):
+        from unittest import mock
+
+        response = mock.MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [body[i:i + 16] for i in range(0, len(body), 16)]
+        return mock.patch("api.jobs.requests.get", return_value=response)
+
+    @override_settings(RESULTS_IMPORT_EAGER=True)
+    def test_import_results_url_job(self):
+        """RES_004: URL import returns a job id and the job reports its outcome"""
+        import json
+
+        self.authenticate_as(self.admin_user)
+        body = json.dumps({"results": [{"vieta": 2, "punktuSkaits": 70}, {"vieta": 3}]}).encode("utf-8")
+        with self._mock_url_response(body), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/results/import/",
+                {"olympiad_id": self.olympiad.id, "import_type": "url", "url": "http://example.com/r.json"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["state"], ImportJob.QUEUED)
+
+        response = self.client.get(f"/api/results/import/{response.data['job_id']}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["state"], ImportJob.DONE)
+        self.assertEqual(response.data["processed_count"], 2)
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertEqual(len(response.data["errors"]), 1)
+        self.assertTrue(Rezultats.objects.filter(olimpiade=self.olympiad, vieta=2).exists())
+
+    @override_settings(RESULTS_IMPORT_EAGER=True)
+    def test_import_results_url_job_invalid_json(self):
+        """RES_004: A job with an invalid document fails without partial results"""
+        self.authenticate_as(self.admin_user)
+        count = Rezultats.objects.count()
+        with self._mock_url_response(b'{"results": [{"vieta": 2, "punktuSkaits": 70}, nope'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/results/import/",
+                {"olympiad_id": self.olympiad.id, "import_type": "url", "url": "http://example.com/r.json"},
+                format="json",
+            )
+        job = ImportJob.objects.get(id=response.data["job_id"])
+        self.assertEqual(job.state, ImportJob.FAILED)
+        self.assertEqual(Rezultats.objects.count(), count)
+
+    def test_import_job_claimed_once(self):
+        """RES_004: A job that is already running is not run again"""
+        from .jobs import run_import_job
+
+        job = ImportJob.objects.create(olimpiade=self.olympiad, url="http://example.com/r.json", state=ImportJob.RUNNING)
+        self.assertFalse(run_import_job(job.id))
+
+    def test_interrupted_jobs_fail(self):
+        """RES_004: Jobs left running by a dead process are failed, not left running"""
+        from .jobs import run_queued_jobs, INTERRUPTED
+
+        started = timezone.now() - timedelta(hours=2)
+        stale = ImportJob.objects.create(olimpiade=self.olympiad, url="http://example.com/r.json",
+                                         state=ImportJob.RUNNING, started_at=started)
+        live = ImportJob.objects.create(olimpiade=self.olympiad, url="http://example.com/r.json",
+                                        state=ImportJob.RUNNING, started_at=timezone.now())
+        self.assertEqual(run_queued_jobs(), 0)
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((stale.state, stale.detail), (ImportJob.FAILED, INTERRUPTED))
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(live.state, ImportJob.RUNNING)
+
+    def test_import_job_status_admin_only(self):
+        job = ImportJob.objects.create(olimpiade=self.olympiad, url="http://example.com/r.json")
+        self.authenticate_as(self.teacher_user)
+        response = self.client.get(f"/api/results/import/{job.id}/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@skipUnless(connection.vendor != "sqlite", "SQLite has one writer; counts appear when the job ends")
+class ImportJobProgressTests(TransactionTestCase):
+    def test_progress_visible_to_other_connections(self):
+        """RES_004: Live counts are committed to the job row while the import runs"""
+        from .importing import ImportReport
+        from .jobs import ProgressWriter
+
+        olympiad = Olimpiade.objects.create(
+            nosaukums="Progress Olympiad", datums=timezone.now().date(), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=Prieksmets.objects.create(nosaukums="Fizika", kategorija="STEM"),
+        )
+        job = ImportJob.objects.create(olimpiade=olympiad, url="http://example.com/r.json", state=ImportJob.RUNNING)
+        report = ImportReport()
+        report.total_count, report.created_count = 500, 480
+        progress = ProgressWriter(job.id)
+        try:
+            with transaction.atomic():
+                progress(report)
+                # Not rolled back with the import transaction
+                transaction.set_rollback(True)
+        finally:
+            progress.close()
+        job.refresh_from_db()
+        self.assertEqual((job.processed_count, job.created_count), (500, 480))
+
 
 class SchoolTests(BaseAPITestCase):
     def test_T33_add_user_to_school(self):
@@ -821,6 +1808,60 @@ class SchoolTests(BaseAPITestCase):
         response = self.client.delete("/api/schools/99999/delete/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_school_stats(self):
+        """Per-olympiad aggregates for a school, cached until a relevant write"""
+        self.normal_user.skola = self.school
+        self.normal_user.save()
+        User.objects.create_user(email="idle@example.com", password="Password123", skola=self.school)
+        outsider = User.objects.create_user(email="outsider@example.com", password="Password123")
+        older, newer = (
+            Olimpiade.objects.create(
+                nosaukums=name, datums=timezone.now().date() - timedelta(days=days), norisesVieta="Rīga",
+                organizetajs="VISC", prieksmets=self.prieksmets,
+            )
+            for name, days in (("Vecā", 30), ("Jaunā", 5))
+        )
+        for olympiad in (older, newer):
+            Pieteikums.objects.create(lietotajs=self.normal_user, olimpiade=olympiad, statuss="Reģistrēts")
+        result = Rezultats.objects.create(
+            olimpiade=older, lietotajs=self.normal_user, punktuSkaits=90, vieta=1,
+            rezultataDatums=timezone.now().date(),
+        )
+        Rezultats.objects.create(
+            olimpiade=older, lietotajs=outsider, punktuSkaits=95, vieta=1, rezultataDatums=timezone.now().date(),
+        )
+
+        url = f"/api/schools/{self.school.id}/stats/"
+        self.authenticate_as(self.teacher_user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual((data["students"], data["participating_students"]), (2, 1))
+        self.assertEqual(data["participation_rate"], 0.5)
+        self.assertEqual((data["applications"], data["results"]), (2, 1))
+        self.assertEqual((data["average_points"], data["best_points"]), (90, 90))
+        self.assertEqual(data["medals"], {"gold": 0, "silver": 1, "bronze": 0})
+        self.assertEqual([row["nosaukums"] for row in data["olympiads"]], ["Jaunā", "Vecā"])
+        self.assertEqual(data["olympiads"][0]["results"], 0)
+        self.assertEqual(data["olympiads"][1]["medals"]["silver"], 1)
+
+        # Cached: only the data versions (and the token user) are read
+        self.assertQueryBudget(2, url)
+        result.punktuSkaits = 99
+        result.save()
+        data = self.client.get(url).data
+        self.assertEqual(data["medals"], {"gold": 1, "silver": 0, "bronze": 0})
+        self.assertEqual(data["best_points"], 99)
+
+        other_school = Skola.objects.create(nosaukums="Cita skola", pasvaldiba="Rīga", adrese="Iela 1")
+        self.assertEqual(self.client.get(f"/api/schools/{other_school.id}/stats/").status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.authenticate_as(self.normal_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.authenticate_as(self.admin_user)
+        self.assertEqual(self.client.get(f"/api/schools/{other_school.id}/stats/").data["students"], 0)
+        self.assertEqual(self.client.get("/api/schools/99999/stats/").status_code, status.HTTP_404_NOT_FOUND)
+
 
 class OlympiadTests(BaseAPITestCase):
     def test_T43_create_olympiad_success(self):
@@ -931,6 +1972,661 @@ class OlympiadTests(BaseAPITestCase):
         response = self.client.get("/api/olympiads/?search=matemātika")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def _search_ids(self, term):
+        response = self.client.get("/api/olympiads/", {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["id"] for row in response.data]
+
+    def test_search_olympiads_full_text(self):
+        """OLYMP_004: Prefix, diacritic-insensitive search over all text fields and the subject"""
+        fizika = Prieksmets.objects.create(nosaukums="Fizika", kategorija="STEM")
+        math = Olimpiade.objects.create(
+            nosaukums="Valsts olimpiāde", datums=date(2025, 3, 1), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets, apraksts="Ģeometrija un algebra",
+        )
+        physics = Olimpiade.objects.create(
+            nosaukums="Fizikas olimpiāde", datums=date(2025, 4, 1), norisesVieta="Liepāja",
+            organizetajs="LU", prieksmets=fizika,
+        )
+        self.assertEqual(self._search_ids("matem"), [math.id])
+        self.assertEqual(self._search_ids("geometr"), [math.id])
+        self.assertEqual(self._search_ids("liepaja"), [physics.id])
+        self.assertEqual(self._search_ids("olimp riga"), [math.id])
+        self.assertEqual(set(self._search_ids("olimpiāde")), {math.id, physics.id})
+
+        # Index follows subject renames and olympiad updates/deletes
+        self.prieksmets.nosaukums = "Informātika"
+        self.prieksmets.save()
+        self.assertEqual(self._search_ids("informat"), [math.id])
+        self.assertEqual(self._search_ids("matem"), [])
+        physics.norisesVieta = "Ventspils"
+        physics.save()
+        self.assertEqual(self._search_ids("ventspils"), [physics.id])
+        physics.delete()
+        self.assertEqual(self._search_ids("fizik"), [])
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 index")
+    def test_search_index_triggers_exist(self):
+        """OLYMP_004: Migrations that rebuild a table drop its raw-SQL triggers; search would go stale"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'trigger'")
+            triggers = set(cursor.fetchall())
+        self.assertLessEqual({
+            ("olimpiades_meklesana_ai", "Olimpiades"),
+            ("olimpiades_meklesana_au", "Olimpiades"),
+            ("olimpiades_meklesana_ad", "Olimpiades"),
+            ("prieksmeti_meklesana_au", "Prieksmeti"),
+        }, triggers)
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 index")
+    def test_seat_counter_leaves_search_index_alone(self):
+        """FORM_001: Taking a seat does not rewrite the olympiad's FTS5 row"""
+        olympiad = Olimpiade.objects.create(
+            nosaukums="Ķīmijas olimpiāde", datums=date(2025, 3, 1), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets, maxDalibnieki=5,
+        )
+        connection.ensure_connection()
+        # Counts rows changed by triggers too
+        before = connection.connection.total_changes
+        self.assertTrue(seats.take_seat(olympiad.id))
+        self.assertEqual(connection.connection.total_changes - before, 1)
+        self.assertEqual(self._search_ids("kimij"), [olympiad.id])
+
+        # Indexed columns still refresh the row (FTS5 writes its shadow tables too)
+        before = connection.connection.total_changes
+        Olimpiade.objects.filter(pk=olympiad.pk).update(organizetajs="LU")
+        self.assertGreater(connection.connection.total_changes - before, 1)
+
+    def test_search_olympiads_relevance_order(self):
+        """OLYMP_004: Olympiads matching in more fields rank first"""
+        weak = Olimpiade.objects.create(
+            nosaukums="Olimpiāde", datums=date(2025, 5, 1), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets, apraksts="Par robotiku",
+        )
+        strong = Olimpiade.objects.create(
+            nosaukums="Robotikas olimpiāde", datums=date(2024, 5, 1), norisesVieta="Rīga",
+            organizetajs="Robotikas centrs", prieksmets=self.prieksmets, apraksts="Robotika",
+        )
+        self.assertEqual(self._search_ids("robot"), [strong.id, weak.id])
+
+        # Relevance ordering works with keyset pagination too
+        page = self.client.get("/api/olympiads/", {"search": "robot", "page_size": 1}).data
+        self.assertEqual(page["results"][0]["id"], strong.id)
+        self.assertEqual(self.client.get(page["next"]).data["results"][0]["id"], weak.id)
+
+    @skipUnless(connection.vendor == "postgresql", "trigram indexes")
+    def test_search_olympiads_uses_trigram_indexes(self):
+        """OLYMP_004: Every searched column is answered by its trigram index"""
+        with connection.cursor() as cursor:
+            # The test tables are too small for the planner to choose an index
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = search_olympiads(Olimpiade.objects.all(), "ģeometr").explain()
+        for index in ["olimpiades_nosaukums_trgm", "olimpiades_vieta_trgm",
+                      "olimpiades_organizetajs_trgm", "olimpiades_apraksts_trgm"]:
+            self.assertIn(index, plan)
+
+    def _filter_ids(self, params):
+        response = self.client.get("/api/olympiads/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["id"] for row in response.data]
+
+    def test_filter_olympiads(self):
+        """OLYMP_003: Status, date range, subject and location filters and sort keys"""
+        today = timezone.localdate()
+        physics = Prieksmets.objects.create(nosaukums="Fizika", kategorija="STEM")
+        past = Olimpiade.objects.create(
+            nosaukums="Bioloģija", datums=today - timedelta(days=10), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets,
+        )
+        current = Olimpiade.objects.create(
+            nosaukums="Astronomija", datums=today, norisesVieta="Liepāja",
+            organizetajs="VISC", prieksmets=physics,
+        )
+        future = Olimpiade.objects.create(
+            nosaukums="Ķīmija", datums=today + timedelta(days=40), norisesVieta="Cēsis",
+            organizetajs="VISC", prieksmets=physics,
+        )
+
+        self.assertEqual(self._filter_ids({}), [future.id, current.id, past.id])
+        self.assertEqual(self._filter_ids({"status": "completed"}), [past.id])
+        self.assertEqual(self._filter_ids({"status": "upcoming"}), [future.id, current.id])
+        self.assertEqual(self._filter_ids({
+            "date_from": str(today - timedelta(days=10)), "date_to": str(today + timedelta(days=30)),
+        }), [current.id, past.id])
+        self.assertEqual(self._filter_ids({"prieksmets": [str(physics.id)]}), [future.id, current.id])
+        self.assertEqual(self._filter_ids({"prieksmets": ["Matemātika", str(physics.id)]}),
+                         [future.id, current.id, past.id])
+        self.assertEqual(self._filter_ids({"norisesVieta": ["Rīga", "Cēsis"]}), [future.id, past.id])
+        self.assertEqual(self._filter_ids({"status": "upcoming", "ordering": "nosaukums"}),
+                         [current.id, future.id])
+        self.assertEqual(self._filter_ids({"ordering": "datums"}), [past.id, current.id, future.id])
+
+        page = self.client.get("/api/olympiads/", {"ordering": "-nosaukums", "page_size": 2}).data
+        self.assertEqual([row["id"] for row in page["results"]], [future.id, past.id])
+        self.assertEqual([row["id"] for row in self.client.get(page["next"]).data["results"]], [current.id])
+
+        for params in ({"status": "soon"}, {"date_from": "01.05.2025"}, {"ordering": "organizetajs"}):
+            response = self.client.get("/api/olympiads/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("detail", response.data)
+
+    def test_olympiad_facets(self):
+        """OLYMP_004: Facet counts follow search/filters and are cached until an olympiad changes"""
+        physics = Prieksmets.objects.create(nosaukums="Fizika", kategorija="Dabaszinātnes")
+        for nosaukums, vieta, prieksmets in (
+            ("Matemātika 1", "Rīga", self.prieksmets),
+            ("Matemātika 2", "Cēsis", self.prieksmets),
+            ("Fizika 1", "Rīga", physics),
+        ):
+            Olimpiade.objects.create(
+                nosaukums=nosaukums, datums=timezone.localdate(), norisesVieta=vieta,
+                organizetajs="VISC", prieksmets=prieksmets,
+            )
+
+        response = self.client.get("/api/olympiads/facets/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["prieksmets"], [
+            {"value": self.prieksmets.id, "label": "Matemātika", "count": 2},
+            {"value": physics.id, "label": "Fizika", "count": 1},
+        ])
+        self.assertEqual(response.data["kategorija"], [
+            {"value": "STEM", "label": "STEM", "count": 2},
+            {"value": "Dabaszinātnes", "label": "Dabaszinātnes", "count": 1},
+        ])
+        self.assertEqual(response.data["organizetajs"], [{"value": "VISC", "label": "VISC", "count": 3}])
+
+        # A selected location narrows the other facets but not its own options
+        response = self.client.get("/api/olympiads/facets/", {"norisesVieta": "Cēsis"})
+        self.assertEqual([row["label"] for row in response.data["norisesVieta"]], ["Rīga", "Cēsis"])
+        self.assertEqual(response.data["prieksmets"], [
+            {"value": self.prieksmets.id, "label": "Matemātika", "count": 1},
+        ])
+
+        response = self.client.get("/api/olympiads/facets/", {"search": "fizik"})
+        self.assertEqual([row["label"] for row in response.data["prieksmets"]], ["Fizika"])
+
+        # Served from the cache: only the data versions are read
+        self.assertQueryBudget(1, "/api/olympiads/facets/", {"search": "fizik"})
+        Olimpiade.objects.create(
+            nosaukums="Fizika 2", datums=timezone.localdate(), norisesVieta="Liepāja",
+            organizetajs="LU", prieksmets=physics,
+        )
+        response = self.client.get("/api/olympiads/facets/", {"search": "fizik"})
+        self.assertEqual(response.data["prieksmets"][0]["count"], 2)
+
+
+class ConditionalRequestTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.olympiad = Olimpiade.objects.create(
+            nosaukums="Test Olympiad",
+            datums=timezone.now().date(),
+            norisesVieta="Rīga",
+            organizetajs="VISC",
+            prieksmets=self.prieksmets,
+        )
+
+    def test_olympiad_list_not_modified(self):
+        """Unchanged olympiad list answers 304 and a write changes the ETag"""
+        response = self.client.get("/api/olympiads/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+        response = self.client.get("/api/olympiads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get("/api/olympiads/?search=Test", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.prieksmets.nosaukums = "Fizika"
+        self.prieksmets.save()
+        response = self.client.get("/api/olympiads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_results_not_modified_until_import(self):
+        """Results ETag follows per-olympiad writes, including bulk imports"""
+        from .importing import ResultsImporter
+
+        url = f"/api/olympiads/{self.olympiad.id}/results/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        ResultsImporter(self.olympiad).run([{"vieta": 1, "punktuSkaits": 10}])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_results_follow_participant_names_only(self):
+        """Only the names of the olympiad's own participants change its results ETag"""
+        Rezultats.objects.create(
+            olimpiade=self.olympiad, lietotajs=self.normal_user, punktuSkaits=10, vieta=1,
+            rezultataDatums=timezone.now().date(),
+        )
+        url = f"/api/olympiads/{self.olympiad.id}/results/"
+        etag = self.client.get(url)["ETag"]
+
+        self.teacher_user.name = "Cits"
+        self.teacher_user.save()
+        self.normal_user.save(update_fields=["last_login"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.normal_user.name = "Pārdēvēts"
+        self.normal_user.save(update_fields=["name"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Pārdēvēts", response.data[0]["lietotajs_name"])
+
+    def test_olympiad_list_last_modified_follows_date(self):
+        """?status= changes at midnight, so Last-Modified does too"""
+        response = self.client.get("/api/olympiads/", {"status": "upcoming"})
+        last_modified = response["Last-Modified"]
+        self.assertEqual(
+            self.client.get("/api/olympiads/", {"status": "upcoming"}, HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch("api.views.timezone.localdate", return_value=tomorrow):
+            response = self.client.get("/api/olympiads/", {"status": "upcoming"}, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_shared_caches_only_for_public_views(self):
+        """Responses to signed-in views are marked private"""
+        self.assertIn("public", self.client.get("/api/olympiads/")["Cache-Control"])
+        self.authenticate_as(self.teacher_user)
+        for url in [f"/api/olympiads/{self.olympiad.id}/", "/api/prieksmeti/", "/api/schools/"]:
+            cache_control = self.client.get(url)["Cache-Control"]
+            self.assertIn("private", cache_control, url)
+            self.assertNotIn("public", cache_control, url)
+
+    def test_user_applications_per_user_version(self):
+        """Another user's application does not invalidate my applications"""
+        self.authenticate_as(self.normal_user)
+        etag = self.client.get("/api/applications/")["ETag"]
+        Pieteikums.objects.create(lietotajs=self.teacher_user, olimpiade=self.olympiad, statuss="Reģistrēts")
+        response = self.client.get("/api/applications/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("private", response["Cache-Control"])
+
+        Pieteikums.objects.create(lietotajs=self.normal_user, olimpiade=self.olympiad, statuss="Reģistrēts")
+        response = self.client.get("/api/applications/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.authenticate_as(self.teacher_user)
+        response = self.client.get("/api/applications/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_reference_data_cache(self):
+        """Subject and school lists are served from process memory until they change"""
+        from .versioning import bump_versions, SUBJECTS
+
+        self.authenticate_as(self.teacher_user)
+        response = self.client.get("/api/prieksmeti/")
+        self.assertEqual([row["nosaukums"] for row in response.json()], ["Matemātika"])
+        etag = response["ETag"]
+
+        # Only the token's user is loaded: no versions, rows or serializer
+        response = self.assertQueryBudget(1, "/api/prieksmeti/")
+        self.assertEqual(response["Content-Type"], "application/json")
+        response = self.client.get("/api/prieksmeti/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Writes in this process drop the copy at once
+        Prieksmets.objects.create(nosaukums="Fizika", kategorija="STEM")
+        response = self.client.get("/api/prieksmeti/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual([row["nosaukums"] for row in response.json()], ["Fizika", "Matemātika"])
+
+        # Another process's write is seen once the shared stamp is re-read
+        Prieksmets.objects.filter(nosaukums="Fizika").update(nosaukums="Ķīmija")
+        bump_versions(SUBJECTS)
+        self.assertIn("Fizika", response.content.decode())
+        self.assertEqual(self.client.get("/api/prieksmeti/").json()[0]["nosaukums"], "Fizika")
+        with override_settings(REFERENCE_DATA_RECHECK_SECONDS=0):
+            names = [row["nosaukums"] for row in self.client.get("/api/prieksmeti/").json()]
+            self.assertEqual(names, ["Matemātika", "Ķīmija"])
+
+        # Filtered requests take the normal path
+        response = self.client.get("/api/schools/")
+        self.assertEqual(len(response.json()), 1)
+        response = self.client.get("/api/schools/", {"search": "nav tādas"})
+        self.assertEqual(response.data, [])
+
+class PaginationTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.now().date()
+        # Several olympiads share a date, so the id tie-breaker matters
+        Olimpiade.objects.bulk_create(
+            Olimpiade(
+                nosaukums=f"Olympiad {i}",
+                datums=today - timedelta(days=i // 3),
+                norisesVieta="Rīga",
+                organizetajs="VISC",
+                prieksmets=self.prieksmets,
+            )
+            for i in range(25)
+        )
+
+    def _walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get("/api/olympiads/")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 25)
+
+    def test_cursor_pages_follow_view_ordering(self):
+        expected = list(self.client.get("/api/olympiads/").data)
+        expected_ids = [row["id"] for row in expected]
+        ids, pages = self._walk("/api/olympiads/?page_size=10")
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, expected_ids)
+
+    def test_previous_link(self):
+        first = self.client.get("/api/olympiads/?page_size=10").data
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual([row["id"] for row in back["results"]], [row["id"] for row in first["results"]])
+
+    def test_page_size_bounded_and_approximate_count(self):
+        from .pagination import KeysetPagination
+
+        response = self.client.get("/api/olympiads/?page_size=100000&count=approx")
+        self.assertEqual(response.data["count"], 25)
+        self.assertTrue(response.data["count_exact"])
+        self.assertLessEqual(len(response.data["results"]), KeysetPagination.max_page_size)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/olympiads/?cursor=bm9wZQ==")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_list_cursor(self):
+        self.authenticate_as(self.admin_user)
+        ids, _ = self._walk("/api/admin/users/?page_size=2")
+        self.assertEqual(ids, list(User.objects.order_by("-create_date", "-id").values_list("id", flat=True)))
+
+class QueryBudgetTests(BaseAPITestCase):
+    """List endpoints run a fixed number of queries whatever the row count"""
+
+    def setUp(self):
+        super().setUp()
+        self.normal_user.skola = self.school
+        self.normal_user.save()
+        self.olympiad = Olimpiade.objects.create(
+            nosaukums="Test Olympiad", datums=timezone.now().date(), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets,
+        )
+
+    def add_rows(self, count):
+        for i in range(count):
+            student = User.objects.create(
+                email=f"student{Pieteikums.objects.count()}@example.com", name="Student", skola=self.school,
+            )
+            olympiad = Olimpiade.objects.create(
+                nosaukums=f"Olympiad {i}", datums=timezone.now().date(), norisesVieta="Rīga",
+                organizetajs="VISC", prieksmets=Prieksmets.objects.create(nosaukums=f"P{i}", kategorija="STEM"),
+            )
+            Pieteikums.objects.create(lietotajs=student, olimpiade=olympiad, statuss="Reģistrēts")
+            Pieteikums.objects.create(lietotajs=self.normal_user, olimpiade=olympiad, statuss="Reģistrēts")
+            Rezultats.objects.create(
+                olimpiade=self.olympiad, lietotajs=student, punktuSkaits=10, vieta=i + 1,
+                rezultataDatums=timezone.now().date(),
+            )
+
+    def assertBudgetIndependentOfRows(self, budget, path, data=None):
+        self.add_rows(1)
+        small = self.assertQueryBudget(budget, path, data)
+        self.add_rows(10)
+        large = self.assertQueryBudget(budget, path, data)
+        self.assertGreater(len(large.data), len(small.data))
+
+    def test_school_applications_budget(self):
+        self.authenticate_as(self.teacher_user)
+        self.assertBudgetIndependentOfRows(2, "/api/schools/applications/")
+
+    def test_user_applications_budget(self):
+        self.authenticate_as(self.normal_user)
+        self.assertBudgetIndependentOfRows(3, "/api/applications/")
+
+    def test_user_list_budget(self):
+        self.authenticate_as(self.admin_user)
+        self.assertBudgetIndependentOfRows(2, "/api/admin/users/")
+
+    def test_school_users_budget(self):
+        self.authenticate_as(self.teacher_user)
+        self.assertBudgetIndependentOfRows(2, "/api/schools/users/", {"school_id": self.school.id})
+
+    def test_olympiad_list_budget(self):
+        self.assertBudgetIndependentOfRows(2, "/api/olympiads/")
+
+    def test_olympiad_results_budget(self):
+        self.assertBudgetIndependentOfRows(2, f"/api/olympiads/{self.olympiad.id}/results/")
+
+@skipUnless(connection.vendor == "sqlite", "SQLite only")
+class DatabaseProfileTests(BaseAPITestCase):
+    @skipUnless(settings.SQLITE_PROFILE == "production", "SQLITE_PROFILE is not production")
+    def test_production_profile_applied_on_connect(self):
+        with connection.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("synchronous", "cache_size", "busy_timeout", "temp_store")
+            }
+        self.assertEqual(pragmas, {"synchronous": 1, "cache_size": -65536, "busy_timeout": 20000, "temp_store": 2})
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_maintenance_command(self):
+        out = StringIO()
+        call_command("sqlite_maintenance", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split(":")[0] for line in lines], ["ANALYZE", "CHECKPOINT"])
+        # The test database lives in memory, without a WAL
+        self.assertIn("not in WAL mode", lines[1])
+
+
+@skipUnless(connection.vendor == "sqlite", "the replica is a SQLite snapshot")
+@override_settings(READ_REPLICAS=["replica"], READ_YOUR_WRITES_SECONDS=60)
+class ReplicaRoutingTests(APITransactionTestCase):
+    """A snapshot copy of the test database serves as the read replica"""
+
+    def setUp(self):
+        cache.clear()
+        refdata.clear()
+        self.prieksmets = Prieksmets.objects.create(nosaukums="Matemātika", kategorija="STEM")
+        self.user = User.objects.create_user(email="reader@example.com", password="Password123")
+        self.olympiad = self.make_olympiad("Snapshot Olympiad")
+        # Committed data (TransactionTestCase), so the backup can read it
+        self.replica_name = os.path.join(tempfile.mkdtemp(), "replica.sqlite3")
+        connection.ensure_connection()
+        snapshot = sqlite3.connect(self.replica_name)
+        connection.connection.backup(snapshot)
+        snapshot.close()
+        # Outside settings.DATABASES, so the test case allows the connection
+        replica = {**connections.settings["default"], **sqlite_replica(self.replica_name)}
+        connections["replica"] = connections["default"].__class__(replica, alias="replica")
+        # Written after the snapshot: only the primary has it
+        self.make_olympiad("Primary Olympiad")
+
+    def tearDown(self):
+        connections["replica"].close()
+        del connections["replica"]
+        shutil.rmtree(os.path.dirname(self.replica_name))
+
+    def authenticate(self, user=None):
+        email = (user or self.user).email
+        response = self.client.post("/api/token/", {"email": email, "password": "Password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def make_olympiad(self, name):
+        return Olimpiade.objects.create(
+            nosaukums=name, datums=timezone.now().date() + timedelta(days=30), maxDalibnieki=10,
+            norisesVieta="Rīga", organizetajs="VISC", prieksmets=self.prieksmets,
+        )
+
+    def olympiad_names(self):
+        response = self.client.get("/api/olympiads/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [olympiad["nosaukums"] for olympiad in response.data]
+
+    def test_public_reads_use_replica(self):
+        self.assertEqual(self.olympiad_names(), ["Snapshot Olympiad"])
+        response = self.client.get(f"/api/olympiads/{self.olympiad.id}/results/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Outside a request everything reads from the primary
+        self.assertEqual(Olimpiade.objects.count(), 2)
+
+    def test_writes_go_to_primary_and_pin_the_writer(self):
+        self.authenticate()
+        self.assertEqual(self.client.get("/api/applications/").data, [])
+        response = self.client.post("/api/applications/create/", {"olympiad_id": self.olympiad.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Pieteikums.objects.using("default").filter(lietotajs=self.user).exists())
+        with connections["replica"].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM "Pieteikumi"')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+        # The client carries the pin, so it holds in any process, whatever its cache
+        pin = response[replicas.PIN_HEADER]
+        cache.clear()
+        self.client.credentials(**self.client._credentials, HTTP_X_READ_PRIMARY=pin)
+        # The writer reads their own write, and sees the primary's olympiads meanwhile
+        self.assertEqual(len(self.client.get("/api/applications/").data), 1)
+        self.assertEqual(len(self.olympiad_names()), 2)
+        # Once the window is over the writer reads the replica again
+        with mock.patch("django.core.signing.time.time", return_value=time.time() + 61):
+            self.assertEqual(self.client.get("/api/applications/").data, [])
+        # The pin is the writer's only
+        other = User.objects.create_user(email="other@example.com", password="Password123")
+        self.authenticate(other)
+        self.client.credentials(**self.client._credentials, HTTP_X_READ_PRIMARY=pin)
+        self.assertEqual(self.olympiad_names(), ["Snapshot Olympiad"])
+        self.client.credentials()
+        self.assertEqual(self.olympiad_names(), ["Snapshot Olympiad"])
+
+    def test_forged_pin_is_ignored(self):
+        self.authenticate()
+        self.client.credentials(**self.client._credentials, HTTP_X_READ_PRIMARY=f"{self.user.pk}:1abc:forged")
+        self.assertEqual(self.olympiad_names(), ["Snapshot Olympiad"])
+
+    def test_failed_write_does_not_pin(self):
+        self.authenticate()
+        response = self.client.post("/api/applications/create/", {"olympiad_id": 999999}, format="json")
+        self.assertGreaterEqual(response.status_code, 400)
+        self.assertNotIn(replicas.PIN_HEADER, response)
+        self.assertEqual(self.olympiad_names(), ["Snapshot Olympiad"])
+
+    def test_replica_is_read_only(self):
+        with self.assertRaises(OperationalError):
+            with connections["replica"].cursor() as cursor:
+                cursor.execute('DELETE FROM "Olimpiades"')
+
+    def test_router(self):
+        router = replicas.ReplicaRouter()
+        self.assertEqual(router.db_for_write(Olimpiade), "default")
+        self.assertIsNone(router.db_for_read(Olimpiade))
+        self.assertFalse(router.allow_migrate("replica", "api"))
+        self.assertIsNone(router.allow_migrate("default", "api"))
+
+
+class RankingTests(BaseAPITestCase):
+    """RES_002: Places follow scores per olympiad"""
+
+    def setUp(self):
+        super().setUp()
+        self.olympiad = Olimpiade.objects.create(
+            nosaukums="Test Olympiad", datums=timezone.now().date(), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=self.prieksmets,
+        )
+
+    def add_result(self, points, vieta=99):
+        return Rezultats.objects.create(
+            olimpiade=self.olympiad, punktuSkaits=points, vieta=vieta, rezultataDatums=timezone.now().date(),
+        )
+
+    def places(self):
+        return list(Rezultats.objects.filter(olimpiade=self.olympiad).order_by("-punktuSkaits", "id")
+                    .values_list("punktuSkaits", "vieta"))
+
+    def test_tie_policies(self):
+        from .ranking import rank_results, DENSE, ORDINAL, COMPETITION
+
+        for points in (80, 90, 70, 80):
+            self.add_result(points)
+        self.assertEqual(self.places(), [(90, 1), (80, 2), (80, 2), (70, 4)])
+
+        rank_results(self.olympiad.id, DENSE)
+        self.assertEqual(self.places(), [(90, 1), (80, 2), (80, 2), (70, 3)])
+        rank_results(self.olympiad.id, ORDINAL)
+        self.assertEqual(self.places(), [(90, 1), (80, 2), (80, 3), (70, 4)])
+        self.assertEqual(rank_results(self.olympiad.id, ORDINAL), 0)
+        self.assertEqual(rank_results(self.olympiad.id, COMPETITION), 1)
+
+        with self.assertRaises(ValueError):
+            rank_results(self.olympiad.id, "olympic")
+
+    def test_insert_updates_only_lower_range(self):
+        top, middle, bottom = self.add_result(90), self.add_result(80), self.add_result(70)
+        self.assertEqual(self.places(), [(90, 1), (80, 2), (70, 3)])
+        # Out of band marker: rows above the new score must not be rewritten
+        Rezultats.objects.filter(pk=top.pk).update(vieta=42)
+
+        new = self.add_result(75, vieta=1)
+        self.assertEqual(new.vieta, 3)
+        self.assertEqual(self.places(), [(90, 42), (80, 2), (75, 3), (70, 4)])
+
+    def test_edit_and_delete(self):
+        results = [self.add_result(points) for points in (90, 80, 70, 60)]
+        Rezultats.objects.filter(pk=results[3].pk).update(vieta=42)
+
+        edited = Rezultats.objects.get(pk=results[2].pk)
+        edited.punktuSkaits = 95
+        edited.save()
+        self.assertEqual(edited.vieta, 1)
+        # 60 is below both the old and the new score
+        self.assertEqual(self.places(), [(95, 1), (90, 2), (80, 3), (60, 42)])
+
+        Rezultats.objects.get(pk=results[0].pk).delete()
+        self.assertEqual(self.places(), [(95, 1), (80, 2), (60, 3)])
+
+    @override_settings(RESULTS_TIE_POLICY="dense")
+    def test_dense_edit_shifts_rows_below(self):
+        first, second, _ = self.add_result(90), self.add_result(80), self.add_result(60)
+        self.assertEqual(self.places(), [(90, 1), (80, 2), (60, 3)])
+        second.punktuSkaits = 90
+        second.save()
+        self.assertEqual(self.places(), [(90, 1), (90, 1), (60, 2)])
+
+    def test_import_ranks_whole_olympiad(self):
+        from .importing import ResultsImporter
+
+        self.add_result(50)
+        ResultsImporter(self.olympiad).run([
+            {"vieta": 1, "punktuSkaits": 40},
+            {"vieta": 1, "punktuSkaits": 70},
+            {"vieta": 7, "punktuSkaits": 70},
+        ])
+        self.assertEqual(self.places(), [(70, 1), (70, 1), (50, 3), (40, 4)])
+
+    def test_import_without_places(self):
+        """Places are optional in imports; a supplied one is ignored, even if it is not a number"""
+        from .importing import ResultsImporter
+
+        report = ResultsImporter(self.olympiad).run([
+            {"punktuSkaits": 40},
+            {"score": 70},
+            {"vieta": "pirmā", "punktuSkaits": 90},
+        ])
+        self.assertEqual((report.created_count, report.errors), (3, []))
+        self.assertEqual(self.places(), [(90, 1), (70, 2), (40, 3)])
 
 class AccessControlTests(BaseAPITestCase):
     def test_AT1_unauthenticated_access_admin_pages(self):
@@ -0,0 +1,121 @@
+"""Data versions for conditional GET (ETag / Last-Modified).
+
+Every write bumps a counter in the DatuVersijas table inside the same
+transaction, so all worker processes agree on the current version and a
+304 can be answered from one small query, without touching the listed
+tables or running a serializer.
+"""
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import DataVersion
+
+OLYMPIADS = 'olimpiades'
+SUBJECTS = 'prieksmeti'
+SCHOOLS = 'skolas'
+USERS = 'konti'
+# Any application / any result, for aggregates spanning olympiads
+APPLICATIONS = 'pieteikumi'
+RESULTS = 'rezultati'
+
+
+def olympiad_key(olympiad_id):
+    return f'olimpiade:{olympiad_id}'
+
+
+def results_key(olympiad_id):
+    return f'rezultati:{olympiad_id}'
+
+
+def user_key(user_id):
+    return f'lietotajs:{user_id}'
+
+
+def bump_versions(*keys):
+    """Increment the given version counters, normally with one UPDATE"""
+    keys = set(keys)
+    now = timezone.now()
+    bumped = DataVersion.objects.filter(key__in=keys)
+    if bumped.update(version=F('version') + 1, changed_at=now) == len(keys):
+        return
+    missing = keys - set(bumped.values_list('key', flat=True))
+    for key in missing:
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(key=key, version=1, changed_at=now)
+        except IntegrityError:
+            # Created concurrently by another writer
+            DataVersion.objects.filter(key=key).update(version=F('version') + 1, changed_at=now)
+
+
+def versioned_cache_key(prefix, versions, *parts):
+    """Cache key that changes whenever any of ``versions`` does"""
+    stamp = "|".join([*map(str, parts), *(f"{key}={versions[key]}" for key in sorted(versions))])
+    return f"{prefix}:{hashlib.sha1(stamp.encode('utf-8')).hexdigest()}"
+
+
+def get_versions(keys):
+    """Return ({key: version}, latest changed_at) for the given keys in one query"""
+    versions = {key: 0 for key in keys}
+    last_modified = None
+    for key, version, changed_at in DataVersion.objects.filter(key__in=keys).values_list(
+        'key', 'version', 'changed_at'
+    ):
+        versions[key] = version
+        if changed_at and (last_modified is None or changed_at > last_modified):
+            last_modified = changed_at
+    return versions, last_modified
+
+
+class ConditionalGetMixin:
+    """Answer GET with ETag / Last-Modified and 304 when the data versions are unchanged.
+
+    Views list the version keys their payload depends on in get_version_keys().
+    Private views also key the ETag on the requesting user. Only public views
+    (no permission classes) may be stored by shared caches.
+    """
+    cache_private = False
+
+    def get_version_keys(self):
+        raise NotImplementedError
+
+    def get_etag(self, request, versions):
+        parts = [type(self).__name__, request.get_full_path()]
+        if self.cache_private:
+            parts.append(f"user={request.user.pk}")
+        parts.extend(f"{key}={versions[key]}" for key in sorted(versions))
+        return '"%s"' % hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get_data_versions(self, request):
+        return get_versions(self.get_version_keys())
+
+    def get_fresh_response(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        # Read versions before the data: a concurrent write then only costs a refetch
+        versions, last_modified = self.get_data_versions(request)
+        self.data_versions = versions
+        etag = self.get_etag(request, versions)
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if response is None:
+            response = self.get_fresh_response(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified_ts is not None:
+                response['Last-Modified'] = http_date(last_modified_ts)
+            if self.cache_private:
+                patch_cache_control(response, private=True, no_cache=True)
+            elif self.permission_classes:
+                # Only for the signed-in user's browser, never a shared cache
+                patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            else:
+                patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+        return response
@@ -2,19 +2,38 @@ from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework_simplejwt.views import TokenObtainPairView
-from django.db.models import Q
-import json
-import requests
-from datetime import datetime
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.db import IntegrityError
+from django.db.models import Q, Max
 from django.utils import timezone
+from datetime import datetime, time
 from .serializers import (
-    RegisterSerializer, UserSerializer, CustomTokenObtainPairSerializer, 
+    RegisterSerializer, UserSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer,
     ProfileUpdateSerializer, AdminUserSerializer, PasswordChangeSerializer,
     SkolaSerializer, OlimpiadeSerializer, PrieksmetsSerializer, PieteikumsSerializer,
-    RezultatsSerializer
+    RezultatsSerializer, ImportJobSerializer
+)
+from .models import User, Skola, Olimpiade, Prieksmets, Pieteikums, Rezultats, ImportJob
+from .importing import (
+    ResultsImporter, ImportFormatError, iter_results,
+    MISSING_RESULTS, RESULTS_NOT_LIST, STREAM_CHUNK_SIZE
+)
+from .jobs import submit_import_job
+from .enrollment import enroll_users, parse_csv, EnrollmentFormatError, USERS_NOT_LIST
+from .bulk import update_users, update_application_status, BatchRefused
+from .seats import register, set_status, NO_FREE_SEATS
+from . import versioning
+from .versioning import ConditionalGetMixin
+from .refdata import ReferenceDataMixin
+from .search import search_olympiads, search_users
+from .leaderboard import get_leaderboard, LEADERBOARD_ORDERING
+from .facets import get_facet_counts
+from .stats import get_school_stats
+from .distribution import get_score_distribution, DEFAULT_BINS, MAX_BINS
+from .filters import (
+    filter_olympiads, order_olympiads, order_users,
+    OLYMPIAD_ORDERINGS, DEFAULT_OLYMPIAD_ORDERING, USER_ORDERINGS, DEFAULT_USER_ORDERING
 )
-from .models import User, Skola, Olimpiade, Prieksmets, Pieteikums, Rezultats
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -62,6 +81,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
+
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.user_type == 'admin'
@@ -77,16 +100,12 @@ class UserListSearchView(generics.ListAPIView):
     serializer_class = UserSerializer
     
     def get_queryset(self):
-        queryset = User.objects.all().order_by('-create_date')
-        search = self.request.query_params.get('search', None)
+        params = self.request.query_params
+        queryset = User.objects.select_related('skola').order_by(*USER_ORDERINGS[DEFAULT_USER_ORDERING])
+        search = params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(email__icontains=search) |
-                Q(name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(number__icontains=search)
-            )
-        return queryset
+            queryset = search_users(queryset, search)
+        return order_users(queryset, params)
 
 
 class AdminUserCreateView(generics.CreateAPIView):
@@ -100,6 +119,73 @@ class AdminUserCreateView(generics.CreateAPIView):
         return context
 
 
+class BulkUserCreateView(generics.GenericAPIView):
+    """Create many users at once - Teachers and Admins
+
+    POST {"users": [{"email": ..., "password": ..., ...}, ...]} as JSON, or a
+    CSV file with a header row of the same field names as multipart 'file'
+    (or as text in 'csv'). An optional 'skola' applies to rows without one;
+    teachers always enroll into their own school. Responds with a per-row
+    report; invalid rows are skipped.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsTeacherOrAdmin]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.user_type == 'teacher' and not request.user.skola_id:
+            # Their rows would otherwise be created without a school
+            return Response(
+                {"detail": "Jums nav tiesību pievienot lietotājus"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        data = request.data
+        default_school = None
+        try:
+            if isinstance(data, list):
+                rows = data
+            elif 'file' in request.FILES:
+                rows = parse_csv(request.FILES['file'])
+            elif isinstance(data.get('csv'), str):
+                rows = parse_csv(data['csv'])
+            else:
+                rows = data.get('users')
+                if not isinstance(rows, list):
+                    raise EnrollmentFormatError(USERS_NOT_LIST)
+            if not isinstance(data, list):
+                default_school = data.get('skola')
+            report = enroll_users(rows, request, default_school=default_school)
+        except EnrollmentFormatError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            # Another request took one of the e-mails after validation
+            return Response(
+                {"detail": "E-pasts jau tiek izmantots citam profilam; neviens lietotājs netika izveidots"},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(report.as_response_data(), status=status.HTTP_200_OK)
+
+
+class BulkUserUpdateView(generics.GenericAPIView):
+    """Change many users at once - Teachers and Admins
+
+    POST {"user_ids": [...], "operation": ...} where operation is
+    'set_school' (with "school_id"), 'clear_school', 'set_user_type' (with
+    "user_type", admins only) or 'set_active' (with "is_active", admins
+    only). The same rules as the single-user views apply per user; responds
+    with the applied ids and the rejected ones with a reason.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsTeacherOrAdmin]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            result = update_users(request.data.get('operation'), request.user, request.data)
+        except BatchRefused as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+        return Response(
+            result.as_response_data(f"Izmaiņas piemērotas {len(result.applied)} lietotājiem"),
+            status=status.HTTP_200_OK
+        )
+
+
 class AdminUserUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     serializer_class = AdminUserSerializer
@@ -158,9 +244,12 @@ class PasswordChangeView(generics.GenericAPIView):
         return Response({"detail": "Parole veiksmīgi nomainīta"}, status=status.HTTP_200_OK)
 
 
-class SchoolListView(generics.ListAPIView):
+class SchoolListView(ReferenceDataMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrAdmin]
     serializer_class = SkolaSerializer
+
+    def get_version_keys(self):
+        return [versioning.SCHOOLS]
     
     def get_queryset(self):
         queryset = Skola.objects.all().order_by('nosaukums')
@@ -180,6 +269,40 @@ class SchoolDetailView(generics.RetrieveAPIView):
     queryset = Skola.objects.all()
 
 
+class IsOwnSchoolTeacherOrAdmin(permissions.BasePermission):
+    """Admins see every school, teachers only the school in the URL if it is theirs"""
+    message = "Jums nav tiesību skatīt šīs skolas datus"
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if user.user_type == 'admin':
+            return True
+        return user.user_type == 'teacher' and user.skola_id is not None and user.skola_id == view.kwargs.get('pk')
+
+
+class SchoolStatsView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """Applications and results of a school's users, aggregated per olympiad - Own school teachers and Admins"""
+    permission_classes = [permissions.IsAuthenticated, IsOwnSchoolTeacherOrAdmin]
+    cache_private = True
+
+    def get_version_keys(self):
+        return [
+            versioning.SCHOOLS, versioning.USERS, versioning.OLYMPIADS,
+            versioning.APPLICATIONS, versioning.RESULTS,
+        ]
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return Response(get_school_stats(self.kwargs['pk'], self.data_versions))
+        except Skola.DoesNotExist:
+            return Response(
+                {"detail": "Skola nav atrasta"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+
 class SchoolCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     serializer_class = SkolaSerializer
@@ -240,7 +363,7 @@ class AddUserToSchoolView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         if request.user.user_type == 'teacher':
-            if not request.user.skola or request.user.skola.id != school.id:
+            if request.user.skola_id != school.id:
                 return Response(
                     {"detail": "Jums nav tiesību pievienot lietotājus šai skolai"},
                     status=status.HTTP_403_FORBIDDEN
@@ -300,17 +423,17 @@ class RemoveUserFromSchoolView(generics.GenericAPIView):
             )
 
         if request.user.user_type == 'teacher':
-            if not request.user.skola:
+            if not request.user.skola_id:
                 return Response(
                     {"detail": "Jums nav tiesību noņemt lietotājus"},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            if school and school.id != request.user.skola.id:
+            if school and school.id != request.user.skola_id:
                 return Response(
                     {"detail": "Jums nav tiesību noņemt lietotājus no šīs skolas"},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            if user.skola != request.user.skola:
+            if user.skola_id != request.user.skola_id:
                 return Response(
                     {"detail": "Jums nav tiesību noņemt lietotāju no citas skolas"},
                     status=status.HTTP_403_FORBIDDEN
@@ -343,17 +466,17 @@ class SchoolUsersListView(generics.ListAPIView):
         user = self.request.user
 
         if user.user_type == 'teacher':
-            if not user.skola:
+            if not user.skola_id:
                 return User.objects.none()
-            return User.objects.filter(skola=user.skola).exclude(user_type='admin').order_by('name', 'last_name')
-
-        try:
-            school = Skola.objects.get(id=school_id)
-            # Filter out admin users from school users list (they shouldn't be in schools)
-            return User.objects.filter(skola=school).exclude(user_type='admin').order_by('name', 'last_name')
-        except Skola.DoesNotExist:
+            school_id = user.skola_id
+        elif not Skola.objects.filter(id=school_id).exists():
             return User.objects.none()
 
+        # Filter out admin users from school users list (they shouldn't be in schools)
+        return User.objects.filter(skola_id=school_id).exclude(user_type='admin').select_related(
+            'skola'
+        ).order_by('name', 'last_name')
+
 
 class UsersWithoutSchoolListView(generics.ListAPIView):
     """Get all users without a school"""
@@ -366,38 +489,57 @@ class UsersWithoutSchoolListView(generics.ListAPIView):
         queryset = User.objects.filter(skola__isnull=True).exclude(user_type='admin').order_by('name', 'last_name')
         
         if search:
-            queryset = queryset.filter(
-                Q(email__icontains=search) |
-                Q(name__icontains=search) |
-                Q(last_name__icontains=search)
-            )
+            queryset = search_users(queryset, search, fields=('email', 'name', 'last_name'))
         
         return queryset
 
 
-class PrieksmetsListView(generics.ListAPIView):
+class PrieksmetsListView(ReferenceDataMixin, generics.ListAPIView):
     """Get all subjects"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PrieksmetsSerializer
     queryset = Prieksmets.objects.all().order_by('nosaukums')
 
+    def get_version_keys(self):
+        return [versioning.SUBJECTS]
+
 
-class OlympiadListView(generics.ListAPIView):
+class OlympiadListView(ConditionalGetMixin, generics.ListAPIView):
     """OLYMP_003, OLYMP_004: List and search olympiads - All users (public)"""
     permission_classes = []  # Public access
     serializer_class = OlimpiadeSerializer
+
+    def get_version_keys(self):
+        return [versioning.OLYMPIADS, versioning.SUBJECTS]
+
+    def get_data_versions(self, request):
+        # ?status= moves with the calendar, not only with writes: a new day
+        # changes the ETag and, from midnight, Last-Modified
+        versions, last_modified = super().get_data_versions(request)
+        today = timezone.localdate()
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        versions = {**versions, 'today': today.isoformat()}
+        return versions, max(last_modified, midnight) if last_modified else midnight
     
     def get_queryset(self):
-        queryset = Olimpiade.objects.all().order_by('-datums')
-        search = self.request.query_params.get('search', None)
+        params = self.request.query_params
+        queryset = Olimpiade.objects.select_related('prieksmets').order_by(
+            *OLYMPIAD_ORDERINGS[DEFAULT_OLYMPIAD_ORDERING]
+        )
+        queryset = filter_olympiads(queryset, params)
+        search = params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(nosaukums__icontains=search) |
-                Q(norisesVieta__icontains=search) |
-                Q(organizetajs__icontains=search) |
-                Q(prieksmets__nosaukums__icontains=search)
-            )
-        return queryset
+            queryset = search_olympiads(queryset, search)
+        return order_olympiads(queryset, params)
+
+
+class OlympiadFacetsView(OlympiadListView):
+    """OLYMP_004: Filter options with counts for the current search/filters - All users (public)"""
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        today = timezone.localdate().isoformat()
+        return Response(get_facet_counts(request.query_params, self.data_versions, today))
 
 
 class OlympiadCreateView(generics.CreateAPIView):
@@ -425,11 +567,14 @@ class OlympiadDeleteView(generics.DestroyAPIView):
     serializer_class = OlimpiadeSerializer
 
 
-class OlympiadDetailView(generics.RetrieveAPIView):
+class OlympiadDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Get olympiad details"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = OlimpiadeSerializer
-    queryset = Olimpiade.objects.all()
+    queryset = Olimpiade.objects.select_related('prieksmets')
+
+    def get_version_keys(self):
+        return [versioning.olympiad_key(self.kwargs['pk']), versioning.SUBJECTS]
 
 
 class SchoolApplicationsListView(generics.ListAPIView):
@@ -443,26 +588,25 @@ class SchoolApplicationsListView(generics.ListAPIView):
         
         # Teachers see their own school's applications
         if user.user_type == 'teacher':
-            if not user.skola:
+            if not user.skola_id:
                 return Pieteikums.objects.none()
-            school_id = user.skola.id
+            school_id = user.skola_id
         
         # Admins can specify school_id
         if not school_id:
             return Pieteikums.objects.none()
         
-        try:
-            school = Skola.objects.get(id=school_id)
-            # Get applications from users in this school
-            return Pieteikums.objects.filter(
-                lietotajs__skola=school
-            ).order_by('-pieteikumaDatums')
-        except Skola.DoesNotExist:
-            return Pieteikums.objects.none()
+        # Get applications from users in this school
+        return Pieteikums.objects.filter(
+            lietotajs__skola_id=school_id
+        ).select_related('lietotajs__skola', 'olimpiade').order_by('-pieteikumaDatums')
 
 
 class CreateApplicationView(generics.GenericAPIView):
-    """Create application for an olympiad - Authenticated users"""
+    """Create application for an olympiad - Authenticated users
+
+    Past maxDalibnieki the application goes on the waiting list (api.seats).
+    """
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, *args, **kwargs):
@@ -482,40 +626,37 @@ class CreateApplicationView(generics.GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        existing_application = Pieteikums.objects.filter(
-            lietotajs=request.user,
-            olimpiade=olympiad
-        ).first()
-        
-        if existing_application:
+        application = register(request.user, olympiad)
+        if application is None:
             return Response(
                 {"detail": "Jūs jau esat reģistrējušies šai olimpiādei"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
 
-        application = Pieteikums.objects.create(
-            lietotajs=request.user,
-            olimpiade=olympiad,
-            statuss="Reģistrēts"
-        )
-        
+        detail = "Pieteikums veiksmīgi izveidots"
+        if application.statuss == Pieteikums.WAITLISTED:
+            detail = f"{NO_FREE_SEATS}, pieteikums pievienots gaidīšanas sarakstam"
         serializer = PieteikumsSerializer(application)
         return Response(
-            {"detail": "Pieteikums veiksmīgi izveidots", "application": serializer.data},
+            {"detail": detail, "application": serializer.data},
             status=status.HTTP_201_CREATED
         )
 
 
-class UserApplicationsListView(generics.ListAPIView):
+class UserApplicationsListView(ConditionalGetMixin, generics.ListAPIView):
     """Get all applications for the current logged in user"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PieteikumsSerializer
+    cache_private = True
+
+    def get_version_keys(self):
+        # The user's own applications and profile, plus olympiad and school names
+        return [versioning.user_key(self.request.user.pk), versioning.OLYMPIADS, versioning.SCHOOLS]
     
     def get_queryset(self):
         return Pieteikums.objects.filter(
             lietotajs=self.request.user
-        ).order_by('-pieteikumaDatums')
+        ).select_related('lietotajs__skola', 'olimpiade').order_by('-pieteikumaDatums')
 
 
 class UpdateApplicationStatusView(generics.GenericAPIView):
@@ -533,18 +674,21 @@ class UpdateApplicationStatusView(generics.GenericAPIView):
             )
         
         try:
-            application = Pieteikums.objects.get(id=application_id)
+            application = Pieteikums.objects.select_related('lietotajs').get(id=application_id)
             
             # Teachers can only approve applications from their school
             if request.user.user_type == 'teacher':
-                if not request.user.skola or application.lietotajs.skola != request.user.skola:
+                if not request.user.skola_id or application.lietotajs.skola_id != request.user.skola_id:
                     return Response(
                         {"detail": "Jums nav tiesību apstiprināt šo pieteikumu"},
                         status=status.HTTP_403_FORBIDDEN
                     )
             
-            application.statuss = new_status
-            application.save()
+            if not set_status(application, new_status):
+                return Response(
+                    {"detail": NO_FREE_SEATS},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             return Response(
                 {"detail": f"Pieteikuma statuss veiksmīgi nomainīts uz {new_status}"},
@@ -557,21 +701,75 @@ class UpdateApplicationStatusView(generics.GenericAPIView):
             )
 
 
-class OlympiadResultsListView(generics.ListAPIView):
+class BulkApplicationStatusView(generics.GenericAPIView):
+    """FORM_005: Change the status of many applications - Teachers and Admins
+
+    PATCH {"application_ids": [...], "status": ...}. Teachers can only change
+    applications from their school; the others are refused per id.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsTeacherOrAdmin]
+
+    def patch(self, request, *args, **kwargs):
+        try:
+            result = update_application_status(request.user, request.data)
+        except BatchRefused as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+        return Response(
+            result.as_response_data(
+                f"Atjaunināti {len(result.applied)} pieteikumi", applied_key='updated', rejected_key='refused'
+            ),
+            status=status.HTTP_200_OK
+        )
+
+
+class OlympiadResultsListView(ConditionalGetMixin, generics.ListAPIView):
     """RES_001: Get results for an olympiad - All users (public)"""
     permission_classes = []  # Public access
     serializer_class = RezultatsSerializer
+
+    def get_version_keys(self):
+        olympiad_id = self.kwargs.get('pk')
+        # Participant name changes bump results_key too (api.signals)
+        return [versioning.results_key(olympiad_id), versioning.olympiad_key(olympiad_id)]
     
     def get_queryset(self):
+        return Rezultats.objects.filter(olimpiade_id=self.kwargs.get('pk')).select_related(
+            'lietotajs', 'olimpiade'
+        ).order_by(*LEADERBOARD_ORDERING)
+
+    def list(self, request, *args, **kwargs):
         olympiad_id = self.kwargs.get('pk')
-        if not olympiad_id:
-            return Rezultats.objects.none()
-        
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            # Whole table: one joined query, cached until the results change
+            return Response(get_leaderboard(olympiad_id, self.data_versions))
+
+        max_points = queryset.aggregate(max_points=Max('punktuSkaits'))['max_points']
+        serializer = self.get_serializer(page, many=True, context={
+            **self.get_serializer_context(), 'max_points': max_points,
+        })
+        return self.get_paginated_response(serializer.data)
+
+
+class OlympiadDistributionView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """Score histogram, quartiles, mean, standard deviation and percentiles for an olympiad - All users (public)"""
+    permission_classes = []  # Public access
+
+    def get_version_keys(self):
+        return [versioning.results_key(self.kwargs.get('pk'))]
+
+    def retrieve(self, request, *args, **kwargs):
         try:
-            olympiad = Olimpiade.objects.get(id=olympiad_id)
-            return Rezultats.objects.filter(olimpiade=olympiad).order_by('vieta', '-punktuSkaits')
-        except Olimpiade.DoesNotExist:
-            return Rezultats.objects.none()
+            bins = int(request.query_params.get('bins', DEFAULT_BINS))
+        except ValueError:
+            bins = 0
+        if not 1 <= bins <= MAX_BINS:
+            return Response(
+                {"detail": f"Intervālu skaitam jābūt no 1 līdz {MAX_BINS}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_score_distribution(self.kwargs['pk'], self.data_versions, bins))
 
 
 class ImportResultsView(generics.GenericAPIView):
@@ -581,7 +779,7 @@ class ImportResultsView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         
         olympiad_id = request.data.get('olympiad_id')
-        import_type = request.data.get('import_type')  # 'url' or 'file'
+        import_type = request.data.get('import_type')  # 'url', 'file' or 'upload'
         url = request.data.get('url')
         results_data = request.data.get('results_data')
         
@@ -599,115 +797,97 @@ class ImportResultsView(generics.GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Parse JSON data
-        json_data = None
         if import_type == 'url':
             if not url:
                 return Response(
                     {"detail": "URL ir obligāts"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                json_data = response.json()
-            except requests.RequestException as e:
+            # Downloading and inserting happens on the worker pool, not in this request
+            job = submit_import_job(olympiad, url, user=request.user)
+            return Response(
+                {"detail": "Imports ievietots rindā", **ImportJobSerializer(job).data},
+                status=status.HTTP_202_ACCEPTED
+            )
+        elif import_type == 'file':
+            if not results_data:
                 return Response(
-                    {"detail": f"Neizdevās ielādēt datus no URL: {str(e)}"},
+                    {"detail": "JSON dati ir obligāti"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            except json.JSONDecodeError:
+            if isinstance(results_data, str):
+                return self.run_import(olympiad, iter_results([results_data]))
+            # Already parsed as part of a JSON request body
+            if not isinstance(results_data, dict) or 'results' not in results_data:
                 return Response(
-                    {"detail": "Nederīgs JSON formāts no URL"},
+                    {"detail": MISSING_RESULTS},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-        elif import_type == 'file':
-            if not results_data:
+            results_list = results_data.get('results', [])
+            if not isinstance(results_list, list):
                 return Response(
-                    {"detail": "JSON dati ir obligāti"},
+                    {"detail": RESULTS_NOT_LIST},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            try:
-                json_data = json.loads(results_data) if isinstance(results_data, str) else results_data
-            except json.JSONDecodeError:
+            return self.run_import(olympiad, results_list)
+        elif import_type == 'upload':
+            upload = request.FILES.get('file')
+            if not upload:
                 return Response(
-                    {"detail": "Nederīgs JSON formāts"},
+                    {"detail": "JSON fails ir obligāts"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            return self.run_import(olympiad, iter_results(upload.chunks(STREAM_CHUNK_SIZE)))
         else:
             return Response(
-                {"detail": "Importa veids jābūt 'url' vai 'file'"},
+                {"detail": "Importa veids jābūt 'url', 'file' vai 'upload'"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Validate JSON structure
-        if not isinstance(json_data, dict) or 'results' not in json_data:
+
+    def run_import(self, olympiad, rows):
+        """Validate and insert rows in batches; parse errors roll the import back"""
+        try:
+            report = ResultsImporter(olympiad).run(rows)
+        except ImportFormatError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report.as_response_data(), status=status.HTTP_200_OK)
+
+
+class ImportResultsStreamView(ImportResultsView):
+    """RES_004: Import results streamed as the raw JSON request body - Admin only
+
+    POST /api/results/import/stream/?olympiad_id=<id> with the JSON document
+    as the body. The body is read in chunks and never loaded as a whole.
+    """
+
+    def post(self, request, *args, **kwargs):
+        olympiad_id = request.query_params.get('olympiad_id')
+        if not olympiad_id:
             return Response(
-                {"detail": "JSON datiem jāsatur 'results' masīvs"},
+                {"detail": "Olimpiādes ID ir obligāts"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        results_list = json_data.get('results', [])
-        if not isinstance(results_list, list):
+        try:
+            olympiad = Olimpiade.objects.get(id=olympiad_id)
+        except (Olimpiade.DoesNotExist, ValueError):
             return Response(
-                {"detail": "'results' jābūt masīvam"},
+                {"detail": "Olimpiāde nav atrasta"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        # request.data is never touched, so DRF does not parse the body
+        body = request.stream
+        if body is None:
+            return Response(
+                {"detail": "JSON dati ir obligāti"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Import results
-        created_count = 0
-        errors = []
-        
-        for idx, result_data in enumerate(results_list):
-            try:
-                vieta = result_data.get('vieta') or result_data.get('rank') or result_data.get('place')
-                punktuSkaits = result_data.get('punktuSkaits') or result_data.get('points') or result_data.get('score')
-                lietotajs_email = result_data.get('lietotajs_email') or result_data.get('user_email') or result_data.get('email')
-                rezultataDatums_str = result_data.get('rezultataDatums') or result_data.get('result_date') or result_data.get('date')
-                
-                if not vieta or punktuSkaits is None:
-                    errors.append(f"Rezultāts {idx + 1}: trūkst 'vieta' vai 'punktuSkaits'")
-                    continue
-                
-                # Parse date
-                if rezultataDatums_str:
-                    try:
-                        if isinstance(rezultataDatums_str, str):
-                            rezultataDatums = datetime.strptime(rezultataDatums_str, '%Y-%m-%d').date()
-                        else:
-                            rezultataDatums = timezone.now().date()
-                    except ValueError:
-                        rezultataDatums = timezone.now().date()
-                else:
-                    rezultataDatums = timezone.now().date()
-                
-                # Find user if email provided
-                lietotajs = None
-                if lietotajs_email:
-                    try:
-                        lietotajs = User.objects.get(email=lietotajs_email)
-                    except User.DoesNotExist:
-                        pass  # Create result without user
-                
-                # Create result
-                Rezultats.objects.create(
-                    olimpiade=olympiad,
-                    vieta=int(vieta),
-                    punktuSkaits=float(punktuSkaits),
-                    rezultataDatums=rezultataDatums,
-                    lietotajs=lietotajs
-                )
-                created_count += 1
-            except Exception as e:
-                errors.append(f"Rezultāts {idx + 1}: {str(e)}")
-        
-        response_data = {
-            "detail": f"Veiksmīgi importēti {created_count} rezultāti",
-            "created_count": created_count,
-            "total_count": len(results_list)
-        }
-        
-        if errors:
-            response_data["errors"] = errors
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        return self.run_import(olympiad, iter_results(iter(lambda: body.read(STREAM_CHUNK_SIZE), b'')))
+
+
+class ImportJobStatusView(generics.RetrieveAPIView):
+    """RES_004: State and progress of a background results import - Admin only"""
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    serializer_class = ImportJobSerializer
+    queryset = ImportJob.objects.all()
+    # Progress is written by the import worker, not by the polling admin
+    read_from_primary = True
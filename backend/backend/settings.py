@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-6uaeq8@=nzjxhfd%oh9pivwawu+-%ovzk9-=9^_e$fd$9uc&e3'
@@ -29,6 +32,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.replicas.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -50,12 +54,100 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
-DATABASES = {
+# SQLite connection profiles, picked with SQLITE_PROFILE
+SQLITE_PROFILES = {
+    # Django's defaults: rollback journal, a new connection per request
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {},
+        'CONN_MAX_AGE': 0,
+    },
+    # Readers run alongside the writer (WAL) and writers queue for the lock
+    # instead of failing with "database is locked"
+    'production': {
+        'OPTIONS': {
+            # Seconds to wait for a lock (SQLite's busy_timeout)
+            'timeout': 20,
+            # Take the write lock at BEGIN; a deferred transaction that reads
+            # first fails at its first write if another writer got in between
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                # Durable at WAL checkpoints; a crash cannot corrupt the file
+                'PRAGMA synchronous=NORMAL',
+                'PRAGMA mmap_size=268435456',  # 256 MB
+                'PRAGMA cache_size=-65536',  # 64 MB per connection
+                'PRAGMA temp_store=MEMORY',
+            ]),
+            # Prepared statements kept per connection (sqlite3 default: 128)
+            'cached_statements': 512,
+        },
+        # Reuse a connection (and its page cache) across requests
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    },
 }
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+
+# DATABASE_ENGINE=postgresql uses PostgreSQL (psycopg 3 with psycopg-pool),
+# configured by the POSTGRES_* variables; SQLite otherwise
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'lsos'),
+            'USER': os.environ.get('POSTGRES_USER', 'lsos'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'OPTIONS': {
+                # A connection pool per process; replaces CONN_MAX_AGE, which must stay 0
+                'pool': {
+                    'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 10)),
+                    # Seconds a request waits for a free connection
+                    'timeout': 10,
+                },
+            },
+            # Django then has the pool check connections when they are taken
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            **SQLITE_PROFILES[SQLITE_PROFILE],
+        }
+    }
+
+
+def sqlite_replica(name):
+    """Read-only settings for a SQLite snapshot copy of the database"""
+    profile = SQLITE_PROFILES[SQLITE_PROFILE]
+    options = {key: value for key, value in profile['OPTIONS'].items() if key != 'transaction_mode'}
+    options['init_command'] = ';'.join(filter(None, [options.get('init_command'), 'PRAGMA query_only=ON']))
+    return {**DATABASES['default'], **profile, 'NAME': name, 'OPTIONS': options}
+
+
+# Read replicas (api.replicas): DATABASE_REPLICAS is a comma-separated list of
+# PostgreSQL hosts, or of SQLite snapshot files. Public GET requests read from
+# them; writes, and a user's reads for READ_YOUR_WRITES_SECONDS after they
+# wrote, stay on the primary.
+READ_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    if DATABASE_ENGINE == 'postgresql':
+        replica_settings = {**DATABASES['default'], 'HOST': replica.strip()}
+    else:
+        replica_settings = sqlite_replica(replica.strip())
+    # Tests read the test database through the replica aliases
+    DATABASES[f'replica{number}'] = {**replica_settings, 'TEST': {'MIRROR': 'default'}}
+    READ_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+READ_YOUR_WRITES_SECONDS = 10
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -86,15 +178,78 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # Builds request.user from token claims (user_type, skola_id) without a query
+        "api.authentication.ClaimsJWTAuthentication",
     ),
+    # Opt-in: lists are paginated when ?page_size= or ?cursor= is given
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetPagination",
 }
 
 AUTH_USER_MODEL = "api.User"
 
+# Background results imports (api.jobs): worker threads per process, and
+# whether to run jobs inline on commit instead (useful for tests)
+RESULTS_IMPORT_WORKERS = 2
+RESULTS_IMPORT_EAGER = False
+# A job still running this many seconds after it started is taken to be
+# interrupted (its process died) and is failed by run_import_jobs
+RESULTS_IMPORT_STALE_SECONDS = 60 * 60
+
+# How tied scores share places (api.ranking): competition, dense or ordinal
+RESULTS_TIE_POLICY = 'competition'
+
+# Seconds a process trusts its cached subject / school lists before
+# re-reading the shared version stamp (api.refdata)
+REFERENCE_DATA_RECHECK_SECONDS = 5
+
+# How long a user's token version is cached (api.authentication); a role or
+# school change reaches other processes' caches within this many seconds
+TOKEN_VERSION_CACHE_SECONDS = 30
+
+# Password hasher profiles, picked with PASSWORD_HASHER_PROFILE. The first
+# hasher hashes new passwords; the others still verify older hashes, which
+# are re-hashed with the first one on the next successful login.
+PASSWORD_HASHER_PROFILES = {
+    # Django's default
+    "pbkdf2": [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "api.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+    # Memory-hard and cheaper per login; standard library only
+    "scrypt": [
+        "api.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+    # Needs the argon2-cffi package
+    "argon2": [
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "api.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+}
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "pbkdf2")
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+# Passwords hashed at once per process (api.hashing); more logins queue
+PASSWORD_HASHING_WORKERS = os.cpu_count() or 1
+# Worker processes for bulk hashing, e.g. bulk user enrollment
+PASSWORD_HASHING_PROCESSES = os.cpu_count() or 1
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# The frontend reads and returns the read-your-writes pin (api.replicas)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-read-primary')
+CORS_EXPOSE_HEADERS = ['X-Read-Primary']
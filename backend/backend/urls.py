@@ -1,31 +1,32 @@
 from django.contrib import admin
 from django.urls import path
 from api.views import (
-    RegisterView, ProfileView, ProfileUpdateView, CustomTokenObtainPairView,
-    UserListSearchView, AdminUserCreateView, AdminUserUpdateView, AdminUserDeleteView,
-    PasswordChangeView, SchoolListView, SchoolDetailView, SchoolCreateView, SchoolUpdateView, SchoolDeleteView,
+    RegisterView, ProfileView, ProfileUpdateView, CustomTokenObtainPairView, CustomTokenRefreshView,
+    UserListSearchView, AdminUserCreateView, BulkUserCreateView, BulkUserUpdateView, AdminUserUpdateView, AdminUserDeleteView,
+    PasswordChangeView, SchoolListView, SchoolDetailView, SchoolStatsView, SchoolCreateView, SchoolUpdateView, SchoolDeleteView,
     AddUserToSchoolView, RemoveUserFromSchoolView, SchoolUsersListView, UsersWithoutSchoolListView,
-    PrieksmetsListView, OlympiadListView, OlympiadDetailView, OlympiadCreateView, OlympiadUpdateView, OlympiadDeleteView,
-    SchoolApplicationsListView, UserApplicationsListView, CreateApplicationView, UpdateApplicationStatusView, OlympiadResultsListView, ImportResultsView
-)
-from rest_framework_simplejwt.views import (
-    TokenRefreshView,
+    PrieksmetsListView, OlympiadListView, OlympiadFacetsView, OlympiadDetailView, OlympiadCreateView, OlympiadUpdateView, OlympiadDeleteView,
+    SchoolApplicationsListView, UserApplicationsListView, CreateApplicationView, UpdateApplicationStatusView, BulkApplicationStatusView, OlympiadResultsListView, OlympiadDistributionView, ImportResultsView,
+    ImportResultsStreamView, ImportJobStatusView
 )
 urlpatterns = [
     path('admin/', admin.site.urls),
 
     path('api/register/', RegisterView.as_view()),
     path("api/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/refresh/", CustomTokenRefreshView.as_view(), name="token_refresh"),
     path("api/profile/", ProfileView.as_view(), name="profile"),
     path("api/profile/update/", ProfileUpdateView.as_view(), name="profile_update"),
     path("api/profile/change-password/", PasswordChangeView.as_view(), name="change_password"),
     path("api/admin/users/", UserListSearchView.as_view(), name="admin_users_list"),
     path("api/admin/users/create/", AdminUserCreateView.as_view(), name="admin_user_create"),
+    path("api/admin/users/bulk-create/", BulkUserCreateView.as_view(), name="admin_user_bulk_create"),
+    path("api/admin/users/bulk-update/", BulkUserUpdateView.as_view(), name="admin_user_bulk_update"),
     path("api/admin/users/<int:pk>/update/", AdminUserUpdateView.as_view(), name="admin_user_update"),
     path("api/admin/users/<int:pk>/delete/", AdminUserDeleteView.as_view(), name="admin_user_delete"),
     path("api/schools/", SchoolListView.as_view(), name="schools_list"),
     path("api/schools/<int:pk>/", SchoolDetailView.as_view(), name="school_detail"),
+    path("api/schools/<int:pk>/stats/", SchoolStatsView.as_view(), name="school_stats"),
     path("api/schools/create/", SchoolCreateView.as_view(), name="school_create"),
     path("api/schools/<int:pk>/update/", SchoolUpdateView.as_view(), name="school_update"),
     path("api/schools/<int:pk>/delete/", SchoolDeleteView.as_view(), name="school_delete"),
@@ -36,13 +37,18 @@ urlpatterns = [
     path("api/prieksmeti/", PrieksmetsListView.as_view(), name="prieksmeti_list"),
     path("api/olympiads/", OlympiadListView.as_view(), name="olympiads_list"),
     path("api/olympiads/<int:pk>/", OlympiadDetailView.as_view(), name="olympiad_detail"),
+    path("api/olympiads/facets/", OlympiadFacetsView.as_view(), name="olympiad_facets"),
     path("api/olympiads/create/", OlympiadCreateView.as_view(), name="olympiad_create"),
     path("api/olympiads/<int:pk>/update/", OlympiadUpdateView.as_view(), name="olympiad_update"),
     path("api/olympiads/<int:pk>/delete/", OlympiadDeleteView.as_view(), name="olympiad_delete"),
     path("api/olympiads/<int:pk>/results/", OlympiadResultsListView.as_view(), name="olympiad_results_list"),
+    path("api/olympiads/<int:pk>/distribution/", OlympiadDistributionView.as_view(), name="olympiad_distribution"),
     path("api/results/import/", ImportResultsView.as_view(), name="import_results"),
+    path("api/results/import/stream/", ImportResultsStreamView.as_view(), name="import_results_stream"),
+    path("api/results/import/<int:pk>/", ImportJobStatusView.as_view(), name="import_job_status"),
     path("api/schools/applications/", SchoolApplicationsListView.as_view(), name="school_applications_list"),
     path("api/applications/", UserApplicationsListView.as_view(), name="user_applications_list"),
     path("api/applications/create/", CreateApplicationView.as_view(), name="create_application"),
     path("api/applications/update-status/", UpdateApplicationStatusView.as_view(), name="update_application_status"),
+    path("api/applications/bulk-update-status/", BulkApplicationStatusView.as_view(), name="bulk_update_application_status"),
 ]
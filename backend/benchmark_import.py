@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Compare the old per-row results import with the batched ResultsImporter.
+
+Runs against a throwaway database (a temporary SQLite file, or the test
+database on PostgreSQL), never against db.sqlite3.
+
+    python benchmark_import.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import django
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection
+from api.models import User, Olimpiade, Prieksmets, Rezultats
+from api.importing import ResultsImporter
+
+
+def legacy_import(olympiad, rows):
+    """The loop ImportResultsView used before batching: one get() and one INSERT per row"""
+    for row in rows:
+        lietotajs = None
+        try:
+            lietotajs = User.objects.get(email=row['lietotajs_email'])
+        except User.DoesNotExist:
+            pass
+        Rezultats.objects.create(
+            olimpiade=olympiad,
+            vieta=int(row['vieta']),
+            punktuSkaits=float(row['punktuSkaits']),
+            rezultataDatums=date.today(),
+            lietotajs=lietotajs,
+        )
+
+
+def make_rows(count):
+    return [
+        {
+            "vieta": i,
+            "punktuSkaits": 1000 - i % 1000,
+            "lietotajs_email": f"bench{i % 2000}@example.com",
+            "rezultataDatums": "2025-05-01",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(label, func, olympiad, rows):
+    Rezultats.objects.filter(olimpiade=olympiad).delete()
+    started = time.perf_counter()
+    func(olympiad, rows)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<10} {elapsed:8.2f} s  {len(rows) / elapsed:10.0f} rows/s")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        User.objects.bulk_create(
+            User(email=f"bench{i}@example.com", password="!") for i in range(1000)
+        )
+        prieksmets = Prieksmets.objects.create(nosaukums="Matemātika", kategorija="STEM")
+        olympiad = Olimpiade.objects.create(
+            nosaukums="Benchmark", datums=date.today(), norisesVieta="Rīga",
+            organizetajs="VISC", prieksmets=prieksmets,
+        )
+        rows = make_rows(count)
+
+        print(f"Importing {count} rows ({connection.settings_dict['NAME']})")
+        before = timed("per-row", legacy_import, olympiad, rows)
+        after = timed("batched", lambda o, r: ResultsImporter(o).run(r), olympiad, rows)
+        print(f"  speedup    {before / after:8.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Password checks per second for each hasher profile (PASSWORD_HASHER_PROFILES).
+
+Each profile hashes one password with its preferred hasher, then verifies it
+from several threads at once through User.check_password(), i.e. through the
+bounded pool in api.hashing, the same path a login takes. No database is
+used: the hash is already current, so no login triggers a re-hash.
+
+    python benchmark_login.py [logins] [workers]
+"""
+import os
+import sys
+import time
+import django
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.test import override_settings
+from api import hashing
+from api.models import User
+
+PASSWORD = "Password123!"
+
+
+def reset_pool():
+    # The next hash starts a pool sized by the current PASSWORD_HASHING_WORKERS
+    if hashing._executor is not None:
+        hashing._executor.shutdown()
+        hashing._executor = None
+
+
+def run_profile(name, hashers, logins, workers):
+    with override_settings(PASSWORD_HASHERS=hashers, PASSWORD_HASHING_WORKERS=workers):
+        hasher = get_hasher()
+        if hasher.library:
+            try:
+                hasher._load_library()  # optional package, e.g. argon2-cffi
+            except ValueError as e:
+                print(f"  {name:<8} skipped: {e}")
+                return
+        reset_pool()
+        user = User(email="bench@example.com")
+        user.set_password(PASSWORD)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+            results = list(clients.map(lambda _: user.check_password(PASSWORD), range(logins)))
+        elapsed = time.perf_counter() - started
+        assert all(results)
+
+        per_second = logins / elapsed
+        print(f"  {name:<8} {hasher.algorithm:<14} {per_second:10.1f} logins/s"
+              f"  {per_second / workers:8.1f} per core")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    print(f"{logins} logins per profile, {workers} hashing workers")
+    for name, hashers in settings.PASSWORD_HASHER_PROFILES.items():
+        run_profile(name, hashers, logins, workers)
+    reset_pool()
+
+
+if __name__ == '__main__':
+    main()
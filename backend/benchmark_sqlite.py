@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Concurrent reads and writes against each SQLite profile (SQLITE_PROFILES).
+
+Every profile gets its own throwaway database file, never db.sqlite3. Client
+threads run a request-like mix for a fixed time: mostly olympiad list and
+application reads, plus registrations and bulk status changes (a
+read-then-write transaction). Connections are closed or kept after each
+operation the way Django does at the end of a request (CONN_MAX_AGE).
+
+    python benchmark_sqlite.py [seconds] [threads] [write-percent]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import django
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, connections
+from api.bulk import update_application_status
+from api.models import User, Olimpiade, Prieksmets, Pieteikums
+from api.seats import register
+
+USERS = 2000
+OLYMPIADS = 20
+
+
+def seed():
+    User.objects.bulk_create(
+        User(email=f"bench{i}@example.com", password="!") for i in range(USERS)
+    )
+    prieksmets = Prieksmets.objects.create(nosaukums="Matemātika", kategorija="STEM")
+    for i in range(OLYMPIADS):
+        Olimpiade.objects.create(
+            nosaukums=f"Benchmark {i}", datums=date.today(), maxDalibnieki=USERS // 4,
+            norisesVieta="Rīga", organizetajs="VISC", prieksmets=prieksmets,
+        )
+    return (
+        list(User.objects.values_list('id', flat=True)),
+        list(Olimpiade.objects.values_list('id', flat=True)),
+        User.objects.create(email="bench-admin@example.com", password="!", user_type='admin'),
+    )
+
+
+def read(user_ids, olympiad_ids):
+    list(Olimpiade.objects.order_by('-datums', '-id')[:50])
+    list(Pieteikums.objects.filter(lietotajs_id=random.choice(user_ids)).select_related('olimpiade'))
+
+
+def write(user_ids, olympiad_ids, admin):
+    if random.random() < 0.5:
+        register(User(pk=random.choice(user_ids)), Olimpiade(pk=random.choice(olympiad_ids)))
+    else:
+        low = random.randint(1, max(Pieteikums.objects.count(), 1))
+        update_application_status(admin, {
+            'application_ids': list(range(low, low + 20)),
+            'status': random.choice([Pieteikums.APPROVED, Pieteikums.REJECTED]),
+        })
+
+
+def run_profile(name, profile, seconds, threads, write_share):
+    db_settings = connection.settings_dict
+    db_settings.update(OPTIONS=profile['OPTIONS'], CONN_MAX_AGE=profile['CONN_MAX_AGE'],
+                       CONN_HEALTH_CHECKS=profile.get('CONN_HEALTH_CHECKS', False))
+    db_settings['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), f'{name}.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user_ids, olympiad_ids, admin = seed()
+        connections.close_all()
+        counts = {'read': 0, 'write': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def client():
+            done = {'read': 0, 'write': 0, 'locked': 0}
+            try:
+                while time.perf_counter() < deadline:
+                    kind = 'write' if random.random() < write_share else 'read'
+                    try:
+                        if kind == 'write':
+                            write(user_ids, olympiad_ids, admin)
+                        else:
+                            read(user_ids, olympiad_ids)
+                        done[kind] += 1
+                    except OperationalError:
+                        # "database is locked": the request would have failed
+                        done['locked'] += 1
+                    # End of request
+                    close_old_connections()
+            finally:
+                connections.close_all()
+                with lock:
+                    for key, value in done.items():
+                        counts[key] += value
+
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        print(f"  {name:<11} {counts['read'] / seconds:9.0f} reads/s {counts['write'] / seconds:8.0f} writes/s"
+              f" {counts['locked']:6d} locked")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def main():
+    if connection.vendor != 'sqlite':
+        sys.exit("benchmark_sqlite.py compares SQLite profiles; unset DATABASE_ENGINE")
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    write_share = (int(sys.argv[3]) if len(sys.argv) > 3 else 20) / 100
+    print(f"{threads} threads for {seconds:g} s per profile, {write_share:.0%} writes")
+    for name, profile in settings.SQLITE_PROFILES.items():
+        run_profile(name, profile, seconds, threads, write_share)
+
+
+if __name__ == '__main__':
+    main()
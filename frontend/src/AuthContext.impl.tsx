@@ -43,7 +43,7 @@ interface AuthContextType {
   getProfile(): Promise<boolean>;
   updateProfile(data: ProfileUpdatePayload): Promise<void>;
   changePassword(oldPassword: string, newPassword: string, confirmPassword: string): Promise<void>;
-  searchUsers(search?: string): Promise<User[]>;
+  searchUsers(search?: string, ordering?: string): Promise<User[]>;
   createUser(data: AdminUserCreatePayload): Promise<User>;
   updateUser(userId: number, data: AdminUserUpdatePayload): Promise<User>;
   deleteUser(userId: number): Promise<void>;
@@ -106,8 +106,14 @@ export const AuthProvider = ({ children }: { children: React.ReactNode }) => {
     setLoading(false);
   }
 
-  async function searchUsers(search?: string): Promise<User[]> {
-    const params = search ? { search } : {};
+  async function searchUsers(search?: string, ordering?: string): Promise<User[]> {
+    const params: Record<string, string> = {};
+    if (search) {
+      params.search = search;
+    }
+    if (ordering) {
+      params.ordering = ordering;
+    }
     const res = await api.get("/api/admin/users/", { params });
     return res.data;
   }
@@ -3,6 +3,8 @@ import axios from "axios";
 const api = axios.create({
   baseURL: "http://localhost:8000",
   withCredentials: false,
+  // Repeated filters as ?prieksmets=a&prieksmets=b, the form Django reads
+  paramsSerializer: { indexes: null },
 });
 
 api.interceptors.request.use(config => {
@@ -10,11 +12,22 @@ api.interceptors.request.use(config => {
   if (access) {
     config.headers.Authorization = `Bearer ${access}`;
   }
+  // Keeps our reads on the primary database right after a write
+  const readPrimary = sessionStorage.getItem("readPrimary");
+  if (readPrimary) {
+    config.headers["X-Read-Primary"] = readPrimary;
+  }
   return config;
 });
 
 api.interceptors.response.use(
-  res => res,
+  res => {
+    const readPrimary = res.headers["x-read-primary"];
+    if (readPrimary) {
+      sessionStorage.setItem("readPrimary", readPrimary);
+    }
+    return res;
+  },
   async err => {
     const original = err.config;
 
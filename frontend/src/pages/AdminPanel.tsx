@@ -5,6 +5,13 @@ import type { User } from "../AuthContext";
 import { messages } from "../messages";
 import api from "../axios";
 
+const SORT_ORDERING = {
+  date_desc: "-create_date",
+  date_asc: "create_date",
+  name_asc: "name",
+  name_desc: "-name",
+};
+
 export default function AdminPanel() {
   const { user, searchUsers, createUser, updateUser, deleteUser, logout, getProfile } = useContext(AuthContext);
   const navigate = useNavigate();
@@ -52,20 +59,20 @@ export default function AdminPanel() {
     setLoading(true);
     setError("");
     try {
-      const data = await searchUsers();
+      const data = await searchUsers(undefined, SORT_ORDERING[sortOption]);
       setUsers(data);
     } catch (err: any) {
       setError(err.response?.data?.detail || "Neizdevās ielādēt lietotājus");
     } finally {
       setLoading(false);
     }
-  }, [searchUsers]);
+  }, [searchUsers, sortOption]);
 
   const handleSearch = useCallback(async () => {
     setLoading(true);
     setError("");
     try {
-      const data = await searchUsers(searchTerm);
+      const data = await searchUsers(searchTerm, SORT_ORDERING[sortOption]);
       setUsers(data);
       if (data.length === 0 && searchTerm) {
         setError(messages.E009(searchTerm));
@@ -75,12 +82,9 @@ export default function AdminPanel() {
     } finally {
       setLoading(false);
     }
-  }, [searchTerm, searchUsers]);
-
-  useEffect(() => {
-    loadUsers();
-  }, [loadUsers]);
+  }, [searchTerm, searchUsers, sortOption]);
 
+  // Also runs on mount and when the sort order changes
   useEffect(() => {
     const timeoutId = setTimeout(() => {
       if (searchTerm) {
@@ -338,35 +342,8 @@ export default function AdminPanel() {
     }
   }
 
-  // Sort users
-  const sortedUsers = [...users].sort((a, b) => {
-    let comparison = 0;
-    
-    switch (sortOption) {
-      case "date_desc":
-        const dateA = a.create_date ? new Date(a.create_date).getTime() : 0;
-        const dateB = b.create_date ? new Date(b.create_date).getTime() : 0;
-        comparison = dateB - dateA; 
-        break;
-      case "date_asc":
-        const dateA2 = a.create_date ? new Date(a.create_date).getTime() : 0;
-        const dateB2 = b.create_date ? new Date(b.create_date).getTime() : 0;
-        comparison = dateA2 - dateB2; 
-        break;
-      case "name_asc":
-        const nameA = `${a.name || ""} ${a.last_name || ""}`.trim().toLowerCase();
-        const nameB = `${b.name || ""} ${b.last_name || ""}`.trim().toLowerCase();
-        comparison = nameA.localeCompare(nameB, "lv"); 
-        break;
-      case "name_desc":
-        const nameA2 = `${a.name || ""} ${a.last_name || ""}`.trim().toLowerCase();
-        const nameB2 = `${b.name || ""} ${b.last_name || ""}`.trim().toLowerCase();
-        comparison = nameB2.localeCompare(nameA2, "lv"); 
-        break;
-    }
-    
-    return comparison;
-  });
+  // Users arrive sorted by the server (?ordering=)
+  const sortedUsers = users;
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
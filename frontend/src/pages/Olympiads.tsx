@@ -22,6 +22,19 @@ interface Olympiad {
   prieksmets_kategorija?: string;
 }
 
+interface FacetOption {
+  value: string | number;
+  label: string;
+  count: number;
+}
+
+const SORT_ORDERING = {
+  "a-z": "nosaukums",
+  "z-a": "-nosaukums",
+  newest: "-datums",
+  oldest: "datums",
+};
+
 export default function Olympiads() {
   const { user } = useContext(AuthContext);
   const navigate = useNavigate();
@@ -29,6 +42,7 @@ export default function Olympiads() {
   const [showFilterModal, setShowFilterModal] = useState(false);
   const [selectedLocations, setSelectedLocations] = useState<string[]>([]);
   const [selectedSubjects, setSelectedSubjects] = useState<string[]>([]);
+  const [facets, setFacets] = useState<Record<string, FacetOption[]>>({});
   const [dateFilter, setDateFilter] = useState<"closest" | "all">("all");
   const [sortBy, setSortBy] = useState<"a-z" | "z-a" | "newest" | "oldest">("a-z");
   const [selectedOlympiad, setSelectedOlympiad] = useState<Olympiad | null>(null);
@@ -42,7 +56,7 @@ export default function Olympiads() {
 
   useEffect(() => {
     loadOlympiads();
-  }, []);
+  }, [dateFilter, sortBy, selectedLocations, selectedSubjects]);
 
   useEffect(() => {
     const timeoutId = setTimeout(() => {
@@ -51,13 +65,41 @@ export default function Olympiads() {
     return () => clearTimeout(timeoutId);
   }, [searchTerm]);
 
+  const toDateParam = (date: Date): string => {
+    const month = String(date.getMonth() + 1).padStart(2, "0");
+    const day = String(date.getDate()).padStart(2, "0");
+    return `${date.getFullYear()}-${month}-${day}`;
+  };
+
+  const buildFilterParams = () => {
+    const params: Record<string, string | string[]> = { status: "upcoming" };
+    if (searchTerm) {
+      params.search = searchTerm;
+    }
+    if (dateFilter === "closest") {
+      params.date_to = toDateParam(new Date(Date.now() + 30 * 24 * 60 * 60 * 1000));
+    }
+    if (selectedLocations.length > 0) {
+      params.norisesVieta = selectedLocations;
+    }
+    if (selectedSubjects.length > 0) {
+      params.prieksmets = selectedSubjects;
+    }
+    return params;
+  };
+
   const loadOlympiads = async () => {
     setLoading(true);
     setError("");
     try {
-      const params = searchTerm ? { search: searchTerm } : {};
-      const res = await api.get("/api/olympiads/", { params });
+      // Filtering and sorting happen on the server; facets fill the filter lists
+      const params = buildFilterParams();
+      const [res, facetsRes] = await Promise.all([
+        api.get("/api/olympiads/", { params: { ...params, ordering: SORT_ORDERING[sortBy] } }),
+        api.get("/api/olympiads/facets/", { params }),
+      ]);
       setOlympiads(res.data);
+      setFacets(facetsRes.data);
     } catch (err: any) {
       setError(err.response?.data?.detail || "Neizdevās ielādēt olimpiādes");
     } finally {
@@ -72,14 +114,6 @@ export default function Olympiads() {
       .toLowerCase();
   };
 
-  const parseDate = (dateStr: string): Date => {
-    try {
-      return new Date(dateStr);
-    } catch {
-      return new Date();
-    }
-  };
-
   const formatDate = (dateStr: string): string => {
     try {
       const date = new Date(dateStr);
@@ -89,21 +123,13 @@ export default function Olympiads() {
     }
   };
 
-  // Get unique locations and subjects from loaded olympiads
-  const allLocations = Array.from(new Set(olympiads.map(o => o.norisesVieta)));
-  const allSubjects = Array.from(new Set(olympiads.map(o => o.prieksmets_nosaukums || "").filter(s => s)));
+  // Filter options with counts for the current search and filters
+  const locationCounts = new Map((facets.norisesVieta || []).map(f => [f.label, f.count]));
+  const subjectCounts = new Map((facets.prieksmets || []).map(f => [f.label, f.count]));
+  const allLocations = Array.from(locationCounts.keys());
+  const allSubjects = Array.from(subjectCounts.keys());
 
   let filteredOlympiads = olympiads.filter((olympiad) => {
-    
-    const today = new Date();
-    today.setHours(0, 0, 0, 0);
-    const olympiadDate = parseDate(olympiad.datums);
-    olympiadDate.setHours(0, 0, 0, 0);
-    
-    if (olympiadDate < today) {
-      return false; 
-    }
-    
     if (searchTerm) {
       const searchNormalized = removeDiacritics(searchTerm);
       const nameNormalized = removeDiacritics(olympiad.nosaukums);
@@ -115,35 +141,17 @@ export default function Olympiads() {
       }
     }
 
-    if (selectedLocations.length > 0 && !selectedLocations.includes(olympiad.norisesVieta)) {
-      return false;
-    }
-
-    if (selectedSubjects.length > 0 && !selectedSubjects.includes(olympiad.prieksmets_nosaukums || "")) {
-      return false;
-    }
-
-    if (dateFilter === "closest") {
-      return olympiadDate >= today && olympiadDate <= new Date(today.getTime() + 30 * 24 * 60 * 60 * 1000);
-    }
-
     return true;
   });
 
-  filteredOlympiads = [...filteredOlympiads].sort((a, b) => {
-    switch (sortBy) {
-      case "a-z":
-        return a.nosaukums.localeCompare(b.nosaukums, "lv");
-      case "z-a":
-        return b.nosaukums.localeCompare(a.nosaukums, "lv");
-      case "newest":
-        return parseDate(b.datums).getTime() - parseDate(a.datums).getTime();
-      case "oldest":
-        return parseDate(a.datums).getTime() - parseDate(b.datums).getTime();
-      default:
-        return 0;
-    }
-  });
+  // The server sorts names bytewise; keep Latvian alphabetical order for display
+  if (sortBy === "a-z" || sortBy === "z-a") {
+    filteredOlympiads = [...filteredOlympiads].sort((a, b) =>
+      sortBy === "a-z"
+        ? a.nosaukums.localeCompare(b.nosaukums, "lv")
+        : b.nosaukums.localeCompare(a.nosaukums, "lv")
+    );
+  }
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -285,7 +293,7 @@ export default function Olympiads() {
                             }}
                             className="w-4 h-4 text-brand-gold rounded"
                           />
-                          {location}
+                          {location} ({locationCounts.get(location)})
                         </label>
                       ))}
                     </div>
@@ -308,7 +316,7 @@ export default function Olympiads() {
                             }}
                             className="w-4 h-4 text-brand-gold rounded"
                           />
-                          {subject}
+                          {subject} ({subjectCounts.get(subject)})
                         </label>
                       ))}
                     </div>
@@ -19,12 +19,26 @@ interface ResultEntry {
   percentage?: number;
 }
 
+interface FacetOption {
+  value: string | number;
+  label: string;
+  count: number;
+}
+
+const SORT_ORDERING = {
+  "a-z": "nosaukums",
+  "z-a": "-nosaukums",
+  newest: "-datums",
+  oldest: "datums",
+};
+
 export default function Results() {
   const { user } = useContext(AuthContext);
   const [searchTerm, setSearchTerm] = useState("");
   const [showFilterModal, setShowFilterModal] = useState(false);
   const [selectedLocations, setSelectedLocations] = useState<string[]>([]);
   const [selectedSubjects, setSelectedSubjects] = useState<string[]>([]);
+  const [facets, setFacets] = useState<Record<string, FacetOption[]>>({});
   const [dateFilter, setDateFilter] = useState<"closest" | "all">("all");
   const [sortBy, setSortBy] = useState<"a-z" | "z-a" | "newest" | "oldest">("a-z");
   const [selectedOlympiad, setSelectedOlympiad] = useState<OlympiadResult | null>(null);
@@ -62,7 +76,7 @@ export default function Results() {
 
   useEffect(() => {
     loadOlympiads();
-  }, []);
+  }, [dateFilter, sortBy, selectedLocations, selectedSubjects]);
 
   useEffect(() => {
     const timeoutId = setTimeout(() => {
@@ -77,23 +91,43 @@ export default function Results() {
     }
   }, [selectedOlympiad, showResultsModal]);
 
+  const toDateParam = (date: Date): string => {
+    const month = String(date.getMonth() + 1).padStart(2, "0");
+    const day = String(date.getDate()).padStart(2, "0");
+    return `${date.getFullYear()}-${month}-${day}`;
+  };
+
+  const buildFilterParams = () => {
+    const params: Record<string, string | string[]> = { status: "completed" };
+    if (searchTerm) {
+      params.search = searchTerm;
+    }
+    if (dateFilter === "closest") {
+      const today = new Date();
+      params.date_from = toDateParam(today);
+      params.date_to = toDateParam(new Date(today.getTime() + 30 * 24 * 60 * 60 * 1000));
+    }
+    if (selectedLocations.length > 0) {
+      params.norisesVieta = selectedLocations;
+    }
+    if (selectedSubjects.length > 0) {
+      params.prieksmets = selectedSubjects;
+    }
+    return params;
+  };
+
   const loadOlympiads = async () => {
     setLoading(true);
     setError("");
     try {
-      const params = searchTerm ? { search: searchTerm } : {};
-      const res = await api.get("/api/olympiads/", { params });
-      
-      const today = new Date();
-      today.setHours(0, 0, 0, 0);
-      
-      const completedOlympiads = res.data.filter((olympiad: any) => {
-        const olympiadDate = new Date(olympiad.datums);
-        olympiadDate.setHours(0, 0, 0, 0);
-        return olympiadDate < today;
-      });
-      
-      setOlympiads(completedOlympiads);
+      // Only completed olympiads, filtered and sorted by the server; facets fill the filter lists
+      const params = buildFilterParams();
+      const [res, facetsRes] = await Promise.all([
+        api.get("/api/olympiads/", { params: { ...params, ordering: SORT_ORDERING[sortBy] } }),
+        api.get("/api/olympiads/facets/", { params }),
+      ]);
+      setOlympiads(res.data);
+      setFacets(facetsRes.data);
     } catch (err: any) {
       setError(err.response?.data?.detail || "Neizdevās ielādēt olimpiādes");
     } finally {
@@ -108,12 +142,8 @@ export default function Results() {
       const res = await api.get(`/api/olympiads/${olympiadId}/results/`);
      
       if (res.data && res.data.length > 0) {
-        const maxPoints = Math.max(...res.data.map((r: any) => r.punktuSkaits));
-        const resultsWithPercentage = res.data.map((result: any) => ({
-          ...result,
-          percentage: Math.round((result.punktuSkaits / maxPoints) * 100)
-        }));
-        setResults(resultsWithPercentage);
+        // percentage is computed by the server
+        setResults(res.data);
       } else {
         setResults([]);
       }
@@ -169,14 +199,6 @@ export default function Results() {
       .toLowerCase();
   };
 
-  const parseDate = (dateStr: string): Date => {
-    try {
-      return new Date(dateStr);
-    } catch {
-      return new Date();
-    }
-  };
-
   const formatDate = (dateStr: string): string => {
     try {
       const date = new Date(dateStr);
@@ -186,11 +208,13 @@ export default function Results() {
     }
   };
 
-  // Get unique locations and subjects from loaded olympiads
-  const allLocations = Array.from(new Set(olympiads.map(o => o.norisesVieta)));
-  const allSubjects = Array.from(new Set(olympiads.map(o => o.prieksmets_nosaukums || "").filter(s => s)));
+  // Filter options with counts for the current search and filters
+  const locationCounts = new Map((facets.norisesVieta || []).map(f => [f.label, f.count]));
+  const subjectCounts = new Map((facets.prieksmets || []).map(f => [f.label, f.count]));
+  const allLocations = Array.from(locationCounts.keys());
+  const allSubjects = Array.from(subjectCounts.keys());
 
-  // Filter olympiads - hidden filter: only show completed (those with results)
+  // Filter olympiads - completed ones are selected by the server
   let filteredOlympiads = olympiads.filter((olympiad) => {
     if (searchTerm) {
       const searchNormalized = removeDiacritics(searchTerm);
@@ -203,37 +227,17 @@ export default function Results() {
       }
     }
 
-    if (selectedLocations.length > 0 && !selectedLocations.includes(olympiad.norisesVieta)) {
-      return false;
-    }
-
-    if (selectedSubjects.length > 0 && !selectedSubjects.includes(olympiad.prieksmets_nosaukums || "")) {
-      return false;
-    }
-
-    if (dateFilter === "closest") {
-      const today = new Date();
-      const olympiadDate = parseDate(olympiad.datums);
-      return olympiadDate >= today && olympiadDate <= new Date(today.getTime() + 30 * 24 * 60 * 60 * 1000);
-    }
-
     return true;
   });
 
-  filteredOlympiads = [...filteredOlympiads].sort((a, b) => {
-    switch (sortBy) {
-      case "a-z":
-        return a.nosaukums.localeCompare(b.nosaukums, "lv");
-      case "z-a":
-        return b.nosaukums.localeCompare(a.nosaukums, "lv");
-      case "newest":
-        return parseDate(b.datums).getTime() - parseDate(a.datums).getTime();
-      case "oldest":
-        return parseDate(a.datums).getTime() - parseDate(b.datums).getTime();
-      default:
-        return 0;
-    }
-  });
+  // The server sorts names bytewise; keep Latvian alphabetical order for display
+  if (sortBy === "a-z" || sortBy === "z-a") {
+    filteredOlympiads = [...filteredOlympiads].sort((a, b) =>
+      sortBy === "a-z"
+        ? a.nosaukums.localeCompare(b.nosaukums, "lv")
+        : b.nosaukums.localeCompare(a.nosaukums, "lv")
+    );
+  }
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -657,7 +661,7 @@ export default function Results() {
                       className="w-full p-3 rounded-lg border border-gray-300 focus:outline-none focus:ring-2 focus:ring-brand-gold"
                     />
                     <p className="text-gray-500 text-sm mt-2">
-                      URL jāatgriež JSON formātā ar struktūru: {"{"}"results": [{"{"}"vieta": 1, "punktuSkaits": 100, "lietotajs_email": "user@example.com", "rezultataDatums": "2025-01-01"{"}"}]{"}"}
+                      URL jāatgriež JSON formātā ar struktūru: {"{"}"results": [{"{"}"punktuSkaits": 100, "lietotajs_email": "user@example.com", "rezultataDatums": "2025-01-01"{"}"}]{"}"}
                     </p>
                   </div>
                 )}
@@ -35,6 +35,7 @@ export default function SchoolApplications() {
   const [error, setError] = useState("");
   const [success, setSuccess] = useState("");
   const [searchTerm, setSearchTerm] = useState("");
+  const [selectedIds, setSelectedIds] = useState<number[]>([]);
 
   const isAdmin = user?.user_type === "admin";
   const isTeacher = user?.user_type === "teacher";
@@ -85,6 +86,7 @@ export default function SchoolApplications() {
       
       const res = await api.get("/api/schools/applications/", { params });
       setApplications(res.data);
+      setSelectedIds([]);
     } catch (err: any) {
       const errorMsg = err.response?.data?.detail || "Neizdevās ielādēt pieteikumus";
       setError(errorMsg);
@@ -110,6 +112,34 @@ export default function SchoolApplications() {
     }
   }
 
+  async function handleBulkUpdateStatus(newStatus: string) {
+    if (selectedIds.length === 0) return;
+
+    setError("");
+    setSuccess("");
+
+    try {
+      // One request for all selected applications
+      const res = await api.patch("/api/applications/bulk-update-status/", {
+        application_ids: selectedIds,
+        status: newStatus
+      });
+      setSuccess(res.data.detail);
+      if (res.data.refused.length > 0) {
+        setError(`${res.data.refused.length} pieteikumus neizdevās atjaunināt: ${res.data.refused[0].reason}`);
+      }
+      loadApplications();
+    } catch (err: any) {
+      setError(err.response?.data?.detail || "Neizdevās atjaunināt pieteikumu statusus");
+    }
+  }
+
+  function toggleSelected(applicationId: number) {
+    setSelectedIds(ids =>
+      ids.includes(applicationId) ? ids.filter(id => id !== applicationId) : [...ids, applicationId]
+    );
+  }
+
   function formatDate(dateString: string): string {
     try {
       const date = new Date(dateString);
@@ -129,6 +159,8 @@ export default function SchoolApplications() {
         return "bg-blue-500";
       case "Beidzies":
         return "bg-green-500";
+      case "Gaidīšanas sarakstā":
+        return "bg-purple-500";
       default:
         return "bg-gray-500";
     }
@@ -147,6 +179,13 @@ export default function SchoolApplications() {
     );
   });
 
+  const allSelected =
+    filteredApplications.length > 0 && filteredApplications.every(app => selectedIds.includes(app.id));
+
+  function toggleAllSelected() {
+    setSelectedIds(allSelected ? [] : filteredApplications.map(app => app.id));
+  }
+
   const selectedSchool = isAdmin 
     ? schools.find(s => s.id === selectedSchoolId)
     : null;
@@ -234,9 +273,29 @@ export default function SchoolApplications() {
             <div className="text-center text-white text-xl py-12">Ielādē...</div>
           ) : (
             <div className="overflow-x-auto">
+              {selectedIds.length > 0 && (isAdmin || isTeacher) && (
+                <div className="mb-4 flex items-center gap-4 p-4 bg-[#1B2241] rounded-lg border border-[#3A4562]">
+                  <span className="text-white">Atlasīti: {selectedIds.length}</span>
+                  <button
+                    onClick={() => handleBulkUpdateStatus("Apstrādē")}
+                    className="px-4 py-2 bg-green-500 hover:bg-green-600 text-white font-semibold rounded transition-colors"
+                  >
+                    Apstiprināt atlasītos
+                  </button>
+                  <button
+                    onClick={() => handleBulkUpdateStatus("Atteikts")}
+                    className="px-4 py-2 bg-red-500 hover:bg-red-600 text-white font-semibold rounded transition-colors"
+                  >
+                    Noraidīt atlasītos
+                  </button>
+                </div>
+              )}
               <table className="w-full">
                 <thead>
                   <tr className="border-b border-[#3A4562]">
+                    <th className="py-4 px-4">
+                      <input type="checkbox" checked={allSelected} onChange={toggleAllSelected} />
+                    </th>
                     <th className="text-left py-4 px-4 text-white font-semibold">Lietotājs</th>
                     <th className="text-left py-4 px-4 text-white font-semibold">E-pasts</th>
                     <th className="text-left py-4 px-4 text-white font-semibold">Olimpiāde</th>
@@ -255,6 +314,13 @@ export default function SchoolApplications() {
                         key={app.id}
                         className="border-b border-[#3A4562] hover:bg-[#2A3454] transition-colors"
                       >
+                        <td className="py-4 px-4">
+                          <input
+                            type="checkbox"
+                            checked={selectedIds.includes(app.id)}
+                            onChange={() => toggleSelected(app.id)}
+                          />
+                        </td>
                         <td className="py-4 px-4 text-white">{fullName}</td>
                         <td className="py-4 px-4 text-white">{app.lietotajs_email}</td>
                         <td className="py-4 px-4 text-white">{app.olimpiade_nosaukums}</td>